@@ -0,0 +1,76 @@
+"""Micro-benchmark for the per-call cost of calculate().
+
+Compares the current hot path (cached compiled expression, shared
+read-only tables) with the original implementation, which rebuilt the
+eval namespace and ran three regex operations on every call.
+
+Usage:
+    python benchmarks/bench_hot_path.py
+"""
+
+import math
+import os
+import re
+import sys
+import timeit
+import tracemalloc
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.math_tools import calculate  # noqa: E402
+
+EXPRESSIONS = ["2 + 3 * 4", "sqrt(16) + sin(pi/2)", "(5 + 3) ** 2", "log(e) + log10(100)"]
+
+
+def legacy_calculate(expression):
+    """The original per-call path: fresh namespace, regex passes, eval of text."""
+    expression = expression.strip()
+    expression = re.sub(r'\bpi\b', str(math.pi), expression)
+    expression = re.sub(r'\be\b', str(math.e), expression)
+    safe_dict = {
+        "sin": math.sin, "cos": math.cos, "tan": math.tan, "asin": math.asin,
+        "acos": math.acos, "atan": math.atan, "sinh": math.sinh, "cosh": math.cosh,
+        "tanh": math.tanh, "log": math.log, "log10": math.log10, "log2": math.log2,
+        "exp": math.exp, "sqrt": math.sqrt, "pow": math.pow, "abs": abs,
+        "round": round, "floor": math.floor, "ceil": math.ceil, "min": min,
+        "max": max, "pi": math.pi, "e": math.e, "__builtins__": {},
+    }
+    if not re.match(r"^[0-9+\-*/().,%\s\w]+$", expression):
+        return "Error: Invalid characters in expression"
+    result = eval(expression, safe_dict)
+    if isinstance(result, float) and result.is_integer():
+        return int(result)
+    return result
+
+
+def time_per_call(fn, number=20000):
+    """Return the best-of-5 mean time per call over EXPRESSIONS, in microseconds."""
+    def run():
+        for expression in EXPRESSIONS:
+            fn(expression)
+    best = min(timeit.repeat(run, number=number // len(EXPRESSIONS), repeat=5))
+    return best / (number // len(EXPRESSIONS) * len(EXPRESSIONS)) * 1e6
+
+
+def peak_bytes_per_call(fn):
+    """Return the peak transient allocation of one call, in bytes."""
+    for expression in EXPRESSIONS:
+        fn(expression)  # warm caches
+    peaks = []
+    for expression in EXPRESSIONS:
+        tracemalloc.start()
+        fn(expression)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return max(peaks)
+
+
+def main():
+    print(f"{'path':<10} {'us/call':>10} {'peak bytes/call':>16}")
+    for name, fn in [("legacy", legacy_calculate), ("current", calculate)]:
+        print(f"{name:<10} {time_per_call(fn):>10.2f} {peak_bytes_per_call(fn):>16}")
+
+
+if __name__ == "__main__":
+    main()
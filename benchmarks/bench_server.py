@@ -0,0 +1,54 @@
+"""End-to-end benchmarks through the demo.mcp FastMCP server, in process."""
+
+import asyncio
+import os
+import sys
+import time
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastmcp import Client  # noqa: E402
+
+from demo import mcp  # noqa: E402
+
+# Tool calls exercised end to end
+CALLS = {
+    "add": {"a": 3, "b": 5},
+    "calculate": {"expression": "sqrt(16) + sin(pi/2)"},
+    "greet": {"name": "Alice"},
+}
+
+
+def server_call(tool, arguments):
+    """Build a benchmark that dispatches through FastMCP.call_tool (no transport)."""
+    def bench(loops):
+        async def run():
+            started = time.perf_counter()
+            for _ in range(loops):
+                await mcp.call_tool(tool, arguments)
+            return time.perf_counter() - started
+        return asyncio.run(run())
+    return bench
+
+
+def client_round_trip(tool, arguments):
+    """Build a benchmark that makes full JSON-RPC calls over the in-memory transport."""
+    def bench(loops):
+        async def run():
+            async with Client(mcp) as client:
+                started = time.perf_counter()
+                for _ in range(loops):
+                    await client.call_tool(tool, arguments)
+                return time.perf_counter() - started
+        return asyncio.run(run())
+    return bench
+
+
+def get_benchmarks():
+    """Return (name, bench(loops) -> seconds) pairs for server round trips."""
+    benchmarks = []
+    for tool, arguments in CALLS.items():
+        benchmarks.append((f"server.call_tool[{tool}]", server_call(tool, arguments)))
+        benchmarks.append((f"client.call_tool[{tool}]", client_round_trip(tool, arguments)))
+    return benchmarks
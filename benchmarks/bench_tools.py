@@ -0,0 +1,69 @@
+"""Benchmarks for calling the tool functions directly."""
+
+import os
+import sys
+import time
+
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.math_tools import (add, calculate, calculate_batch, calculate_cache_clear, mean_many,  # noqa: E402
+                              multiply, product_many, sum_many)
+from tools.stats_tools import describe, quantiles  # noqa: E402
+from tools.text_tools import greet, greet_many  # noqa: E402
+
+# Representative calculate() inputs, grouped by the kind of work they do
+EXPRESSION_CLASSES = {
+    "arithmetic": "2 + 3 * 4 - 10 / 5",
+    "functions": "sqrt(16) + sin(pi/2) * cos(0)",
+    "nested": "((1 + 2) * (3 + 4)) ** 2 % 7",
+    "big_int": "2 ** 4000 // 3 ** 1000",
+    "redundant": "sqrt(16) + sqrt(16) * (2+3) - sin(pi/2) + 1 * (2 ** 10) + 0",
+    "error": "1 / 0",
+}
+
+
+def repeat_call(fn, *args):
+    """Build a benchmark that calls fn(*args) `loops` times."""
+    def bench(loops):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn(*args)
+        return time.perf_counter() - started
+    return bench
+
+
+def calculate_cold(expression):
+    """Build a benchmark that times calculate() with an empty expression cache."""
+    def bench(loops):
+        elapsed = 0.0
+        for _ in range(loops):
+            calculate_cache_clear()
+            started = time.perf_counter()
+            calculate(expression)
+            elapsed += time.perf_counter() - started
+        return elapsed
+    return bench
+
+
+def get_benchmarks():
+    """Return (name, bench(loops) -> seconds) pairs for the tool functions."""
+    benchmarks = [
+        ("add", repeat_call(add, 3, 5)),
+        ("multiply", repeat_call(multiply, 2.5, 4.0)),
+        ("greet", repeat_call(greet, "Alice")),
+    ]
+    for name, expression in EXPRESSION_CLASSES.items():
+        benchmarks.append((f"calculate[{name}]", repeat_call(calculate, expression)))
+        benchmarks.append((f"calculate_cold[{name}]", calculate_cold(expression)))
+    batch = list(EXPRESSION_CLASSES.values()) * 20
+    benchmarks.append(("calculate_batch[100]", repeat_call(calculate_batch, batch)))
+    floats = [1 + (i % 97) / 1000 for i in range(10000)]
+    benchmarks.append(("sum_many[10000]", repeat_call(sum_many, floats)))
+    benchmarks.append(("product_many[10000]", repeat_call(product_many, floats)))
+    benchmarks.append(("mean_many[10000]", repeat_call(mean_many, floats)))
+    benchmarks.append(("describe[10000]", repeat_call(describe, floats)))
+    benchmarks.append(("quantiles[10000]", repeat_call(quantiles, floats)))
+    names = [f" User {i} José " for i in range(1000)]
+    benchmarks.append(("greet_many[1000]", repeat_call(greet_many, names)))
+    return benchmarks
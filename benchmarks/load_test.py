@@ -0,0 +1,348 @@
+"""Load generator for FastMCP demo.
+
+Starts demo.py, drives it with many concurrent simulated MCP clients that
+issue a weighted mix of tool calls, and reports throughput, latency
+percentiles and error rates per tool. Use it to size deployments (clients
+per server process, HTTP workers, execution policies) with measurements.
+
+Transports:
+    stdio   each simulated client launches its own server process, as a
+            desktop MCP client would
+    http    one server (with --server-workers processes) shared by every
+            client; pass --url to target a server that is already running
+    memory  every client talks to demo.mcp in this process; measures the
+            server without any transport
+
+Usage:
+    python benchmarks/load_test.py                                        # stdio, 4 clients, 10 s
+    python benchmarks/load_test.py --transport http --clients 64 --server-workers 4
+    python benchmarks/load_test.py --mix add=1,calculate=8,greet=1 --duration 30
+    python benchmarks/load_test.py --transport http --server-env TOOL_POLICY=calculate=process
+    python benchmarks/load_test.py --transport http --url http://10.0.0.5:8000/mcp --json run.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+# Add the project root to the path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from fastmcp import Client  # noqa: E402
+from fastmcp.client.transports import StdioTransport, StreamableHttpTransport  # noqa: E402
+
+DEMO_PATH = os.path.join(project_root, "demo.py")
+
+# Relative weight of each tool in the call mix
+DEFAULT_MIX = {"add": 4, "calculate": 4, "greet": 2}
+
+# calculate() inputs; numbers are filled in per call so results are not all memoized
+EXPRESSION_TEMPLATES = [
+    "{a} + {b} * {c}",
+    "sqrt({a}) + sin({b} / 100) * cos({c} / 100)",
+    "(({a} + {b}) * ({c} - 7)) ** 2 % 97",
+    "log({a}) * {b} / {c}",
+]
+
+NAMES = ["Alice", "Bob", "Carol", "Dave", "Erin", "Frank", "Grace", "Heidi"]
+
+
+def _add_arguments(rng):
+    return {"a": rng.randint(-1000, 1000), "b": rng.randint(-1000, 1000)}
+
+
+def _calculate_arguments(rng):
+    template = rng.choice(EXPRESSION_TEMPLATES)
+    return {"expression": template.format(a=rng.randint(1, 1000), b=rng.randint(1, 1000),
+                                          c=rng.randint(1, 1000))}
+
+
+def _greet_arguments(rng):
+    return {"name": f"{rng.choice(NAMES)} {rng.randint(1, 1000)}"}
+
+
+# Tools the generator knows how to call, with a random-arguments factory each
+ARGUMENT_FACTORIES = {
+    "add": _add_arguments,
+    "calculate": _calculate_arguments,
+    "greet": _greet_arguments,
+}
+
+# Latency percentiles reported for every tool
+PERCENTILES = (0.50, 0.90, 0.95, 0.99)
+
+
+def parse_mix(spec):
+    """Parse "tool=weight,..." into {tool: weight}; raise ValueError if invalid."""
+    mix = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        tool, _, weight = item.partition("=")
+        tool = tool.strip()
+        if tool not in ARGUMENT_FACTORIES:
+            raise ValueError(f"Unknown tool {tool!r} (expected one of {', '.join(ARGUMENT_FACTORIES)})")
+        try:
+            mix[tool] = float(weight) if weight.strip() else 1.0
+        except ValueError:
+            raise ValueError(f"Invalid weight {weight.strip()!r} for {tool!r}") from None
+        if mix[tool] < 0:
+            raise ValueError(f"Weight for {tool!r} must not be negative")
+    if not any(mix.values()):
+        raise ValueError("The mix must give at least one tool a positive weight")
+    return mix
+
+
+def percentile(sorted_values, fraction):
+    """Return the nearest-rank percentile of an ascending list (0.0 if empty)."""
+    if not sorted_values:
+        return 0.0
+    rank = min(max(1, math.ceil(fraction * len(sorted_values))), len(sorted_values))
+    return sorted_values[rank - 1]
+
+
+class LoadStats:
+    """Latencies and error counts collected by all simulated clients."""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.client_failures = 0
+
+    def record(self, tool, seconds, ok):
+        self.latencies.setdefault(tool, []).append(seconds)
+        if not ok:
+            self.errors[tool] = self.errors.get(tool, 0) + 1
+
+    def summary(self, elapsed):
+        """Return throughput, error rate and latency percentiles (ms) per tool and overall."""
+        def describe(latencies, errors):
+            latencies = sorted(latencies)
+            stats = {
+                "calls": len(latencies),
+                "errors": errors,
+                "error_rate": errors / len(latencies) if latencies else 0.0,
+                "throughput": len(latencies) / elapsed if elapsed > 0 else 0.0,
+            }
+            for fraction in PERCENTILES:
+                stats[f"p{int(fraction * 100)}_ms"] = percentile(latencies, fraction) * 1000
+            stats["max_ms"] = latencies[-1] * 1000 if latencies else 0.0
+            return stats
+
+        tools = {tool: describe(latencies, self.errors.get(tool, 0))
+                 for tool, latencies in sorted(self.latencies.items())}
+        everything = [seconds for latencies in self.latencies.values() for seconds in latencies]
+        return {
+            "elapsed": elapsed,
+            "client_failures": self.client_failures,
+            "tools": tools,
+            "total": describe(everything, sum(self.errors.values())),
+        }
+
+
+def _is_error(result):
+    """Tool failures arrive either as MCP errors or as "Error: ..." results."""
+    return result.is_error or (isinstance(result.data, str) and result.data.startswith("Error:"))
+
+
+async def simulated_client(connect, mix, rng, ready, schedule, stats, call_timeout):
+    """
+    Open one MCP session and issue calls from the mix until the deadline.
+
+    ready is resolved once the session is open; schedule is then resolved
+    with (measure_from, deadline) when every client is connected, so session
+    start-up is not counted as load.
+    """
+    tools = list(mix)
+    weights = [mix[tool] for tool in tools]
+    try:
+        async with connect() as client:
+            ready.set_result(True)
+            measure_from, deadline = await schedule
+            while time.perf_counter() < deadline:
+                tool = rng.choices(tools, weights)[0]
+                arguments = ARGUMENT_FACTORIES[tool](rng)
+                started = time.perf_counter()
+                try:
+                    result = await client.call_tool(tool, arguments, timeout=call_timeout,
+                                                    raise_on_error=False)
+                    ok = not _is_error(result)
+                except Exception:
+                    ok = False
+                if started >= measure_from:
+                    stats.record(tool, time.perf_counter() - started, ok)
+    except Exception:
+        stats.client_failures += 1
+    finally:
+        # A client that failed to connect must not hold up the others
+        if not ready.done():
+            ready.set_result(False)
+
+
+async def run_load(connect, clients=4, duration=10.0, warmup=1.0, mix=None, seed=0,
+                   call_timeout=30.0, connect_timeout=60.0):
+    """
+    Drive a server with concurrent simulated clients and return the summary.
+
+    connect() must return a new, unopened fastmcp Client each time it is
+    called. Calls made in the first `warmup` seconds are not recorded.
+    """
+    mix = dict(mix or DEFAULT_MIX)
+    stats = LoadStats()
+    loop = asyncio.get_running_loop()
+    ready = [loop.create_future() for _ in range(clients)]
+    schedule = loop.create_future()
+    rng = random.Random(seed)
+    tasks = [asyncio.ensure_future(simulated_client(connect, mix, random.Random(rng.random()), ready[index],
+                                                    schedule, stats, call_timeout))
+             for index in range(clients)]
+    await asyncio.wait(ready, timeout=connect_timeout)
+
+    measure_from = time.perf_counter() + warmup
+    schedule.set_result((measure_from, measure_from + duration))
+    await asyncio.gather(*tasks)
+    return stats.summary(min(duration, max(0.0, time.perf_counter() - measure_from)))
+
+
+def free_port(host="127.0.0.1"):
+    """Return a TCP port that is currently free on host."""
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+def start_http_server(port, workers=1, env=None, timeout=60.0):
+    """Launch demo.py over HTTP and wait until it accepts connections."""
+    process = subprocess.Popen(
+        [sys.executable, DEMO_PATH, "--transport", "http", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers)],
+        cwd=project_root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"HTTP server exited with code {process.returncode}")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    stop_server(process)
+    raise RuntimeError(f"HTTP server did not start within {timeout:g}s")
+
+
+def stop_server(process):
+    """Stop a server started by start_http_server."""
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def client_factory(transport, env=None, url=None):
+    """Return connect() for a transport: each call builds a new Client."""
+    if transport == "stdio":
+        # Keep the servers' start-up banners and logs out of the report
+        log_file = open(os.devnull, "w")
+        return lambda: Client(StdioTransport(sys.executable, [DEMO_PATH], env=env, cwd=project_root,
+                                             log_file=log_file))
+    if transport == "http":
+        return lambda: Client(StreamableHttpTransport(url))
+    if transport == "memory":
+        from demo import mcp
+
+        return lambda: Client(mcp)
+    raise ValueError(f"Unknown transport {transport!r}")
+
+
+def format_report(summary, out=sys.stdout):
+    """Print the summary as a table, one row per tool plus the total."""
+    columns = ["calls", "errors", "calls/s"] + [f"p{int(f * 100)} ms" for f in PERCENTILES] + ["max ms"]
+    print(f"{'tool':<12}" + "".join(f"{column:>11}" for column in columns), file=out)
+
+    def row(name, stats):
+        values = [f"{stats['calls']}", f"{stats['error_rate']:.1%}", f"{stats['throughput']:.1f}"]
+        values += [f"{stats[f'p{int(f * 100)}_ms']:.2f}" for f in PERCENTILES]
+        values.append(f"{stats['max_ms']:.2f}")
+        print(f"{name:<12}" + "".join(f"{value:>11}" for value in values), file=out)
+
+    for tool, stats in summary["tools"].items():
+        row(tool, stats)
+    row("total", summary["total"])
+    if summary["client_failures"]:
+        print(f"{summary['client_failures']} client(s) failed to connect or lost their session", file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive the demo MCP server with simulated clients.")
+    parser.add_argument("--transport", choices=["stdio", "http", "memory"], default="stdio",
+                        help="how clients reach the server (default stdio)")
+    parser.add_argument("--clients", type=int, default=4, help="concurrent simulated clients (default 4)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of measured load (default 10)")
+    parser.add_argument("--warmup", type=float, default=1.0,
+                        help="seconds of unmeasured load before measuring (default 1)")
+    parser.add_argument("--mix", default=",".join(f"{tool}={weight}" for tool, weight in DEFAULT_MIX.items()),
+                        help="weighted tool mix, e.g. add=4,calculate=4,greet=2")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for the call sequence")
+    parser.add_argument("--call-timeout", type=float, default=30.0,
+                        help="seconds before a call counts as failed (default 30)")
+    parser.add_argument("--url", help="http: use this running server instead of starting one")
+    parser.add_argument("--server-workers", type=int, default=1,
+                        help="http: server processes to start (default 1)")
+    parser.add_argument("--server-env", action="append", default=[], metavar="NAME=VALUE",
+                        help="environment variable for started servers (repeatable)")
+    parser.add_argument("--json", metavar="PATH", help="also write the configuration and results as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.clients < 1:
+        parser.error("--clients must be at least 1")
+    env = dict(os.environ)
+    for item in args.server_env:
+        name, sep, value = item.partition("=")
+        if not sep:
+            parser.error(f"--server-env expects NAME=VALUE, got {item!r}")
+        env[name] = value
+    if args.server_env and args.transport == "memory":
+        # The in-process server reads its settings when demo is imported
+        os.environ.update(env)
+
+    server = None
+    url = args.url
+    if args.transport == "http" and url is None:
+        port = free_port()
+        server = start_http_server(port, args.server_workers, env)
+        url = f"http://127.0.0.1:{port}/mcp"
+    try:
+        print(f"transport={args.transport} clients={args.clients} duration={args.duration:g}s "
+              f"mix={','.join(f'{tool}={weight:g}' for tool, weight in mix.items())}")
+        summary = asyncio.run(run_load(client_factory(args.transport, env, url), args.clients,
+                                       args.duration, args.warmup, mix, args.seed, args.call_timeout))
+    finally:
+        if server is not None:
+            stop_server(server)
+
+    format_report(summary)
+    if args.json:
+        config = {key: value for key, value in vars(args).items() if key != "json"}
+        config["mix"] = mix
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "results": summary}, f, indent=2)
+    return summary["total"]["calls"] > 0 and not summary["client_failures"]
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,153 @@
+"""Benchmark runner for FastMCP demo.
+
+Runs every benchmark in bench_tools.py and bench_server.py, prints the
+time per call, and can save the results as a named baseline or compare a
+run against one.
+
+Usage:
+    python benchmarks/run_benchmarks.py                    # run everything
+    python benchmarks/run_benchmarks.py -k calculate       # only matching names
+    python benchmarks/run_benchmarks.py --save main        # write baselines/main.json
+    python benchmarks/run_benchmarks.py --compare main     # exit 1 on regressions
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+
+# Add the project root to the path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# A run is a regression when its median is this much slower than the baseline
+DEFAULT_THRESHOLD = 0.10
+
+# Each sample runs enough loops to take at least this long, in seconds
+MIN_SAMPLE_TIME = 0.05
+
+
+def collect_benchmarks(pattern=None):
+    """Return all (name, bench) pairs, optionally filtered by substring."""
+    from benchmarks import bench_server, bench_tools
+
+    benchmarks = bench_tools.get_benchmarks() + bench_server.get_benchmarks()
+    if pattern:
+        benchmarks = [(name, bench) for name, bench in benchmarks if pattern in name]
+    return benchmarks
+
+
+def calibrate(bench, min_time=MIN_SAMPLE_TIME):
+    """Find a loop count that makes one sample take at least min_time."""
+    loops = 1
+    while True:
+        if bench(loops) >= min_time or loops >= 1 << 24:
+            return loops
+        loops *= 2
+
+
+def measure(bench, samples=7, min_time=MIN_SAMPLE_TIME):
+    """Return per-call timing statistics for one benchmark, in seconds."""
+    loops = calibrate(bench, min_time)
+    timings = [bench(loops) / loops for _ in range(samples)]
+    return {
+        "median": statistics.median(timings),
+        "min": min(timings),
+        "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        "loops": loops,
+        "samples": samples,
+    }
+
+
+def run(benchmarks, samples=7, min_time=MIN_SAMPLE_TIME, out=sys.stdout):
+    """Measure each benchmark and print a results table as it goes."""
+    results = {}
+    print(f"{'benchmark':<36} {'median':>12} {'min':>12} {'stdev':>10}", file=out)
+    for name, bench in benchmarks:
+        stats = measure(bench, samples, min_time)
+        results[name] = stats
+        print(f"{name:<36} {format_time(stats['median']):>12} {format_time(stats['min']):>12} "
+              f"{stats['stdev'] / stats['median']:>9.1%}", file=out)
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, out=sys.stdout):
+    """Print a comparison with a baseline and return the names that regressed."""
+    regressions = []
+    print(f"\n{'benchmark':<36} {'baseline':>12} {'current':>12} {'change':>9}", file=out)
+    for name, stats in results.items():
+        if name not in baseline:
+            print(f"{name:<36} {'-':>12} {format_time(stats['median']):>12} {'new':>9}", file=out)
+            continue
+        before = baseline[name]["median"]
+        change = stats["median"] / before - 1
+        flag = "  REGRESSION" if change > threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<36} {format_time(before):>12} {format_time(stats['median']):>12} "
+              f"{change:>+9.1%}{flag}", file=out)
+    return regressions
+
+
+def format_time(seconds):
+    """Format a duration with a readable unit."""
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def baseline_path(name):
+    """Return the file a named baseline is stored in."""
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def save_baseline(name, results):
+    """Write results as a named baseline along with the environment they came from."""
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    payload = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "benchmarks": results,
+    }
+    with open(baseline_path(name), "w") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+
+
+def load_baseline(name):
+    """Read the benchmark results of a named baseline."""
+    with open(baseline_path(name), "r") as f:
+        return json.load(f)["benchmarks"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run FastMCP demo benchmarks.")
+    parser.add_argument("-k", dest="pattern", help="only run benchmarks whose name contains this")
+    parser.add_argument("--save", metavar="NAME", help="save results as baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="compare with baselines/NAME.json")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a benchmark counts as a regression")
+    parser.add_argument("--samples", type=int, default=7, help="samples per benchmark")
+    parser.add_argument("--quick", action="store_true", help="fewer, shorter samples")
+    args = parser.parse_args(argv)
+
+    samples, min_time = (3, 0.01) if args.quick else (args.samples, MIN_SAMPLE_TIME)
+    results = run(collect_benchmarks(args.pattern), samples, min_time)
+
+    if args.save:
+        save_baseline(args.save, results)
+        print(f"\nSaved baseline to {baseline_path(args.save)}")
+    if args.compare:
+        regressions = compare(results, load_baseline(args.compare), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            return False
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -1,17 +1,344 @@
+import argparse
+import atexit
+import inspect
+import os
+import threading
+from contextlib import asynccontextmanager
+
 from fastmcp import FastMCP
-from tools.math_tools import add, multiply, calculate
-from tools.text_tools import greet
+from tools.cache import TTLCache
+from tools.instrumentation import ToolMetrics
+from tools.registry import LazyTool, import_target, load_manifest
+from tools.workers import (DEFAULT_MAX_TASKS_PER_WORKER, DEFAULT_PENDING_PER_THREAD, DEFAULT_TIMEOUT,
+                           ProcessWorkerPool, ThreadOffload, is_worker_process)
+
+
+@asynccontextmanager
+async def serve_lifespan(server):
+    """Warm up the process pools when the server starts serving."""
+    start_process_pools()
+    yield {}
+
 
 # Create your MCP server
-mcp = FastMCP("Demo ")
+mcp = FastMCP("Demo ", lifespan=serve_lifespan)
+
+# Call counts and latency histograms for every registered tool
+metrics = ToolMetrics()
+
+
+# Memoized results of pure tools: repeated calls with the same arguments are
+# answered from this cache without running or re-encoding the tool. Set
+# RESULT_CACHE_TOOLS to a comma-separated list of tools to memoize (empty
+# disables it) and RESULT_CACHE_TTL=0 to keep entries until evicted
+RESULT_CACHE_TOOLS = [name.strip() for name in os.environ.get(
+    "RESULT_CACHE_TOOLS", "add,multiply,calculate,calculate_batch,greet").split(",") if name.strip()]
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", "4096"))
+RESULT_CACHE_BYTES = int(os.environ.get("RESULT_CACHE_BYTES", str(16 * 1024 * 1024)))
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", "300"))
+
+result_cache = None
+if RESULT_CACHE_TOOLS:
+    result_cache = TTLCache(RESULT_CACHE_SIZE, RESULT_CACHE_BYTES, RESULT_CACHE_TTL or None)
+
+
+# Where each tool runs:
+#   inline  - directly on the event loop; for tools that finish in microseconds
+#   thread  - on a shared, bounded thread pool, so slow calls do not hold up
+#             other clients
+#   process - in the tool's own pool of worker processes, with a hard deadline
+#             per call
+# Async tools (the streaming ones) always run on the event loop and offload
+# their own work
+# Set TOOL_POLICY to override tools, e.g. "calculate=process,greet=thread"
+EXECUTION_POLICIES = ("inline", "thread", "process")
+DEFAULT_TOOL_POLICY = {
+    "add": "inline",
+    "multiply": "inline",
+    "greet": "inline",
+    "calculate_stream": "inline",
+    "greet_stream": "inline",
+}
+
+# Thread pool shared by every thread-policy tool; calls beyond
+# THREAD_MAX_PENDING (queued or running) are refused rather than queued
+THREAD_WORKERS = int(os.environ.get("THREAD_WORKERS", "0")) or None
+THREAD_MAX_PENDING = int(os.environ.get("THREAD_MAX_PENDING", "0")) or None
+
+# Worker process pools, one per process-policy tool. The older
+# CALCULATE_WORKERS setting still moves calculate into a pool of that size
+CALCULATE_WORKERS = int(os.environ.get("CALCULATE_WORKERS", "0"))
+PROCESS_WORKERS = int(os.environ.get("PROCESS_WORKERS", CALCULATE_WORKERS)) or None
+PROCESS_TIMEOUT = float(os.environ.get("PROCESS_TIMEOUT",
+                                       os.environ.get("CALCULATE_TIMEOUT", DEFAULT_TIMEOUT)))
+PROCESS_MAX_TASKS_PER_WORKER = int(os.environ.get(
+    "PROCESS_MAX_TASKS_PER_WORKER",
+    os.environ.get("CALCULATE_MAX_TASKS_PER_WORKER", DEFAULT_MAX_TASKS_PER_WORKER)))
+PROCESS_MAX_PENDING = int(os.environ.get("PROCESS_MAX_PENDING", "0")) or None
+
+BUSY_ERROR = "Error: Server is busy, try again later"
+
+
+def parse_tool_policy(spec, defaults):
+    """Merge a "tool=policy,..." override string into the default policies."""
+    policies = dict(defaults)
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        name, _, policy = item.partition("=")
+        policy = policy.strip()
+        if policy not in EXECUTION_POLICIES:
+            raise ValueError(f"Unknown execution policy {policy!r} for {name.strip()!r} "
+                             f"(expected one of {', '.join(EXECUTION_POLICIES)})")
+        policies[name.strip()] = policy
+    return policies
+
+
+manifest = load_manifest()
+default_policy = DEFAULT_TOOL_POLICY
+if CALCULATE_WORKERS > 0:
+    default_policy = dict(DEFAULT_TOOL_POLICY, calculate="process")
+tool_policy = parse_tool_policy(os.environ.get("TOOL_POLICY", ""), default_policy)
+for entry in manifest:
+    tool_policy.setdefault(entry["name"], "thread")
+
+thread_pool = None
+if "thread" in tool_policy.values():
+    thread_pool = ThreadOffload(THREAD_WORKERS, THREAD_MAX_PENDING, name="tool-thread")
+    atexit.register(thread_pool.shutdown)
+
+# Each process pool is fed by threads that wait on its workers; one thread
+# per accepted call keeps every call under the pool's deadline. Pools start
+# when a process begins serving (the server lifespan), or on their tool's
+# first call if that comes sooner. They never start at import time: this
+# module is re-imported by pool workers and by every HTTP worker process
+# while it bootstraps, and the HTTP supervisor process serves no calls
+process_pools = {}
+process_pools_lock = threading.Lock()
+
+
+def process_pool(name, target):
+    """Return the (pool, offload) pair running a process-policy tool, starting it on first use."""
+    with process_pools_lock:
+        if name not in process_pools:
+            pool = ProcessWorkerPool(
+                target,
+                workers=PROCESS_WORKERS,
+                timeout=PROCESS_TIMEOUT,
+                max_tasks_per_worker=PROCESS_MAX_TASKS_PER_WORKER,
+            )
+            max_pending = PROCESS_MAX_PENDING or pool.size * DEFAULT_PENDING_PER_THREAD
+            offload = ThreadOffload(max_pending, max_pending, name=f"{name}-pool")
+            process_pools[name] = (pool, offload)
+            atexit.register(pool.shutdown)
+            atexit.register(offload.shutdown)
+        return process_pools[name]
+
+
+def start_process_pools():
+    """Start the pool of every blocking process-policy tool; its workers boot in the background."""
+    for entry in manifest:
+        if tool_policy[entry["name"]] == "process":
+            target = import_target(entry["target"])
+            if not inspect.iscoroutinefunction(target):
+                process_pool(entry["name"], target)
+
+
+# Optional on-disk cache of calculate() results, shared by every server
+# process that uses the same file (e.g. one per desktop session) and
+# preloaded with the most-used results at startup. Set CALCULATE_CACHE_PATH
+# to a SQLite file to enable it
+CALCULATE_CACHE_PATH = os.environ.get("CALCULATE_CACHE_PATH", "")
+CALCULATE_CACHE_MAX_ENTRIES = int(os.environ.get("CALCULATE_CACHE_MAX_ENTRIES", "100000"))
+CALCULATE_CACHE_WARM = int(os.environ.get("CALCULATE_CACHE_WARM", "1000"))
+
+calculate_store = None
+if CALCULATE_CACHE_PATH and not is_worker_process():
+    from tools.disk_cache import DiskCache
+
+    calculate_store = DiskCache(CALCULATE_CACHE_PATH, CALCULATE_CACHE_MAX_ENTRIES, CALCULATE_CACHE_WARM)
+    atexit.register(calculate_store.close)
+
+
+def persist_calculate(fn):
+    """Serve calculate() from the on-disk cache; error results are not stored."""
+    from tools.math_tools import calculate_cache_key
+
+    return calculate_store.wrap(fn, calculate_cache_key,
+                                store=lambda result: not (isinstance(result, str) and result.startswith("Error:")))
+
+
+def timeout_error(seconds):
+    """Result of a process-pool call that missed its deadline."""
+    return f"Error: Calculation timed out after {seconds:g}s"
+
+
+def busy_error():
+    """Result of a call refused because its pool is full."""
+    return BUSY_ERROR
+
+
+STREAM_TOOLS = ("calculate_stream", "greet_stream")
+
+
+def share_thread_pool(fn):
+    """Produce the streaming tools' chunks on the shared thread pool, under its limit."""
+    from tools.stream_tools import set_thread_pool
+
+    set_thread_pool(thread_pool, busy_error)
+    return fn
+
+
+def register_lazy(entry, wrap=None):
+    """
+    Register a tool from its manifest entry; its module is imported on first call.
+
+    The tool runs according to its execution policy. wrap, if given, is
+    applied to the imported function (outside any process pool, inside the
+    thread offload) before it is instrumented. The tool's schema always
+    comes from the manifest.
+    """
+    name = entry["name"]
+    policy = tool_policy[name]
+
+    def load(fn):
+        blocking = not inspect.iscoroutinefunction(fn)
+        pooled = blocking and policy == "process"
+        if pooled:
+            pool, offload = process_pool(name, fn)
+            fn = pool.wrap(fn, timeout_error)
+        # Applied around the pool, so it runs in this process
+        if wrap is not None:
+            fn = wrap(fn)
+        if blocking and policy == "thread":
+            fn = thread_pool.wrap(fn, busy_error)
+        elif pooled:
+            fn = offload.wrap(fn, busy_error)
+        return metrics.instrument(fn, name=name)
+
+    memo = result_cache if name in RESULT_CACHE_TOOLS else None
+    mcp.add_tool(LazyTool.from_manifest(entry, wrap=load, memo=memo, metrics=metrics,
+                                        run_in_thread=policy != "inline"))
+
+
+# Register the tools package from its precomputed manifest (tools/manifest.json),
+# so startup neither imports the tool modules nor builds their schemas
+for entry in manifest:
+    if entry["name"] == "calculate" and calculate_store is not None:
+        register_lazy(entry, wrap=persist_calculate)
+    elif entry["name"] in STREAM_TOOLS:
+        register_lazy(entry, wrap=share_thread_pool)
+    else:
+        register_lazy(entry)
+
+if tool_policy["calculate"] == "process":
+    @mcp.tool()
+    def calculate_pool_stats() -> dict:
+        """Report worker count, queue depth and call counters for the calculate pool."""
+        # Empty until the first calculate call starts the pool
+        return process_pools["calculate"][0].metrics() if "calculate" in process_pools else {}
+
+
+@mcp.tool()
+def execution_stats() -> dict:
+    """Report each tool's execution policy and the load on the thread and process pools."""
+    return {
+        "policies": dict(tool_policy),
+        "thread_pool": thread_pool.metrics() if thread_pool is not None else None,
+        "process_pools": {name: dict(pool.metrics(), rejected=offload.metrics()["rejected"])
+                          for name, (pool, offload) in process_pools.items()},
+    }
+
+
+if calculate_store is not None:
+    @mcp.tool()
+    def calculate_store_stats() -> dict:
+        """Report hits, misses, evictions and size of the on-disk calculate cache."""
+        return calculate_store.info()._asdict()
+
+
+if result_cache is not None:
+    @mcp.tool()
+    def result_cache_stats() -> dict:
+        """Report hits, misses, evictions and size of the memoized tool results."""
+        return result_cache.info()._asdict()
+
+
+@mcp.tool()
+def server_stats() -> dict:
+    """Report call counts, error counts and latency percentiles (ms) for every tool."""
+    return metrics.snapshot()
+
+
+# HTTP defaults sized for a multicore host: one server process per core,
+# each accepting up to HTTP_MAX_CONCURRENCY requests at once
+HTTP_HOST = "127.0.0.1"
+HTTP_PORT = 8000
+HTTP_WORKERS = os.cpu_count() or 1
+HTTP_MAX_CONCURRENCY = 256
+HTTP_KEEP_ALIVE = 30
+HTTP_BACKLOG = 2048
+
+
+def create_http_app():
+    """Build the ASGI app each HTTP worker process serves (uvicorn factory)."""
+    # Requests from one client may land on any worker, so sessions cannot
+    # live in a single process
+    return mcp.http_app(stateless_http=True)
+
+
+def parse_args(argv=None):
+    """Parse the server's command-line options."""
+    parser = argparse.ArgumentParser(description="Run the FastMCP demo server.")
+    parser.add_argument("--transport", choices=["stdio", "http", "sse"], default="stdio",
+                        help="stdio serves one client (default); http/sse serve many over the network")
+    parser.add_argument("--host", default=HTTP_HOST, help=f"address to bind (default {HTTP_HOST})")
+    parser.add_argument("--port", type=int, default=HTTP_PORT, help=f"port to bind (default {HTTP_PORT})")
+    parser.add_argument("--path", default=None, help="endpoint path (default /mcp, or /sse for sse)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"server processes for http (default: one per CPU, {HTTP_WORKERS}); "
+                             "sse always runs one")
+    parser.add_argument("--max-concurrency", type=int, default=HTTP_MAX_CONCURRENCY,
+                        help="requests in flight per worker before new ones get HTTP 503 "
+                             f"(default {HTTP_MAX_CONCURRENCY})")
+    parser.add_argument("--keep-alive", type=int, default=HTTP_KEEP_ALIVE,
+                        help=f"seconds to keep idle connections open (default {HTTP_KEEP_ALIVE})")
+    parser.add_argument("--backlog", type=int, default=HTTP_BACKLOG,
+                        help=f"pending connections the socket queues (default {HTTP_BACKLOG})")
+    args = parser.parse_args(argv)
+    if args.workers is None:
+        args.workers = HTTP_WORKERS if args.transport == "http" else 1
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.transport == "sse" and args.workers > 1:
+        parser.error("sse keeps per-process sessions; use --workers 1 or --transport http")
+    return args
+
+
+def main(argv=None):
+    """Start the server on the transport selected on the command line."""
+    args = parse_args(argv)
+    if args.transport == "stdio":
+        mcp.run()
+        return
+
+    uvicorn_config = {
+        "limit_concurrency": args.max_concurrency,
+        "timeout_keep_alive": args.keep_alive,
+        "backlog": args.backlog,
+    }
+    if args.workers == 1:
+        mcp.run(transport=args.transport, host=args.host, port=args.port, path=args.path,
+                uvicorn_config=uvicorn_config)
+        return
+
+    import uvicorn
 
-# Register math tools
-mcp.tool()(add)
-mcp.tool()(multiply)
-mcp.tool()(calculate)
+    if args.path:
+        os.environ["FASTMCP_STREAMABLE_HTTP_PATH"] = args.path
+    uvicorn.run("demo:create_http_app", factory=True, host=args.host, port=args.port,
+                workers=args.workers, **uvicorn_config)
 
-# Register text tools
-mcp.tool()(greet)
 
 if __name__ == "__main__":
-    mcp.run()
+    main()
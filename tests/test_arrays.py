@@ -0,0 +1,82 @@
+"""Tests for the binary array encoding."""
+
+from tools.arrays import BinaryArray, decode_array, decode_values, encode_array
+import unittest
+import base64
+import struct
+import sys
+import os
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Add the parent directory to the path so we can import tools
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestBinaryArrays(unittest.TestCase):
+    """Test cases for encode_array and decode_array."""
+
+    def test_wire_format(self):
+        """Test that data is base64 of little-endian values."""
+        encoded = encode_array([1.0, -2.5])
+        self.assertEqual((encoded.dtype, encoded.shape), ("float64", [2]))
+        self.assertEqual(base64.b64decode(encoded.data), struct.pack("<2d", 1.0, -2.5))
+        encoded = encode_array([1, -(2 ** 63)], "int64")
+        self.assertEqual(base64.b64decode(encoded.data), struct.pack("<2q", 1, -(2 ** 63)))
+
+    def test_round_trip(self):
+        """Test that values come back unchanged, from a model or a plain dict."""
+        values = [0.1, float("inf"), -0.0, 1e-310]
+        view = decode_array(encode_array(values).model_dump(), 10)
+        self.assertEqual(view.format, "d")
+        self.assertEqual(view.tolist(), values)
+        self.assertEqual(decode_array(encode_array([7, -7], "int64"), 10).tolist(), [7, -7])
+        self.assertEqual(decode_array(encode_array([]), 10).tolist(), [])
+
+    def test_invalid_payloads(self):
+        """Test that malformed payloads raise ValueError before decoding."""
+        payloads = [
+            {"shape": [2], "data": "AAAAAAAA8D8="},
+            {"shape": [1], "data": "AAAAAAAA8D8"},
+            {"shape": [1], "data": "AAAAAAAA8D8!"},
+            {"dtype": "int32", "shape": [1], "data": "AAAAAAAA8D8="},
+            {"shape": [-1], "data": ""},
+            {"data": ""},
+            [1.0],
+        ]
+        for payload in payloads:
+            with self.subTest(payload=payload), self.assertRaises(ValueError):
+                decode_array(payload, 10)
+        with self.assertRaisesRegex(ValueError, "too many values"):
+            decode_array({"shape": [1000, 1000], "data": ""}, 10)
+        with self.assertRaises(ValueError):
+            encode_array([1.0], "float32")
+
+    def test_decode_values(self):
+        """Test that lists pass through and binary arrays are flattened."""
+        values = [1.0, 2.0]
+        self.assertIs(decode_values(values, 10), values)
+        grid = BinaryArray(shape=[2, 2], data=encode_array([1.0, 2.0, 3.0, 4.0]).data)
+        self.assertEqual(decode_values(grid, 10).tolist(), [1.0, 2.0, 3.0, 4.0])
+        self.assertTrue(decode_values({"shape": [1], "data": ""}, 10).startswith("Error: Invalid binary array"))
+
+    @unittest.skipIf(np is None, "NumPy is not installed")
+    def test_numpy_buffers(self):
+        """Test zero-copy encoding and decoding of NumPy arrays, keeping their shape."""
+        matrix = np.arange(6, dtype=np.int64).reshape(2, 3)
+        encoded = encode_array(matrix, "int64")
+        self.assertEqual(encoded.shape, [2, 3])
+        decoded = np.asarray(decode_array(encoded, 6))
+        np.testing.assert_array_equal(decoded, matrix)
+        self.assertIsNotNone(decoded.base)
+        floats = np.linspace(0, 1, 7)
+        np.testing.assert_array_equal(np.asarray(decode_array(encode_array(floats), 7)), floats)
+        # Non-contiguous arrays are packed through a copy
+        self.assertEqual(encode_array(floats[::2]).shape, [4])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Smoke tests for the benchmark suite."""
+
+from benchmarks import load_test, run_benchmarks
+import unittest
+import asyncio
+import contextlib
+import io
+import json
+import tempfile
+import sys
+import os
+
+# Add the parent directory to the path so we can import benchmarks
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    """Check that every benchmark still runs and comparisons work."""
+
+    def test_every_benchmark_runs(self):
+        """Test that each benchmark completes one loop and reports a duration."""
+        benchmarks = run_benchmarks.collect_benchmarks()
+        names = [name for name, _ in benchmarks]
+        self.assertEqual(len(names), len(set(names)), "benchmark names must be unique")
+        for name, bench in benchmarks:
+            with self.subTest(benchmark=name):
+                self.assertGreaterEqual(bench(1), 0.0)
+
+    def test_compare_flags_regressions(self):
+        """Test that slower medians beyond the threshold are reported."""
+        baseline = {"fast": {"median": 1.0}, "slow": {"median": 1.0}}
+        results = {"fast": {"median": 1.05}, "slow": {"median": 1.5}, "new": {"median": 1.0}}
+        regressions = run_benchmarks.compare(results, baseline, threshold=0.1, out=io.StringIO())
+        self.assertEqual(regressions, ["slow"])
+
+
+class TestLoadTest(unittest.TestCase):
+    """Check the load generator's parsing, statistics and a short in-process run."""
+
+    def test_parse_mix(self):
+        """Test that mixes are parsed and invalid ones rejected."""
+        self.assertEqual(load_test.parse_mix("add=3, calculate=1.5,greet"),
+                         {"add": 3.0, "calculate": 1.5, "greet": 1.0})
+        for spec in ["divide=1", "add=x", "add=-1", "add=0", ""]:
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                load_test.parse_mix(spec)
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = list(range(1, 101))
+        self.assertEqual(load_test.percentile(values, 0.50), 50)
+        self.assertEqual(load_test.percentile(values, 0.99), 99)
+        self.assertEqual(load_test.percentile([7], 0.95), 7)
+        self.assertEqual(load_test.percentile([], 0.5), 0.0)
+
+    def test_summary(self):
+        """Test throughput, error rates and per-tool breakdown."""
+        stats = load_test.LoadStats()
+        for ms in (1, 2, 3, 4):
+            stats.record("add", ms / 1000, ok=True)
+        stats.record("calculate", 0.010, ok=False)
+        summary = stats.summary(elapsed=2.0)
+        self.assertEqual(summary["tools"]["add"]["calls"], 4)
+        self.assertEqual(summary["tools"]["add"]["throughput"], 2.0)
+        self.assertEqual(summary["tools"]["calculate"]["error_rate"], 1.0)
+        self.assertEqual(summary["total"]["calls"], 5)
+        self.assertEqual(summary["total"]["errors"], 1)
+        self.assertAlmostEqual(summary["total"]["max_ms"], 10.0)
+
+    def test_in_process_run(self):
+        """Test that concurrent clients complete calls against demo.mcp."""
+        summary = asyncio.run(load_test.run_load(load_test.client_factory("memory"), clients=3,
+                                                 duration=0.3, warmup=0.1))
+        self.assertGreater(summary["total"]["calls"], 0)
+        self.assertEqual(summary["total"]["errors"], 0)
+        self.assertEqual(summary["client_failures"], 0)
+        self.assertLessEqual(set(summary["tools"]), set(load_test.DEFAULT_MIX))
+
+    def test_failed_clients_are_counted(self):
+        """Test that a client that cannot connect is reported, not fatal."""
+        def connect():
+            raise ConnectionError("refused")
+
+        summary = asyncio.run(load_test.run_load(connect, clients=2, duration=0.1, warmup=0))
+        self.assertEqual(summary["client_failures"], 2)
+        self.assertEqual(summary["total"]["calls"], 0)
+
+    def test_command_line_writes_json(self):
+        """Test the CLI end to end with the in-memory transport."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = f"{directory}/load.json"
+            with contextlib.redirect_stdout(io.StringIO()):
+                ok = load_test.main(["--transport", "memory", "--clients", "2", "--duration", "0.2",
+                                     "--warmup", "0", "--mix", "add=1", "--json", path])
+            self.assertTrue(ok)
+            with open(path, encoding="utf-8") as f:
+                report = json.load(f)
+        self.assertEqual(report["config"]["mix"], {"add": 1.0})
+        self.assertEqual(list(report["results"]["tools"]), ["add"])
+
+
+if __name__ == "__main__":
+    unittest.main()
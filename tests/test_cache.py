@@ -0,0 +1,111 @@
+"""Tests for the bounded caches in tools.cache."""
+
+from tools.cache import TTLCache
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import tools
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeClock:
+    """Manually advanced replacement for time.monotonic."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTTLCache(unittest.TestCase):
+    """Test cases for TTLCache."""
+
+    def test_get_and_put(self):
+        """Test that stored values come back and misses return the default."""
+        cache = TTLCache(maxsize=4)
+        cache.put("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("b", "missing"), "missing")
+        info = cache.info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 2, 1))
+
+    def test_entry_limit_evicts_least_recently_used(self):
+        """Test that the oldest unused entry goes first when the cache is full."""
+        cache = TTLCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.info().evictions, 1)
+
+    def test_byte_limit(self):
+        """Test that entries are evicted until the total size fits."""
+        cache = TTLCache(maxsize=100, maxbytes=10)
+        cache.put("a", 1, size=4)
+        cache.put("b", 2, size=4)
+        cache.put("c", 3, size=4)
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn("a", cache)
+        self.assertEqual(cache.info().currbytes, 8)
+
+    def test_oversized_value_is_not_stored(self):
+        """Test that a value larger than the whole cache is rejected."""
+        cache = TTLCache(maxsize=100, maxbytes=10)
+        cache.put("a", 1, size=4)
+        self.assertFalse(cache.put("big", 2, size=11))
+        self.assertNotIn("big", cache)
+        self.assertIn("a", cache)
+
+    def test_replacing_a_key_updates_its_size(self):
+        """Test that storing a key twice counts its size once."""
+        cache = TTLCache(maxsize=10, maxbytes=100)
+        cache.put("a", 1, size=30)
+        cache.put("a", 2, size=10)
+        self.assertEqual(cache.get("a"), 2)
+        self.assertEqual(cache.info().currbytes, 10)
+
+    def test_entries_expire(self):
+        """Test that entries older than the TTL are treated as misses."""
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+        cache.put("a", 1)
+        clock.now = 4.9
+        self.assertEqual(cache.get("a"), 1)
+        clock.now = 5.0
+        self.assertIsNone(cache.get("a"))
+        info = cache.info()
+        self.assertEqual((info.expirations, info.currsize, info.currbytes), (1, 0, 0))
+
+    def test_no_ttl_keeps_entries(self):
+        """Test that entries never expire without a TTL."""
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, clock=clock)
+        cache.put("a", 1)
+        clock.now = 1e9
+        self.assertEqual(cache.get("a"), 1)
+
+    def test_clear(self):
+        """Test that clear drops entries and counters."""
+        cache = TTLCache(maxsize=10)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.clear()
+        self.assertEqual(cache.info()[:6], (0, 0, 0, 0, 10, 0))
+
+    def test_invalid_bounds(self):
+        """Test that nonsensical bounds are rejected."""
+        with self.assertRaises(ValueError):
+            TTLCache(maxsize=0)
+        with self.assertRaises(ValueError):
+            TTLCache(maxbytes=0)
+        with self.assertRaises(ValueError):
+            TTLCache(ttl=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
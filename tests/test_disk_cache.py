@@ -0,0 +1,133 @@
+"""Tests for the persistent SQLite result cache."""
+
+from tools.disk_cache import EVICT_EVERY, DiskCache
+from tools.math_tools import calculate, calculate_cache_key
+import unittest
+import subprocess
+import tempfile
+import sys
+import os
+
+# Add the parent directory to the path so we can import tools
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestDiskCache(unittest.TestCase):
+    """Test cases for DiskCache."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "results.db")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def open(self, **kwargs):
+        cache = DiskCache(self.path, **kwargs)
+        self.addCleanup(cache.close)
+        return cache
+
+    def test_round_trip(self):
+        """Test that JSON values of every result type come back unchanged."""
+        cache = self.open()
+        values = {"int": 2 ** 200, "float": 0.1, "error": "Error: Division by zero", "list": [1, 2.5]}
+        for key, value in values.items():
+            cache.put(key, value)
+        for key, value in values.items():
+            self.assertEqual(cache.get(key), value)
+        self.assertIsNone(cache.get("missing"))
+        self.assertEqual(cache.get("missing", "default"), "default")
+
+    def test_entries_survive_reopening(self):
+        """Test that a new process (a new DiskCache) sees earlier results."""
+        cache = self.open()
+        cache.put("2 + 2", 4)
+        cache.close()
+        reopened = self.open(warm=0)
+        self.assertEqual(reopened.get("2 + 2"), 4)
+        self.assertEqual(reopened.info().hits, 1)
+
+    def test_warm_start_preloads_hottest_entries(self):
+        """Test that the most-hit entries are loaded into memory on open."""
+        cache = self.open()
+        for i in range(10):
+            cache.put(f"k{i}", i)
+        for _ in range(3):
+            cache.get("k7")
+        cache.get("k2")
+        cache.close()
+
+        reopened = self.open(warm=2)
+        self.assertEqual(reopened.warmed, 2)
+        self.assertEqual([key for key, _ in reopened.hottest(2)], ["k7", "k2"])
+        self.assertEqual(reopened.get("k7"), 7)
+        info = reopened.info()
+        self.assertEqual((info.memory_hits, info.hits), (1, 0))
+
+    def test_least_used_entries_are_evicted(self):
+        """Test that the file stays bounded and keeps frequently hit entries."""
+        cache = self.open(maxsize=50, memory_size=1)
+        cache.put("popular", 1)
+        cache.get("other")
+        for _ in range(5):
+            cache.get("popular")
+            cache.get("other")  # keep "popular" out of the one-entry memory front
+        # Eviction runs every EVICT_EVERY stores, the last one right here
+        for i in range(EVICT_EVERY * 2 - 1):
+            cache.put(f"k{i}", i)
+        info = cache.info()
+        self.assertLessEqual(info.currsize, 50)
+        self.assertGreater(info.evictions, 0)
+        self.assertEqual(cache.get("popular"), 1)
+
+    def test_processes_share_the_file(self):
+        """Test concurrent writers in two processes."""
+        script = (
+            "import sys; sys.path.insert(0, sys.argv[1])\n"
+            "from tools.disk_cache import DiskCache\n"
+            "cache = DiskCache(sys.argv[2])\n"
+            "for i in range(200): cache.put(f'child{i}', i)\n"
+            "cache.close()\n"
+        )
+        child = subprocess.Popen([sys.executable, "-c", script, PROJECT_ROOT, self.path])
+        cache = self.open()
+        for i in range(200):
+            cache.put(f"parent{i}", i)
+        self.assertEqual(child.wait(timeout=60), 0)
+        self.assertEqual(cache.info().errors, 0)
+        self.assertEqual(cache.info().currsize, 400)
+        self.assertEqual(cache.get("child199"), 199)
+
+    def test_wrap_caches_by_key(self):
+        """Test the calculate() wrapper: float results are stored, errors and other modes are not."""
+        cache = self.open()
+        calls = []
+
+        def counted(expression, mode="float", precision=28):
+            calls.append(expression)
+            return calculate(expression, mode, precision)
+
+        cached = cache.wrap(counted, calculate_cache_key,
+                            store=lambda result: not (isinstance(result, str) and result.startswith("Error:")))
+        self.assertEqual(cached("2 +  2"), 4)
+        self.assertEqual(cached(" 2 + 2 "), 4)
+        self.assertEqual(cached("1 / 0"), "Error: Division by zero")
+        self.assertEqual(cached("1 / 0"), "Error: Division by zero")
+        self.assertEqual(cached("1 / 3", mode="fraction"), "1/3")
+        self.assertEqual(cached("1 / 3", mode="fraction"), "1/3")
+        self.assertEqual(calls, ["2 +  2", "1 / 0", "1 / 0", "1 / 3", "1 / 3"])
+        self.assertEqual(cached.__name__, "counted")
+
+    def test_database_errors_become_misses(self):
+        """Test that a broken database does not fail the caller."""
+        cache = DiskCache(self.path)
+        cache._conn.close()
+        cache.put("key", 1)
+        self.assertEqual(cache.get("other", "default"), "default")
+        self.assertGreaterEqual(cache.info().errors, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,342 @@
+"""Tests for the safe expression engine."""
+
+from tools.expression import (CONSTANTS, DECIMAL_MODE, FRACTION_MODE, FUNCTIONS, MAX_DEPTH, MAX_EXPRESSION_LENGTH,
+                              NUMERIC_MODES, ExpressionError, ExpressionLimits, compile_expression, estimate_cost,
+                              parse)
+from decimal import Decimal, localcontext
+from fractions import Fraction
+import unittest
+import math
+import sys
+import os
+
+# Add the parent directory to the path so we can import tools
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestCompileExpression(unittest.TestCase):
+    """Test cases for compiling and evaluating expressions."""
+
+    def test_arithmetic(self):
+        """Test that every supported operator evaluates like Python."""
+        cases = {
+            "2 + 3": 5,
+            "10 - 4": 6,
+            "3 * 4": 12,
+            "7 / 2": 3.5,
+            "7 // 2": 3,
+            "10 % 3": 1,
+            "2 ** 10": 1024,
+            "-5 + +2": -3,
+        }
+        for expression, expected in cases.items():
+            with self.subTest(expression=expression):
+                self.assertEqual(compile_expression(expression)(), expected)
+
+    def test_functions_and_constants(self):
+        """Test calls into the function table and named constants."""
+        self.assertEqual(compile_expression("sqrt(16)")(), 4.0)
+        self.assertEqual(compile_expression("max(1, 5, 3)")(), 5)
+        self.assertEqual(compile_expression("round(2.567, 2)")(), 2.57)
+        self.assertAlmostEqual(compile_expression("sin(pi / 2)")(), 1.0)
+        self.assertAlmostEqual(compile_expression("log(e)")(), 1.0)
+
+    def test_shared_tables_are_read_only(self):
+        """Test that callers cannot mutate the shared function and constant tables."""
+        with self.assertRaises(TypeError):
+            FUNCTIONS["open"] = open
+        with self.assertRaises(TypeError):
+            CONSTANTS["pi"] = 3
+
+    def test_evaluator_is_reusable(self):
+        """Test that a compiled evaluator can be called repeatedly."""
+        evaluator = compile_expression("cos(0) * 3")
+        self.assertEqual(evaluator(), 3.0)
+        self.assertEqual(evaluator(), 3.0)
+
+    def test_rejects_unknown_names(self):
+        """Test that names outside the whitelist are rejected."""
+        for expression in ["abc + 1", "sin", "__builtins__", "True"]:
+            with self.subTest(expression=expression):
+                with self.assertRaises(ExpressionError):
+                    compile_expression(expression)
+
+    def test_rejects_unsafe_syntax(self):
+        """Test that calls, attributes and literals outside the grammar are rejected."""
+        for expression in [
+            "__import__('os')",
+            "open('/etc/passwd')",
+            "(1).__class__",
+            "'abc'",
+            "1j",
+            "[1, 2]",
+            "1 < 2",
+            "sqrt(x=4)",
+            "max(*[1, 2])",
+            "(lambda: 1)()",
+        ]:
+            with self.subTest(expression=expression):
+                with self.assertRaises(ExpressionError):
+                    compile_expression(expression)
+
+    def test_syntax_errors_propagate(self):
+        """Test that malformed text raises SyntaxError."""
+        with self.assertRaises(SyntaxError):
+            compile_expression("2 +")
+
+    def test_rejects_pathological_input(self):
+        """Test that oversized or deeply nested input is refused up front."""
+        with self.assertRaises(ExpressionError):
+            compile_expression("1+" * MAX_EXPRESSION_LENGTH + "1")
+        with self.assertRaises(ExpressionError):
+            compile_expression("-" * (MAX_DEPTH + 1) + "1")
+        self.assertEqual(compile_expression("--" * (MAX_DEPTH // 2 - 1) + "1")(), 1)
+
+    def test_math_errors_raise_at_evaluation(self):
+        """Test that domain errors surface when evaluating, not compiling."""
+        evaluator = compile_expression("sqrt(-1)")
+        with self.assertRaises(ValueError):
+            evaluator()
+        evaluator = compile_expression("1 / 0")
+        with self.assertRaises(ZeroDivisionError):
+            evaluator()
+        self.assertTrue(math.isinf(compile_expression("1e308 * 10")()))
+
+
+class TestVariables(unittest.TestCase):
+    """Test cases for expressions with free variables."""
+
+    def test_variables_are_bound_at_evaluation(self):
+        """Test that one compiled expression serves many bindings."""
+        evaluator = compile_expression("x * 2 + y", variables=["x", "y"])
+        self.assertEqual(evaluator({"x": 20, "y": 2}), 42)
+        self.assertEqual(evaluator({"x": 1, "y": 0}), 2)
+
+    def test_invalid_variable_names(self):
+        """Test that variables cannot shadow constants or functions."""
+        for name in ["pi", "sin", "1x", "a-b"]:
+            with self.subTest(name=name):
+                with self.assertRaises(ExpressionError):
+                    compile_expression("1", variables=[name])
+
+    def test_custom_function_table(self):
+        """Test that calls resolve against the supplied function table."""
+        evaluator = compile_expression("sqrt(x)", variables=["x"], functions={"sqrt": lambda v: v * 10})
+        self.assertEqual(evaluator({"x": 4}), 40)
+
+    def test_runtime_guard_on_integer_power(self):
+        """Test that integer powers of bound variables are still capped."""
+        evaluator = compile_expression("x ** x", variables=["x"])
+        self.assertEqual(evaluator({"x": 3}), 27)
+        with self.assertRaises(ExpressionError):
+            evaluator({"x": 10 ** 6})
+
+    def test_runtime_guard_is_an_upper_bound(self):
+        """Test that no guarded power result exceeds the integer budget."""
+        evaluator = compile_expression("x ** y", variables=["x", "y"])
+        with self.assertRaises(ExpressionError):
+            evaluator({"x": 3, "y": 9999})
+        fraction = compile_expression("x ** y", variables=["x", "y"], mode=FRACTION_MODE)
+        with self.assertRaises(ExpressionError):
+            fraction({"x": Fraction(3, 2), "y": 9999})
+        self.assertLessEqual(evaluator({"x": 3, "y": 5000}).bit_length(), ExpressionLimits().max_integer_bits)
+
+    def test_power_budget_is_exact(self):
+        """Test that results of up to max_integer_bits bits are allowed, statically and at run time."""
+        evaluator = compile_expression("x ** y", variables=["x", "y"])
+        for x, y in [(2, 6000), (2, 9999), (3, 6309), (-2, 9999)]:
+            with self.subTest(x=x, y=y):
+                self.assertLessEqual(evaluator({"x": x, "y": y}).bit_length(), 10000)
+                self.assertEqual(compile_expression(f"({x}) ** {y}")(), evaluator({"x": x, "y": y}))
+        for expression in ["2 ** 10000", "2 ** 5000 * 2 ** 5000"]:
+            with self.subTest(expression=expression):
+                with self.assertRaises(ExpressionError):
+                    compile_expression(expression)()
+        with self.assertRaises(ExpressionError):
+            evaluator({"x": 2, "y": 10000})
+
+
+class TestCostLimits(unittest.TestCase):
+    """Test cases for static cost estimation and budgets."""
+
+    def test_estimate_counts_nodes_and_depth(self):
+        """Test node, depth and literal accounting."""
+        cost = estimate_cost(parse("1 + 2 * 345"))
+        self.assertEqual(cost.nodes, 5)
+        self.assertEqual(cost.depth, 3)
+        self.assertEqual(cost.literal_digits, 3)
+
+    def test_estimate_bounds_integer_growth(self):
+        """Test that the integer bit estimate bounds the real result size."""
+        for expression in ["2 ** 100", "10 ** 50 * 7", "3 ** 4 ** 2", "(2 ** 64 + 1) // 3"]:
+            with self.subTest(expression=expression):
+                actual = compile_expression(expression)().bit_length()
+                self.assertGreater(estimate_cost(parse(expression)).integer_bits + 1, actual - 1)
+
+    def test_huge_power_rejected_statically(self):
+        """Test that runaway exponentiation is refused without evaluating it."""
+        for expression in ["9 ** 9 ** 9", "(9 ** 9 ** 9) % 7", "(-2) ** (3 ** 20)"]:
+            with self.subTest(expression=expression):
+                with self.assertRaises(ExpressionError) as ctx:
+                    compile_expression(expression)
+                self.assertIn("too expensive", str(ctx.exception))
+
+    def test_rounding_to_huge_digit_counts_is_refused(self):
+        """Test that round() cannot build 10 ** ndigits beyond the integer budget."""
+        with self.assertRaises(ExpressionError) as ctx:
+            compile_expression("round(5, -10 ** 7)")()
+        self.assertIn("too expensive", str(ctx.exception))
+        evaluator = compile_expression("round(x, n)", variables=["x", "n"], mode=FRACTION_MODE)
+        with self.assertRaises(ExpressionError):
+            evaluator({"x": Fraction(1, 3), "n": 10 ** 6})
+        self.assertEqual(evaluator({"x": Fraction(1, 3), "n": 2}), Fraction(33, 100))
+        self.assertEqual(compile_expression("round(1.5, 10 ** 7)")(), 1.5)
+
+    def test_cost_is_checked_before_folding(self):
+        """Test that an expensive constant expression is refused without computing it."""
+        calls = []
+        functions = dict(FUNCTIONS, sqrt=counting(math.sqrt, calls))
+        with self.assertRaises(ExpressionError):
+            compile_expression("sqrt(4) + 9 ** 9 ** 9", functions=functions)
+        self.assertEqual(calls, [])
+
+    def test_float_powers_are_not_budgeted(self):
+        """Test that float overflow is left to raise on its own."""
+        evaluator = compile_expression("2.0 ** 10000")
+        with self.assertRaises(OverflowError):
+            evaluator()
+
+    def test_custom_limits(self):
+        """Test that each budget can be tightened independently."""
+        cases = [
+            ("2 ** 100", ExpressionLimits(max_integer_bits=64)),
+            ("1 + 2 + 3 + 4", ExpressionLimits(max_nodes=5)),
+            ("123456", ExpressionLimits(max_literal_digits=5)),
+            ("1 + 1", ExpressionLimits(max_length=3)),
+            ("-(-(-1))", ExpressionLimits(max_depth=3)),
+        ]
+        for expression, limits in cases:
+            with self.subTest(expression=expression):
+                with self.assertRaises(ExpressionError):
+                    compile_expression(expression, limits)
+                self.assertIsNotNone(compile_expression(expression))
+
+
+def counting(fn, calls):
+    """Wrap fn so each call appends its arguments to calls."""
+    def counted(*args):
+        calls.append(args)
+        return fn(*args)
+    return counted
+
+
+class TestOptimization(unittest.TestCase):
+    """Test cases for constant folding, shared calls and identities."""
+
+    def setUp(self):
+        self.calls = []
+        self.functions = dict(FUNCTIONS, sqrt=counting(math.sqrt, self.calls))
+
+    def test_constant_calls_run_at_compile_time(self):
+        """Test that a call with constant arguments is not repeated on evaluation."""
+        evaluator = compile_expression("sqrt(16) + sqrt(16) * (2 + 3) - sin(pi / 2)", functions=self.functions)
+        compiled_calls = len(self.calls)
+        for _ in range(3):
+            self.assertEqual(evaluator(), 23.0)
+        self.assertEqual(len(self.calls), compiled_calls)
+
+    def test_failing_constants_fail_on_evaluation(self):
+        """Test that folding leaves errors to surface when the expression runs."""
+        for expression, error in [("1 / 0", ZeroDivisionError), ("sqrt(-1) + 1", ValueError),
+                                  ("2.0 ** 10000", OverflowError)]:
+            with self.subTest(expression=expression):
+                evaluator = compile_expression(expression)
+                with self.assertRaises(error):
+                    evaluator()
+
+    def test_folding_respects_integer_budget(self):
+        """Test that folding does not build integers beyond the budget."""
+        with self.assertRaises(ExpressionError):
+            compile_expression("2 ** 9000 * 2 ** 9000")
+
+    def test_repeated_calls_run_once_per_evaluation(self):
+        """Test that identical calls on variables share one result per evaluation."""
+        evaluator = compile_expression("sqrt(x) + sqrt(x) * 2 - sqrt(y)", variables=["x", "y"],
+                                       functions=self.functions)
+        env = {"x": 16, "y": 9}
+        self.assertEqual(evaluator(env), 9.0)
+        self.assertEqual(self.calls, [(16,), (9,)])
+        self.assertEqual(evaluator({"x": 4, "y": 1}), 5.0)
+        self.assertEqual(len(self.calls), 4)
+        self.assertEqual(env, {"x": 16, "y": 9})
+
+    def test_repeated_calls_are_shared_without_variables(self):
+        """Test that calls folding cannot remove, as in decimal mode, are still shared."""
+        functions = dict(DECIMAL_MODE.functions, sqrt=counting(DECIMAL_MODE.functions["sqrt"], self.calls))
+        evaluator = compile_expression("sqrt(2) + sqrt(2)", mode=DECIMAL_MODE, functions=functions)
+        compiled_calls = len(self.calls)
+        self.assertEqual(evaluator(), 2 * Decimal(2).sqrt())
+        self.assertEqual(len(self.calls), compiled_calls + 1)
+
+    def test_identities_are_dropped(self):
+        """Test that x + 0, x * 1, x ** 1 and -(-x) return x unchanged."""
+        for expression in ["x + 0", "0 + x", "x - 0", "x * 1", "1 * x", "x ** 1", "+x", "-(-x)", "(x * 1 + 0) ** 1"]:
+            with self.subTest(expression=expression):
+                result = compile_expression(expression, variables=["x"])({"x": 7})
+                self.assertEqual(result, 7)
+                self.assertIs(type(result), int)
+
+    def test_type_changing_identities_are_kept(self):
+        """Test that rewrites which would change the result type are not applied."""
+        self.assertIs(type(compile_expression("x / 1", variables=["x"])({"x": 7})), float)
+        self.assertIs(type(compile_expression("x * 1.0", variables=["x"])({"x": 7})), float)
+
+
+class TestNumericModes(unittest.TestCase):
+    """Test cases for compiling in decimal and fraction mode."""
+
+    def test_modes_are_registered(self):
+        """Test that every mode is reachable by name."""
+        self.assertEqual(list(NUMERIC_MODES), ["float", "decimal", "fraction"])
+
+    def test_literals_keep_their_written_value(self):
+        """Test that decimal literals are converted from their text, not the float."""
+        self.assertEqual(compile_expression("0.1", mode=DECIMAL_MODE)(), Decimal("0.1"))
+        self.assertEqual(compile_expression("1_000.5", mode=FRACTION_MODE)(), Fraction(2001, 2))
+        self.assertEqual(compile_expression("  1e-3 ", mode=FRACTION_MODE)(), Fraction(1, 1000))
+
+    def test_integers_stay_ints(self):
+        """Test that integer-only subexpressions are not converted."""
+        for mode in (DECIMAL_MODE, FRACTION_MODE):
+            with self.subTest(mode=mode.name):
+                self.assertIs(type(compile_expression("2 ** 70 - 7 // 2", mode=mode)()), int)
+
+    def test_division_and_negative_powers_use_the_mode_type(self):
+        """Test that int / int and int ** -n produce exact results."""
+        self.assertEqual(compile_expression("1 / 8", mode=FRACTION_MODE)(), Fraction(1, 8))
+        self.assertEqual(compile_expression("2 ** -3", mode=FRACTION_MODE)(), Fraction(1, 8))
+        self.assertEqual(compile_expression("2 ** -3", mode=DECIMAL_MODE)(), Decimal("0.125"))
+
+    def test_decimal_precision_follows_context(self):
+        """Test that one compiled expression honours the caller's precision."""
+        evaluator = compile_expression("1 / 7 + pi", mode=DECIMAL_MODE)
+        with localcontext() as ctx:
+            ctx.prec = 10
+            short = +evaluator()
+        with localcontext() as ctx:
+            ctx.prec = 40
+            long = +evaluator()
+        self.assertEqual(len(str(short).replace(".", "")), 10)
+        self.assertEqual(len(str(long).replace(".", "")), 40)
+        self.assertTrue(str(long).startswith(str(short)[:-1]))
+
+    def test_fraction_powers_are_budgeted(self):
+        """Test that exact rational powers are held to the integer bit budget."""
+        evaluator = compile_expression("x ** 20000", variables=["x"], mode=FRACTION_MODE)
+        with self.assertRaises(ExpressionError):
+            evaluator({"x": Fraction(3, 2)})
+        self.assertEqual(evaluator({"x": Fraction(1, 1)}), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
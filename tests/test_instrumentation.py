@@ -0,0 +1,95 @@
+"""Tests for per-tool call metrics."""
+
+from tools.instrumentation import LatencyHistogram, ToolMetrics
+import unittest
+import asyncio
+import inspect
+import sys
+import os
+
+# Add the parent directory to the path so we can import tools
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def sample_tool(a: int, b: int = 2) -> int:
+    """Sample tool docstring."""
+    return a + b
+
+
+def failing_tool(flag: bool) -> str:
+    """Fail one way or another."""
+    if flag:
+        raise RuntimeError("boom")
+    return "Error: something went wrong"
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Test cases for the latency histogram."""
+
+    def test_percentiles_are_within_bucket_error(self):
+        """Test that percentiles land within one bucket of the true value."""
+        histogram = LatencyHistogram()
+        for i in range(1, 1001):
+            histogram.record(i * 1e-4)  # 0.1 ms .. 100 ms
+        self.assertAlmostEqual(histogram.percentile(0.50), 0.05, delta=0.05 * 0.2)
+        self.assertAlmostEqual(histogram.percentile(0.99), 0.099, delta=0.099 * 0.2)
+        self.assertEqual(histogram.percentile(1.0), 0.1)
+
+    def test_empty_histogram(self):
+        """Test that an empty histogram reports zero."""
+        self.assertEqual(LatencyHistogram().percentile(0.5), 0.0)
+
+
+class TestToolMetrics(unittest.TestCase):
+    """Test cases for instrumenting tool functions."""
+
+    def test_wrapper_preserves_tool_schema(self):
+        """Test that FastMCP sees the original name, docstring and signature."""
+        wrapped = ToolMetrics().instrument(sample_tool)
+        self.assertEqual(wrapped.__name__, "sample_tool")
+        self.assertEqual(wrapped.__doc__, "Sample tool docstring.")
+        self.assertEqual(inspect.signature(wrapped), inspect.signature(sample_tool))
+
+    def test_calls_and_errors_are_counted(self):
+        """Test that raised exceptions and "Error:" results both count as errors."""
+        metrics = ToolMetrics()
+        tool = metrics.instrument(sample_tool)
+        failing = metrics.instrument(failing_tool)
+        self.assertEqual(tool(1), 3)
+        self.assertEqual(tool(1, 5), 6)
+        failing(False)
+        with self.assertRaises(RuntimeError):
+            failing(True)
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot["sample_tool"]["calls"], 2)
+        self.assertEqual(snapshot["sample_tool"]["errors"], 0)
+        self.assertEqual(snapshot["failing_tool"]["calls"], 2)
+        self.assertEqual(snapshot["failing_tool"]["errors"], 2)
+        self.assertGreater(snapshot["sample_tool"]["max_ms"], 0)
+
+    def test_async_tools(self):
+        """Test that coroutine functions stay coroutine functions and are timed."""
+        async def async_tool(x: int) -> int:
+            return x * 2
+
+        metrics = ToolMetrics()
+        wrapped = metrics.instrument(async_tool)
+        self.assertTrue(inspect.iscoroutinefunction(wrapped))
+        self.assertEqual(asyncio.run(wrapped(21)), 42)
+        self.assertEqual(metrics.snapshot()["async_tool"]["calls"], 1)
+
+    def test_snapshot_orders_busiest_first_and_reset(self):
+        """Test snapshot ordering and resetting counters."""
+        metrics = ToolMetrics()
+        quiet = metrics.instrument(sample_tool, name="quiet")
+        busy = metrics.instrument(sample_tool, name="busy")
+        quiet(1)
+        for _ in range(3):
+            busy(1)
+        self.assertEqual(list(metrics.snapshot()), ["busy", "quiet"])
+        metrics.reset()
+        self.assertEqual(metrics.snapshot()["busy"]["calls"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
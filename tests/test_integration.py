@@ -5,12 +5,24 @@ import sys
 import os
 import json
 import subprocess
+import threading
+import asyncio
 import time
+from unittest import mock
 
 # Add the parent directory to the path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 
+# Every tool the server registers with the default settings: the tools
+# package, in TOOL_TARGETS order, then the server's own stats tools
+EXPECTED_TOOLS = ["add", "multiply", "sum_many", "product_many", "mean_many", "calculate",
+                  "calculate_batch", "compile_formula", "eval_formula", "calculate_vectorized",
+                  "describe", "quantiles", "histogram", "matmul", "dot", "solve", "inverse",
+                  "determinant", "norm", "greet", "greet_many", "calculate_stream",
+                  "greet_stream", "execution_stats", "result_cache_stats", "server_stats"]
+
+
 class TestServerIntegration(unittest.TestCase):
     """Integration tests for the MCP server."""
 
@@ -78,12 +90,11 @@ class TestServerIntegration(unittest.TestCase):
                 server_info = json.load(f)
 
             self.assertIn("tools", server_info)
-            self.assertEqual(len(server_info["tools"]), 4, "Expected 4 tools")
+            self.assertEqual(len(server_info["tools"]), 26, "Expected 26 tools")
 
             # Check that all expected tools are present
             tool_names = [tool["name"] for tool in server_info["tools"]]
-            expected_tools = ["add", "multiply", "calculate", "greet"]
-            for tool in expected_tools:
+            for tool in EXPECTED_TOOLS:
                 self.assertIn(tool, tool_names,
                               f"Tool '{tool}' not found in server info")
 
@@ -100,6 +111,12 @@ class TestServerIntegration(unittest.TestCase):
             # This is a basic check that the mcp object exists
             self.assertIsNotNone(mcp, "MCP server object should not be None")
 
+            from tools.registry import TOOL_TARGETS
+            self.assertEqual(len(EXPECTED_TOOLS), 26, "Expected 26 tools")
+            self.assertEqual(EXPECTED_TOOLS[:len(TOOL_TARGETS)], list(TOOL_TARGETS))
+            tools = asyncio.run(mcp.list_tools())
+            self.assertEqual([tool.name for tool in tools], EXPECTED_TOOLS)
+
         except Exception as e:
             self.fail(f"Failed to access MCP server object: {e}")
 
@@ -111,7 +128,10 @@ class TestServerIntegration(unittest.TestCase):
             self.assertTrue(hasattr(tools, '__all__'),
                             "tools package should have __all__ defined")
 
-            expected_exports = ['add', 'multiply', 'calculate', 'greet']
+            expected_exports = ['add', 'multiply', 'sum_many', 'product_many', 'mean_many', 'calculate',
+                                'calculate_batch', 'compile_formula', 'eval_formula', 'calculate_vectorized',
+                                'describe', 'quantiles', 'histogram', 'matmul', 'dot', 'solve', 'inverse',
+                                'determinant', 'norm', 'greet', 'greet_many', 'calculate_stream', 'greet_stream']
             for export in expected_exports:
                 self.assertIn(export, tools.__all__,
                               f"{export} should be in tools.__all__")
@@ -165,8 +185,8 @@ class TestServerConfiguration(unittest.TestCase):
 
         # Check for key components
         self.assertIn("from fastmcp import FastMCP", content)
-        self.assertIn("from tools.math_tools import", content)
-        self.assertIn("from tools.text_tools import", content)
+        self.assertIn("from tools.registry import", content)
+        self.assertIn("load_manifest()", content)
         self.assertIn("mcp.tool()", content)
 
     def test_tools_directory_structure(self):
@@ -186,5 +206,135 @@ class TestServerConfiguration(unittest.TestCase):
                             f"{file} should exist in tools directory")
 
 
+class TestExecutionPolicy(unittest.TestCase):
+    """Tests for choosing where each tool runs."""
+
+    def test_cheap_tools_run_inline(self):
+        """Test the default policies: trivial tools inline, the rest on threads."""
+        import demo
+        self.assertEqual(demo.tool_policy["add"], "inline")
+        self.assertEqual(demo.tool_policy["greet"], "inline")
+        self.assertIn(demo.tool_policy["calculate"], ("thread", "process"))
+        self.assertEqual(demo.tool_policy["calculate_batch"], "thread")
+        # Compiling folds constants, which can take real work
+        self.assertEqual(demo.tool_policy["compile_formula"], "thread")
+        self.assertNotIn("calculate", demo.DEFAULT_TOOL_POLICY)
+
+    def test_policy_overrides(self):
+        """Test that TOOL_POLICY entries replace the defaults."""
+        import demo
+        policies = demo.parse_tool_policy(" calculate=process, greet=thread,", {"greet": "inline"})
+        self.assertEqual(policies, {"calculate": "process", "greet": "thread"})
+        with self.assertRaises(ValueError):
+            demo.parse_tool_policy("calculate=fork", {})
+
+    def test_process_pools_start_when_serving(self):
+        """Test that importing the server starts no worker processes, and serving does."""
+        script = ("import asyncio, demo\n"
+                  "from fastmcp import Client\n"
+                  "print(sorted(demo.process_pools))\n"
+                  "async def serve():\n"
+                  "    async with Client(demo.mcp) as client:\n"
+                  "        print(sorted(demo.process_pools))\n"
+                  "        result = await client.call_tool('calculate', {'expression': '6 * 7'})\n"
+                  "        print(result.structured_content['result'])\n"
+                  "asyncio.run(serve())\n")
+        env = dict(os.environ, TOOL_POLICY="calculate=process", PROCESS_WORKERS="1")
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                env=env, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.split("\n")[:3], ["[]", "['calculate']", "42"])
+
+    def test_slow_calls_do_not_block_inline_tools(self):
+        """Test that inline tools answer while a thread-policy tool is busy."""
+        import demo
+        release = threading.Event()
+
+        def slow(expression):
+            release.wait(5)
+            return expression
+
+        blocked = demo.thread_pool.wrap(slow, demo.busy_error)
+
+        async def scenario():
+            pending = asyncio.ensure_future(blocked("1"))
+            await asyncio.sleep(0.01)
+            answer = await demo.mcp.call_tool("add", {"a": 2, "b": 3})
+            finished_first = not pending.done()
+            release.set()
+            await pending
+            return answer.structured_content, finished_first
+
+        answer, finished_first = asyncio.run(scenario())
+        self.assertEqual(answer, {"result": 5})
+        self.assertTrue(finished_first)
+
+    def test_execution_stats(self):
+        """Test that execution_stats reports policies and pool load."""
+        import demo
+        result = asyncio.run(demo.mcp.call_tool("execution_stats", {}))
+        stats = result.structured_content
+        self.assertEqual(stats["policies"]["add"], "inline")
+        self.assertIn("rejected", stats["thread_pool"])
+
+
+class TestServerCommandLine(unittest.TestCase):
+    """Tests for selecting the transport and HTTP tuning from the command line."""
+
+    def test_default_is_stdio(self):
+        """Test that running without options keeps the stdio transport."""
+        import demo
+        with mock.patch.object(demo.mcp, "run") as run:
+            demo.main([])
+        run.assert_called_once_with()
+
+    def test_http_defaults_use_every_core(self):
+        """Test that HTTP defaults scale with the machine."""
+        import demo
+        args = demo.parse_args(["--transport", "http"])
+        self.assertEqual(args.workers, os.cpu_count() or 1)
+        self.assertGreater(args.max_concurrency, 0)
+
+    def test_sse_defaults_to_one_worker(self):
+        """Test that sse runs without options on a multicore host."""
+        import demo
+        with mock.patch.object(demo, "HTTP_WORKERS", 8):
+            self.assertEqual(demo.parse_args(["--transport", "sse"]).workers, 1)
+            self.assertEqual(demo.parse_args(["--transport", "http"]).workers, 8)
+
+    def test_single_worker_http(self):
+        """Test that one worker runs the server in process with uvicorn tuning."""
+        import demo
+        with mock.patch.object(demo.mcp, "run") as run:
+            demo.main(["--transport", "http", "--port", "9001", "--workers", "1",
+                       "--max-concurrency", "64", "--keep-alive", "5"])
+        kwargs = run.call_args.kwargs
+        self.assertEqual(kwargs["transport"], "http")
+        self.assertEqual(kwargs["port"], 9001)
+        self.assertEqual(kwargs["uvicorn_config"]["limit_concurrency"], 64)
+        self.assertEqual(kwargs["uvicorn_config"]["timeout_keep_alive"], 5)
+
+    def test_multi_worker_http(self):
+        """Test that several workers are started through a uvicorn app factory."""
+        import demo
+        import uvicorn
+        with mock.patch.object(uvicorn, "run") as run:
+            demo.main(["--transport", "http", "--workers", "4"])
+        args, kwargs = run.call_args
+        self.assertEqual(args[0], "demo:create_http_app")
+        self.assertTrue(kwargs["factory"])
+        self.assertEqual(kwargs["workers"], 4)
+
+    def test_invalid_options(self):
+        """Test that unusable combinations are rejected."""
+        import demo
+        with mock.patch("sys.stderr"):
+            with self.assertRaises(SystemExit):
+                demo.parse_args(["--transport", "sse", "--workers", "2"])
+            with self.assertRaises(SystemExit):
+                demo.parse_args(["--transport", "http", "--workers", "0"])
+
+
 if __name__ == "__main__":
     unittest.main()
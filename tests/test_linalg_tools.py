@@ -0,0 +1,101 @@
+"""Tests for the linear algebra tools."""
+
+from tools.arrays import decode_array, encode_array
+from tools.linalg_tools import (MAX_ELEMENTS, MAX_MATRIX_SIZE, determinant, dot, inverse, matmul, norm, np,
+                                solve)
+import unittest
+import sys
+import os
+
+# Add the parent directory to the path so we can import tools
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestLinalgTools(unittest.TestCase):
+    """Test cases for matmul, dot, solve, inverse, determinant and norm."""
+
+    def test_matmul(self):
+        """Test matrix, matrix-vector and vector-vector products."""
+        self.assertEqual(matmul([[1, 2], [3, 4]], [[5], [6]]), [[17.0], [39.0]])
+        self.assertEqual(matmul([[1, 2], [3, 4]], [1, 1]), [3.0, 7.0])
+        self.assertEqual(matmul([1, 1], [[1, 2], [3, 4]]), [4.0, 6.0])
+        self.assertEqual(matmul([1, 2], [3, 4]), 11.0)
+
+    def test_batched_matmul_broadcasts(self):
+        """Test that a stack of matrices is multiplied in one call."""
+        rng = np.random.default_rng(1)
+        a, b = rng.random((10, 3, 4)), rng.random((4, 2))
+        np.testing.assert_allclose(matmul(a.tolist(), b.tolist()), a @ b)
+
+    def test_dot(self):
+        """Test single and batched dot products."""
+        self.assertEqual(dot([1, 2, 3], [4, 5, 6]), 32.0)
+        self.assertEqual(dot([[1, 2], [3, 4]], [1, 1]), [3.0, 7.0])
+
+    def test_solve(self):
+        """Test vector and matrix right-hand sides, single and batched."""
+        self.assertEqual(solve([[3, 1], [1, 2]], [9, 8]), [2.0, 3.0])
+        self.assertEqual(solve([[3, 1], [1, 2]], [[9, 1], [8, 2]]), [[2.0, 0.0], [3.0, 1.0]])
+        rng = np.random.default_rng(2)
+        a = rng.random((5, 3, 3)) + 3 * np.eye(3)
+        x = rng.random((5, 3))
+        b = np.einsum("bij,bj->bi", a, x)
+        np.testing.assert_allclose(solve(a.tolist(), b.tolist()), x)
+
+    def test_inverse_and_determinant(self):
+        """Test inverses and determinants, single and batched."""
+        np.testing.assert_allclose(inverse([[4, 7], [2, 6]]), [[0.6, -0.7], [-0.2, 0.4]])
+        self.assertAlmostEqual(determinant([[1, 2], [3, 4]]), -2.0)
+        np.testing.assert_allclose(determinant([[[1, 2], [3, 4]], [[2, 0], [0, 2]]]), [-2.0, 4.0])
+        self.assertIsNone(determinant((np.eye(3) * 1e200).tolist()))
+
+    def test_singular_matrices(self):
+        """Test that singular systems are reported, not raised."""
+        self.assertEqual(solve([[1, 2], [2, 4]], [1, 1]), "Error: Matrix is singular")
+        self.assertEqual(inverse([[1, 2], [2, 4]]), "Error: Matrix is singular")
+        self.assertEqual(determinant([[1, 2], [2, 4]]), 0.0)
+
+    def test_norms(self):
+        """Test vector and matrix norms."""
+        self.assertEqual(norm([3, 4]), 5.0)
+        self.assertEqual(norm([[3, 4], [6, 8]]), [5.0, 10.0])
+        self.assertEqual(norm([3, -4], "inf"), 4.0)
+        self.assertAlmostEqual(norm([[1, 2], [3, 4]], "fro", matrix=True), 30 ** 0.5)
+        self.assertAlmostEqual(norm([[2, 0], [0, 1]], "nuc", matrix=True), 3.0)
+        self.assertTrue(norm([3, 4], "fro").startswith("Error: ord must be one of"))
+
+    def test_binary_arrays(self):
+        """Test binary inputs, which carry the matrix shape, and binary results."""
+        a = np.arange(6.0).reshape(2, 3)
+        b = np.arange(12.0).reshape(3, 4)
+        result = matmul(encode_array(a), encode_array(b), binary=True)
+        self.assertEqual(result.shape, [2, 4])
+        np.testing.assert_array_equal(np.asarray(decode_array(result, 8)), a @ b)
+        self.assertEqual(solve(encode_array(np.eye(2)), [1, 2]), [1.0, 2.0])
+
+    def test_shape_validation(self):
+        """Test that mismatched and malformed inputs are rejected up front."""
+        self.assertTrue(matmul([[1, 2]], [[1, 2]]).startswith("Error: Shapes [1, 2] and [1, 2] do not align"))
+        self.assertTrue(matmul([[1, 2], [3]], [[1]]).startswith("Error: 'a' must be a number or a (nested) list"))
+        self.assertTrue(matmul(np.ones((2, 2, 2)).tolist(), np.ones((3, 2, 2)).tolist()).startswith("Error: Batch shapes"))
+        self.assertTrue(dot([1], [1, 2]).startswith("Error: Vectors have different lengths"))
+        self.assertTrue(solve([[1, 2], [3, 4]], [1, 2, 3]).startswith("Error: b has 3 rows"))
+        self.assertTrue(inverse([[1, 2, 3], [4, 5, 6]]).startswith("Error: 'a' must be square"))
+        self.assertTrue(inverse([1, 2]).startswith("Error: 'a' must be a matrix"))
+        self.assertEqual(inverse([[float("nan")]]), "Error: 'a' must contain only finite numbers")
+        self.assertTrue(determinant({"shape": [2, 2], "data": "AAAA"}).startswith("Error: 'a' is not a valid binary"))
+
+    def test_size_limits(self):
+        """Test the matrix size and element caps, including broadcast results."""
+        tall = np.zeros((MAX_MATRIX_SIZE + 1, 1)).tolist()
+        self.assertTrue(matmul(tall, [[1]]).startswith("Error: 'a' is too large"))
+        batch = int(MAX_ELEMENTS ** 0.5)
+        a = np.zeros((batch, 1, 1, 2)).tolist()
+        b = np.zeros((1, batch, 2, 2)).tolist()
+        self.assertTrue(matmul(a, b).startswith("Error: Result would have"))
+        self.assertTrue(dot(encode_array(np.zeros(MAX_ELEMENTS + 1)), [1]).startswith("Error: 'a' is not a valid binary"))
+
+
+if __name__ == "__main__":
+    unittest.main()
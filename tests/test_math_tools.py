@@ -1,8 +1,14 @@
 """Tests for mathematical operation tools."""
 
-from tools.math_tools import add, multiply, calculate
+from tools.math_tools import (FORMULA_CACHE_SIZE, MAX_BATCH_SIZE, MAX_BINDINGS, MAX_DECIMAL_PRECISION, MAX_REDUCE_SIZE,
+                              add, multiply, sum_many, product_many, mean_many, calculate, calculate_batch,
+                              calculate_cache_clear, calculate_cache_info,
+                              compile_formula, configure_calculate_limits, eval_formula, formula_cache_info)
+from tools.arrays import encode_array
+from tools.cache import LRUCache
 import unittest
 import math
+import tracemalloc
 import sys
 import os
 
@@ -50,6 +56,76 @@ class TestMathTools(unittest.TestCase):
         self.assertEqual(multiply(0.0, -5.0), 0.0)
 
 
+class TestReductions(unittest.TestCase):
+    """Test cases for sum_many, product_many and mean_many."""
+
+    def test_sum_is_correctly_rounded(self):
+        """Test that float sums do not accumulate rounding error."""
+        self.assertEqual(sum_many([0.1] * 10), 1)
+        self.assertEqual(sum_many([1e16, 1.0, -1e16]), 1)
+        self.assertEqual(sum_many([0.1, 0.2]), 0.30000000000000004)
+
+    def test_integer_sums_are_exact(self):
+        """Test that integer-only lists are summed exactly."""
+        self.assertEqual(sum_many([2 ** 100, 1, -(2 ** 100)]), 1)
+        self.assertEqual(sum_many([]), 0)
+
+    def test_sum_overflow(self):
+        """Test that only a total beyond the float range is an error."""
+        self.assertEqual(sum_many([1e308, 1e308, -1e308]), int(1e308))
+        self.assertEqual(sum_many([1e308, 1e308]), "Error: Result is too large")
+
+    def test_product(self):
+        """Test products of ints, floats and mixed lists."""
+        self.assertEqual(product_many([1, 2, 3, 4, 5]), 120)
+        self.assertEqual(product_many([2 ** 64, 2 ** 64]), 2 ** 128)
+        self.assertEqual(product_many([0.5, 4, 1.5]), 3)
+        self.assertEqual(product_many([-2.0, 0.25]), -0.5)
+        self.assertEqual(product_many([1.5, 0.0]), 0)
+        self.assertEqual(product_many([]), 1)
+
+    def test_product_has_no_intermediate_overflow(self):
+        """Test that partial products may leave the float range."""
+        self.assertAlmostEqual(product_many([1e200, 1e200, 1e-300]), 1e100, delta=1e86)
+        self.assertEqual(product_many([1e-200, 1e-200, 1e300]), 1e-100)
+
+    def test_product_overflow(self):
+        """Test that too-large products are errors."""
+        self.assertEqual(product_many([1e200, 1e200]), "Error: Result is too large")
+        self.assertEqual(product_many([2 ** 5000] * 3), "Error: Result is too large")
+        self.assertEqual(product_many([2 ** 5000] * 3 + [0]), 0)
+
+    def test_mean(self):
+        """Test means, including ones whose sum would overflow."""
+        self.assertEqual(mean_many([1, 2, 3, 4]), 2.5)
+        self.assertEqual(mean_many([0.1] * 10), 0.1)
+        self.assertEqual(mean_many([1e308] * 3), int(1e308))
+        self.assertEqual(mean_many([10 ** 400, 10 ** 400]), "Error: Result is too large")
+        self.assertEqual(mean_many([]), "Error: Cannot take the mean of an empty list")
+
+    def test_non_finite_values(self):
+        """Test that NaN and infinite inputs are errors."""
+        for values in ([float("nan"), 1.0], [float("inf"), 1.0], [float("inf"), float("-inf")]):
+            for reduce in (sum_many, product_many, mean_many):
+                self.assertEqual(reduce(values), "Error: Values must be finite numbers")
+
+    def test_binary_arrays(self):
+        """Test that binary arrays give the same results as lists."""
+        floats = [0.1] * 10 + [1e16, -1e16]
+        integers = [2 ** 40, 3, -7]
+        for reduce in (sum_many, product_many, mean_many):
+            self.assertEqual(reduce(encode_array(floats)), reduce(floats))
+            self.assertEqual(reduce(encode_array(integers, "int64")), reduce(integers))
+        self.assertTrue(sum_many({"shape": [1], "data": "??"}).startswith("Error: Invalid binary array"))
+
+    def test_size_limit(self):
+        """Test that oversized lists are rejected."""
+        values = [1] * (MAX_REDUCE_SIZE + 1)
+        for reduce in (sum_many, product_many, mean_many):
+            self.assertTrue(reduce(values).startswith("Error: Too many values"))
+            self.assertIn("too many values", reduce({"shape": [MAX_REDUCE_SIZE + 1], "data": ""}))
+
+
 class TestCalculator(unittest.TestCase):
     """Test cases for the calculator tool."""
 
@@ -129,6 +205,20 @@ class TestCalculator(unittest.TestCase):
         result = calculate("open('/etc/passwd')")
         self.assertTrue(result.startswith("Error:"))
 
+    def test_runaway_exponentiation_is_rejected(self):
+        """Test that huge integer powers fail fast with a clear error."""
+        result = calculate("9**9**9")
+        self.assertTrue(result.startswith("Error: Expression is too expensive"))
+
+    def test_configure_limits(self):
+        """Test that calculate budgets can be changed at runtime."""
+        try:
+            configure_calculate_limits(max_integer_bits=64)
+            self.assertTrue(calculate("2 ** 100").startswith("Error:"))
+        finally:
+            configure_calculate_limits(max_integer_bits=10000)
+        self.assertEqual(calculate("2 ** 100"), 2 ** 100)
+
     def test_whitespace_handling(self):
         """Test that expressions with various whitespace are handled correctly."""
         self.assertEqual(calculate("  2 + 3  "), 5)
@@ -148,5 +238,220 @@ class TestCalculator(unittest.TestCase):
         self.assertIsInstance(result, float)
 
 
+class TestNumericModes(unittest.TestCase):
+    """Test cases for calculate's decimal and fraction modes."""
+
+    def test_integer_arithmetic_is_exact_in_every_mode(self):
+        """Test that integer-only expressions never go through floats."""
+        for mode in ("float", "decimal", "fraction"):
+            with self.subTest(mode=mode):
+                self.assertEqual(calculate("3 ** 100 + 1", mode=mode), 3 ** 100 + 1)
+                self.assertEqual(calculate("(2 ** 80) // 3 % 1000", mode=mode), (2 ** 80) // 3 % 1000)
+
+    def test_decimal_mode(self):
+        """Test that decimal literals are exact and results are rounded to the precision."""
+        self.assertEqual(calculate("0.1 + 0.2", mode="decimal"), "0.3")
+        self.assertEqual(calculate("1 / 3", mode="decimal"), "0." + "3" * 28)
+        self.assertEqual(calculate("1 / 3", mode="decimal", precision=50), "0." + "3" * 50)
+        self.assertEqual(calculate("10 ** 30 / 10 ** 10", mode="decimal"), 10 ** 20)
+        self.assertEqual(calculate("2 ** -3", mode="decimal"), "0.125")
+
+    def test_decimal_functions_and_constants(self):
+        """Test that sqrt, exp, log and the constants honour the precision."""
+        self.assertEqual(calculate("sqrt(2)", mode="decimal", precision=30), "1.41421356237309504880168872421")
+        self.assertEqual(calculate("pi", mode="decimal", precision=40), "3.141592653589793238462643383279502884197")
+        self.assertEqual(calculate("log(e)", mode="decimal"), 1)
+        self.assertEqual(calculate("log10(1000)", mode="decimal"), 3)
+        self.assertAlmostEqual(float(calculate("sin(pi / 6)", mode="decimal")), 0.5)
+
+    def test_fraction_mode(self):
+        """Test that fraction mode keeps results exact."""
+        self.assertEqual(calculate("1/3 + 1/6", mode="fraction"), "1/2")
+        self.assertEqual(calculate("0.1 + 0.2", mode="fraction"), "3/10")
+        self.assertEqual(calculate("(2/3) ** -2", mode="fraction"), "9/4")
+        self.assertEqual(calculate("sqrt(16/9)", mode="fraction"), "4/3")
+        self.assertEqual(calculate("3 * (1/3)", mode="fraction"), 1)
+
+    def test_fraction_mode_falls_back_to_float(self):
+        """Test that irrational results come back as floats."""
+        self.assertAlmostEqual(calculate("sqrt(2)", mode="fraction"), math.sqrt(2))
+        self.assertAlmostEqual(calculate("pi / 2", mode="fraction"), math.pi / 2)
+
+    def test_mode_errors(self):
+        """Test error handling specific to the exact modes."""
+        self.assertEqual(calculate("1 / 0", mode="decimal"), "Error: Division by zero")
+        self.assertEqual(calculate("1 / 0", mode="fraction"), "Error: Division by zero")
+        self.assertTrue(calculate("sqrt(-1)", mode="decimal").startswith("Error: Invalid value"))
+        self.assertIn("too expensive", calculate("(1/3) ** -20000", mode="fraction"))
+        for mode in ("float", "fraction"):
+            self.assertEqual(calculate("(-8) ** (1/3)", mode=mode), "Error: Result is not a real number")
+        self.assertTrue(calculate("1", mode="complex").startswith("Error: mode must be one of"))
+        self.assertTrue(calculate("1", mode="decimal", precision=0).startswith("Error: precision"))
+        self.assertTrue(calculate("1", mode="decimal", precision=MAX_DECIMAL_PRECISION + 1).startswith("Error:"))
+
+    def test_huge_decimal_is_returned_as_string(self):
+        """Test that a whole Decimal beyond the precision is not expanded into an int."""
+        self.assertEqual(calculate("1e400", mode="decimal"), "1E+400")
+
+    def test_modes_are_cached_separately(self):
+        """Test that the same text compiles once per mode."""
+        calculate_cache_clear()
+        self.assertEqual(calculate("1 / 4"), 0.25)
+        self.assertEqual(calculate("1 / 4", mode="fraction"), "1/4")
+        self.assertEqual(calculate("1 / 4", mode="decimal"), "0.25")
+        self.assertEqual(calculate_cache_info().currsize, 3)
+
+
+class TestFormulas(unittest.TestCase):
+    """Test cases for compile_formula and eval_formula."""
+
+    def test_compile_once_evaluate_many(self):
+        """Test that one handle evaluates with different values."""
+        handle = compile_formula("a * x ** 2 + b * x + c", ["a", "b", "c", "x"])
+        self.assertTrue(handle.startswith("f1."))
+        self.assertEqual(eval_formula(handle, {"a": 1, "b": 2, "c": 1, "x": 3}), 16)
+        self.assertEqual(eval_formula(handle, {"a": 0.5, "b": 0, "c": 0, "x": 3}), 4.5)
+
+    def test_list_of_bindings(self):
+        """Test that a list of bindings returns one result per binding."""
+        handle = compile_formula("x / y", ["x", "y"])
+        results = eval_formula(handle, [{"x": 1, "y": 4}, {"x": 1, "y": 0}, {"x": 1}])
+        self.assertEqual(results, [0.25, "Error: Division by zero", "Error: Missing value for variable 'y'"])
+
+    def test_handle_is_canonical(self):
+        """Test that spacing and variable order do not change the handle."""
+        self.assertEqual(compile_formula("x + y", ["y", "x"]), compile_formula("  x  +  y ", ["x", "y", "x"]))
+        self.assertNotEqual(compile_formula("x+y", ["x", "y"]), compile_formula("x+y", ["x", "y"], mode="fraction"))
+
+    def test_evicted_handle_still_works(self):
+        """Test that handles stay valid after falling out of the registry."""
+        handle = compile_formula("sqrt(x) + 1", ["x"])
+        for i in range(FORMULA_CACHE_SIZE):
+            compile_formula(f"x + {i}", ["x"])
+        self.assertEqual(eval_formula(handle, {"x": 16}), 5)
+        self.assertLessEqual(formula_cache_info().currsize, FORMULA_CACHE_SIZE)
+
+    def test_exact_modes(self):
+        """Test that float values are bound as written in decimal and fraction formulas."""
+        handle = compile_formula("x + 0.2", ["x"], mode="fraction")
+        self.assertEqual(eval_formula(handle, {"x": 0.1}), "3/10")
+        handle = compile_formula("x / 3", ["x"], mode="decimal")
+        self.assertEqual(eval_formula(handle, {"x": 1}, precision=5), "0.33333")
+
+    def test_compile_errors(self):
+        """Test that invalid formulas are rejected when compiled."""
+        self.assertEqual(compile_formula("x +", ["x"]), "Error: Invalid mathematical expression")
+        self.assertEqual(compile_formula("x + z", ["x"]), "Error: Unknown name 'z'")
+        self.assertEqual(compile_formula("pi * 2", ["pi"]), "Error: Invalid variable name 'pi'")
+        self.assertTrue(compile_formula("x", ["x"], mode="complex").startswith("Error: mode must be one of"))
+
+    def test_eval_errors(self):
+        """Test that bad handles and bindings are reported."""
+        handle = compile_formula("x * 2", ["x"])
+        self.assertEqual(eval_formula("not-a-handle", {"x": 1}), "Error: Invalid formula handle")
+        self.assertEqual(eval_formula("f1.!!!", {"x": 1}), "Error: Invalid formula handle")
+        self.assertEqual(eval_formula(handle, {"x": 1, "y": 2}), "Error: Unknown variable 'y'")
+        self.assertTrue(eval_formula(handle, [{"x": 1}] * (MAX_BINDINGS + 1)).startswith("Error: Too many"))
+        self.assertTrue(eval_formula(handle, {"x": 1}, precision=0).startswith("Error: precision"))
+
+    def test_bound_values_are_budgeted(self):
+        """Test that large bound integers cannot sidestep the integer budget."""
+        handle = compile_formula(" * ".join(["x"] * 100), ["x"])
+        self.assertEqual(eval_formula(handle, {"x": 10 ** 400}), "Error: Value of 'x' is too long (limit is 400 digits)")
+        self.assertIn("too expensive", eval_formula(handle, {"x": 10 ** 399}))
+        self.assertEqual(eval_formula(handle, {"x": 2}), 2 ** 100)
+        big = 10 ** 300
+        for expression, expected in [("x + y", big + 3), ("x - y", big - 3), ("x // y", big // 3)]:
+            handle = compile_formula(expression, ["x", "y"])
+            self.assertEqual(eval_formula(handle, {"x": big, "y": 3}), expected)
+        self.assertIn("too expensive", eval_formula(compile_formula("x * x * x * x * x * x * x * x", ["x"]),
+                                                    {"x": 10 ** 399}))
+
+
+class TestCalculateBatch(unittest.TestCase):
+    """Test cases for evaluating many expressions in one call."""
+
+    def setUp(self):
+        calculate_cache_clear()
+
+    def test_results_in_order(self):
+        """Test that each expression gets its own result, in order."""
+        self.assertEqual(calculate_batch(["2 + 2", "sqrt(16)", "10 % 3"]), [4, 4, 1])
+
+    def test_errors_are_per_item(self):
+        """Test that a failing expression does not affect the others."""
+        results = calculate_batch(["1 / 0", "2 * 3", "2 +"])
+        self.assertEqual(results[0], "Error: Division by zero")
+        self.assertEqual(results[1], 6)
+        self.assertTrue(results[2].startswith("Error: Invalid mathematical expression"))
+
+    def test_duplicates_are_compiled_once(self):
+        """Test that repeated expressions share one compilation."""
+        results = calculate_batch(["2 + 3", " 2 + 3 ", "2  +  3"])
+        self.assertEqual(results, [5, 5, 5])
+        info = calculate_cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 0)
+
+    def test_empty_batch(self):
+        """Test that an empty batch returns an empty list."""
+        self.assertEqual(calculate_batch([]), [])
+
+    def test_batch_size_limit(self):
+        """Test that oversized batches are rejected."""
+        result = calculate_batch(["1"] * (MAX_BATCH_SIZE + 1))
+        self.assertTrue(result.startswith("Error:"))
+
+
+class TestCalculatorCache(unittest.TestCase):
+    """Test cases for the compiled-expression cache behind calculate."""
+
+    def setUp(self):
+        calculate_cache_clear()
+
+    def test_repeated_expression_hits_cache(self):
+        """Test that repeating an expression is served from the cache."""
+        self.assertEqual(calculate("2 + 3"), 5)
+        self.assertEqual(calculate("2 + 3"), 5)
+        info = calculate_cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.currsize, 1)
+
+    def test_whitespace_is_normalized(self):
+        """Test that whitespace variants share one cache entry."""
+        calculate("2 + 3")
+        calculate("  2   +  3 ")
+        self.assertEqual(calculate_cache_info().currsize, 1)
+
+    def test_cache_hit_allocates_almost_nothing(self):
+        """Test that a cached call does not rebuild namespaces or regex state."""
+        calculate("sqrt(16) + sin(pi/2)")
+        tracemalloc.start()
+        try:
+            calculate("sqrt(16) + sin(pi/2)")
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 2048)
+
+    def test_errors_are_not_cached(self):
+        """Test that invalid expressions do not occupy cache slots."""
+        calculate("2 + $")
+        calculate("2 +")
+        self.assertEqual(calculate_cache_info().currsize, 0)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.info().evictions, 1)
+
+
 if __name__ == "__main__":
     unittest.main()
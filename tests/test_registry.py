@@ -0,0 +1,222 @@
+"""Tests for lazy tool registration and server start-up cost."""
+
+from tools.registry import (TOOL_TARGETS, LazyTool, build_manifest, import_target, load_manifest, memo_key,
+                            stale_tools)
+from tools.cache import TTLCache
+from tools.instrumentation import ToolMetrics
+from fastmcp.tools import FunctionTool
+import unittest
+import asyncio
+import functools
+import json
+import subprocess
+import threading
+import sys
+import os
+import tempfile
+
+# Add the parent directory to the path so we can import tools
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tool modules (and their heavy dependencies) must not load when the server starts
+DEFERRED_MODULES = ["tools.math_tools", "tools.text_tools", "tools.vector_tools", "tools.stream_tools", "tools.stats_tools",
+                    "tools.linalg_tools", "numpy"]
+
+# Import-time budget for the project's own modules (demo + tools.*), in microseconds
+PROJECT_IMPORT_BUDGET_US = 100_000
+
+
+def import_times(statement):
+    """Run a statement under -X importtime and return {module: (self_us, cumulative_us)}."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=60,
+    )
+    if result.returncode != 0:
+        raise AssertionError(f"{statement!r} failed: {result.stderr[-2000:]}")
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        times[module.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+class TestManifest(unittest.TestCase):
+    """Check the committed manifest against the live tool functions."""
+
+    def test_manifest_is_up_to_date(self):
+        """Test that tools/manifest.json matches the schemas FastMCP builds today."""
+        self.assertEqual(stale_tools(), [],
+                         "tools/manifest.json is stale; run 'python -m tools.registry'")
+
+    def test_stale_entries_are_reported(self):
+        """Test that a changed or missing entry is detected."""
+        manifest = build_manifest()
+        manifest[0]["description"] = "outdated"
+        del manifest[-1]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "manifest.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            self.assertEqual(stale_tools(path), sorted([manifest[0]["name"], list(TOOL_TARGETS)[-1]]))
+
+    def test_list_entries_match_live_tools(self):
+        """Test that tools/list serves the same entries as registering the functions directly."""
+        for entry in load_manifest():
+            live = FunctionTool.from_function(import_target(entry["target"]), name=entry["name"])
+            lazy = LazyTool.from_manifest(entry)
+            self.assertEqual(lazy.to_mcp_tool(name=lazy.name).model_dump(by_alias=True),
+                             live.to_mcp_tool(name=live.name).model_dump(by_alias=True))
+
+
+class TestLazyTool(unittest.TestCase):
+    """Test cases for tools registered from the manifest."""
+
+    def test_manifest_lists_every_tool(self):
+        """Test that the manifest covers the package's tools in order."""
+        self.assertEqual([entry["name"] for entry in load_manifest()], list(TOOL_TARGETS))
+
+    def test_tool_loads_on_first_call(self):
+        """Test that the function is imported and wrapped only when first run."""
+        wrapped = []
+
+        def wrap(fn):
+            wrapped.append(fn.__name__)
+            return fn
+
+        tool = LazyTool.from_manifest(manifest_entry("add"), wrap=wrap)
+        self.assertFalse(tool.loaded)
+        result = asyncio.run(tool.run({"a": 2, "b": 3}))
+        self.assertTrue(tool.loaded)
+        self.assertEqual(result.structured_content, {"result": 5})
+        asyncio.run(tool.run({"a": 1, "b": 1}))
+        self.assertEqual(wrapped, ["add"])
+
+    def test_list_entry_is_built_once(self):
+        """Test that repeated tools/list requests reuse the same entry."""
+        tool = LazyTool.from_manifest(load_manifest()[0])
+        self.assertIs(tool.to_mcp_tool(name=tool.name), tool.to_mcp_tool(name=tool.name))
+        self.assertEqual(tool.to_mcp_tool(name="renamed").name, "renamed")
+        self.assertFalse(tool.loaded)
+
+    def test_inline_tool_runs_on_event_loop(self):
+        """Test that run_in_thread=False runs the function on the loop's thread."""
+        threads = []
+
+        def wrap(fn):
+            @functools.wraps(fn)
+            def record(*args, **kwargs):
+                threads.append(threading.get_ident())
+                return fn(*args, **kwargs)
+            return record
+
+        async def call(tool):
+            await tool.run({"a": 1, "b": 2})
+            return threading.get_ident()
+
+        inline = LazyTool.from_manifest(manifest_entry("add"), wrap=wrap, run_in_thread=False)
+        self.assertEqual(asyncio.run(call(inline)), threads[-1])
+        threaded = LazyTool.from_manifest(manifest_entry("add"), wrap=wrap)
+        self.assertNotEqual(asyncio.run(call(threaded)), threads[-1])
+
+
+def manifest_entry(name):
+    """Return the manifest entry of one tool."""
+    return next(entry for entry in load_manifest() if entry["name"] == name)
+
+
+class TestResultMemo(unittest.TestCase):
+    """Test cases for memoized tool results."""
+
+    def setUp(self):
+        self.calls = []
+
+        def wrap(fn):
+            @functools.wraps(fn)
+            def counted(*args, **kwargs):
+                self.calls.append(kwargs or args)
+                return fn(*args, **kwargs)
+            return counted
+
+        self.memo = TTLCache(maxsize=16, maxbytes=4096)
+        self.wrap = wrap
+
+    def tool(self, name):
+        return LazyTool.from_manifest(manifest_entry(name), wrap=self.wrap, memo=self.memo)
+
+    def test_repeated_call_is_served_from_cache(self):
+        """Test that an identical call reuses the stored result without running the tool."""
+        tool = self.tool("multiply")
+        first = asyncio.run(tool.run({"a": 6, "b": 7}))
+        second = asyncio.run(tool.run({"b": 7, "a": 6}))
+        self.assertIs(first, second)
+        self.assertEqual(second.structured_content, {"result": 42})
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.memo.info().hits, 1)
+
+    def test_memo_hits_are_counted_in_metrics(self):
+        """Test that calls answered from the memo still show up in the tool's metrics."""
+        metrics = ToolMetrics()
+        tool = LazyTool.from_manifest(manifest_entry("multiply"), memo=self.memo, metrics=metrics,
+                                      wrap=lambda fn: metrics.instrument(fn, name="multiply"))
+        for _ in range(3):
+            asyncio.run(tool.run({"a": 6, "b": 7}))
+        stats = metrics.snapshot()["multiply"]
+        self.assertEqual((stats["calls"], stats["memo_hits"], stats["errors"]), (3, 2, 0))
+
+    def test_tools_do_not_share_entries(self):
+        """Test that the key includes the tool name."""
+        add, multiply = self.tool("add"), self.tool("multiply")
+        self.assertEqual(asyncio.run(add.run({"a": 2, "b": 2})).structured_content, {"result": 4})
+        self.assertEqual(asyncio.run(multiply.run({"a": 2, "b": 3})).structured_content, {"result": 6})
+        self.assertEqual(len(self.calls), 2)
+
+    def test_errors_are_not_cached(self):
+        """Test that "Error: ..." results run the tool again next time."""
+        tool = self.tool("calculate")
+        for _ in range(2):
+            result = asyncio.run(tool.run({"expression": "1 / 0"}))
+            self.assertEqual(result.structured_content, {"result": "Error: Division by zero"})
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(len(self.memo), 0)
+
+    def test_without_memo_every_call_runs(self):
+        """Test that tools registered without a memo are not cached."""
+        tool = LazyTool.from_manifest(manifest_entry("add"), wrap=self.wrap)
+        asyncio.run(tool.run({"a": 1, "b": 2}))
+        asyncio.run(tool.run({"a": 1, "b": 2}))
+        self.assertEqual(len(self.calls), 2)
+
+    def test_memo_key_is_canonical(self):
+        """Test that argument order does not matter and unencodable arguments are skipped."""
+        self.assertEqual(memo_key("add", {"a": 1, "b": 2}), memo_key("add", {"b": 2, "a": 1}))
+        self.assertNotEqual(memo_key("add", {"a": 1, "b": 2}), memo_key("multiply", {"a": 1, "b": 2}))
+        self.assertIsNone(memo_key("add", {"a": float("nan"), "b": 2}))
+
+
+class TestServerStartup(unittest.TestCase):
+    """Check what importing the server costs."""
+
+    def test_tool_modules_are_not_imported_at_startup(self):
+        """Test that `import demo` defers every tool module."""
+        times = import_times("import demo")
+        self.assertIn("demo", times)
+        for module in DEFERRED_MODULES:
+            self.assertNotIn(module, times, f"{module} was imported at startup")
+
+    def test_project_import_budget(self):
+        """Test that the project's own modules stay within the start-up budget."""
+        times = import_times("import demo")
+        own = {name: self_us for name, (self_us, _) in times.items()
+               if name == "demo" or name == "tools" or name.startswith("tools.")}
+        total = sum(own.values())
+        self.assertLess(total, PROJECT_IMPORT_BUDGET_US,
+                        f"project modules took {total} us to import: {own}")
+
+
+if __name__ == "__main__":
+    unittest.main()
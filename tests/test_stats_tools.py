@@ -0,0 +1,204 @@
+"""Tests for the single-pass statistics tools."""
+
+from tools.arrays import encode_array
+from tools.stats_tools import (MAX_BINS, MAX_QUANTILES, MAX_STATS_SIZE, NOT_FINITE_ERROR, SKETCH_SIZE, QuantileSketch,
+                               RunningStats, StreamingHistogram, describe, histogram, quantiles)
+import unittest
+import statistics
+import random
+import bisect
+import math
+import sys
+import os
+
+# Add the parent directory to the path so we can import tools
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def rank_error(ordered, value, p):
+    """Return how far value's rank in ordered is from p's, as a fraction of the length."""
+    target = p * (len(ordered) - 1)
+    low, high = bisect.bisect_left(ordered, value), bisect.bisect_right(ordered, value)
+    if low <= target <= high:
+        return 0.0
+    return min(abs(low - target), abs(high - target)) / len(ordered)
+
+
+class TestRunningStats(unittest.TestCase):
+    """Test cases for Welford's algorithm."""
+
+    def test_matches_statistics_module(self):
+        """Test mean and variance against the two-pass results."""
+        rng = random.Random(3)
+        values = [rng.uniform(-50, 50) for _ in range(1000)]
+        stats = RunningStats()
+        for value in values:
+            stats.push(value)
+        self.assertAlmostEqual(stats.mean, statistics.fmean(values), places=12)
+        self.assertAlmostEqual(stats.variance(), statistics.variance(values), places=9)
+        self.assertAlmostEqual(stats.variance(population=True), statistics.pvariance(values), places=9)
+        self.assertEqual((stats.min, stats.max), (min(values), max(values)))
+
+    def test_large_offset_is_stable(self):
+        """Test that a large common offset does not destroy the variance."""
+        stats = RunningStats()
+        for value in (1e9 + 4, 1e9 + 7, 1e9 + 13, 1e9 + 16):
+            stats.push(value)
+        self.assertAlmostEqual(stats.variance(), 30.0, places=6)
+
+    def test_variance_needs_two_values(self):
+        """Test that the sample variance of one value is undefined."""
+        stats = RunningStats()
+        stats.push(3)
+        self.assertIsNone(stats.variance())
+        self.assertEqual(stats.variance(population=True), 0.0)
+
+
+class TestQuantileSketch(unittest.TestCase):
+    """Test cases for the KLL quantile sketch."""
+
+    def test_small_inputs_are_exact(self):
+        """Test linear interpolation between exact values up to the sketch size."""
+        sketch = QuantileSketch()
+        for value in range(SKETCH_SIZE, 0, -1):
+            sketch.push(value)
+        self.assertEqual(sketch.quantiles([0, 0.5, 1]), [1, 500.5, SKETCH_SIZE])
+
+    def test_memory_is_bounded(self):
+        """Test that the sketch holds a few thousand values for any stream length."""
+        sketch = QuantileSketch()
+        for value in range(200000):
+            sketch.push(value)
+        self.assertLess(sum(len(level) for level in sketch._levels), 4 * SKETCH_SIZE)
+        self.assertEqual(sketch.count, 200000)
+
+    def test_accuracy_does_not_depend_on_order(self):
+        """Test rank errors on shuffled, sorted and reverse-sorted input."""
+        rng = random.Random(7)
+        values = [rng.expovariate(1) for _ in range(100000)]
+        ordered = sorted(values)
+        probabilities = [0.01, 0.25, 0.5, 0.75, 0.99]
+        for stream in (values, ordered, ordered[::-1]):
+            sketch = QuantileSketch()
+            for value in stream:
+                sketch.push(value)
+            for p, estimate in zip(probabilities, sketch.quantiles(probabilities)):
+                self.assertLess(rank_error(ordered, estimate, p), 0.005)
+            self.assertEqual(sketch.quantiles([0, 1]), [ordered[0], ordered[-1]])
+
+    def test_estimates_are_reproducible(self):
+        """Test that the same input always gives the same estimates."""
+        values = [(i * 7919) % 10007 for i in range(20000)]
+        results = []
+        for _ in range(2):
+            sketch = QuantileSketch()
+            for value in values:
+                sketch.push(value)
+            results.append(sketch.quantiles([0.1, 0.5, 0.9]))
+        self.assertEqual(results[0], results[1])
+
+
+class TestStreamingHistogram(unittest.TestCase):
+    """Test cases for fixed and adaptive histograms."""
+
+    def test_adaptive_range_covers_every_value(self):
+        """Test that the range grows in both directions without losing counts."""
+        counter = StreamingHistogram(bins=8)
+        values = [0, 1, 0.5, 100, -100, 42, -3.5]
+        for value in values:
+            counter.push(value)
+        result = counter.result()
+        self.assertEqual(sum(result["counts"]), len(values))
+        self.assertEqual(len(result["edges"]), len(result["counts"]) + 1)
+        self.assertLessEqual(result["edges"][0], -100)
+        self.assertGreater(result["edges"][-1], 100)
+        for value in values:
+            index = bisect.bisect_right(result["edges"], value) - 1
+            self.assertGreater(result["counts"][index], 0)
+
+    def test_identical_values(self):
+        """Test that a constant stream becomes a single zero-width bin."""
+        counter = StreamingHistogram()
+        for _ in range(3):
+            counter.push(5)
+        self.assertEqual(counter.result(), {"edges": [5, 5], "counts": [3]})
+
+    def test_invalid_range(self):
+        """Test that low must be given with high and below it."""
+        with self.assertRaises(ValueError):
+            StreamingHistogram(4, low=1)
+        with self.assertRaises(ValueError):
+            StreamingHistogram(4, low=2, high=1)
+
+
+class TestStatsTools(unittest.TestCase):
+    """Test cases for the describe, quantiles and histogram tools."""
+
+    def test_describe(self):
+        """Test the summary of a small list."""
+        summary = describe([2, 4, 4, 4, 5, 5, 7, 9], bins=2)
+        self.assertEqual(summary["count"], 8)
+        self.assertEqual(summary["mean"], 5.0)
+        self.assertAlmostEqual(summary["variance"], 32 / 7)
+        self.assertAlmostEqual(summary["stddev"], (32 / 7) ** 0.5)
+        self.assertEqual((summary["min"], summary["max"]), (2, 9))
+        self.assertEqual(summary["quantiles"], {"0.25": 4.0, "0.5": 4.5, "0.75": 5.5})
+        self.assertEqual(sum(summary["histogram"]["counts"]), 8)
+        self.assertEqual(describe([2, 4, 4, 4, 5, 5, 7, 9], population=True)["stddev"], 2.0)
+        self.assertNotIn("histogram", describe([1, 2]))
+
+    def test_quantiles(self):
+        """Test quantiles in the requested order."""
+        self.assertEqual(quantiles([1, 2, 3, 4, 5], [0.5]), [3])
+        self.assertEqual(quantiles([5, 1, 4, 2, 3], [1, 0, 0.25]), [5, 1, 2])
+
+    def test_fixed_histogram(self):
+        """Test fixed bins with values outside the range."""
+        self.assertEqual(histogram([1, 2, 2, 3], bins=2, low=0, high=4),
+                         {"edges": [0.0, 2.0, 4.0], "counts": [1, 3], "below": 0, "above": 0})
+        result = histogram([-1, 0, 1, 4, 5], bins=4, low=0, high=4)
+        self.assertEqual((result["counts"], result["below"], result["above"]), ([1, 1, 0, 0], 1, 2))
+        self.assertTrue(histogram([1], low=1).startswith("Error: low and high"))
+
+    def test_empty_and_invalid_values(self):
+        """Test that empty lists and non-finite values are errors."""
+        self.assertEqual(describe([]), "Error: Cannot describe an empty list")
+        self.assertEqual(quantiles([]), "Error: Cannot take quantiles of an empty list")
+        self.assertEqual(histogram([]), {"edges": [], "counts": []})
+        for values in ([1, float("nan")], [float("inf"), 1], [2 ** 2000]):
+            self.assertEqual(describe(values, bins=4), NOT_FINITE_ERROR)
+            self.assertEqual(quantiles(values), NOT_FINITE_ERROR)
+            self.assertEqual(histogram(values), NOT_FINITE_ERROR)
+        self.assertEqual(describe([1e200, -1e200]), "Error: Result is too large")
+
+    def test_histogram_range_beyond_float(self):
+        """Test that a range wider than the largest float is an error, not NaN or inf edges."""
+        error = "Error: Histogram range is larger than the largest float"
+        self.assertEqual(histogram([-1e308, 1e308], bins=4), error)
+        self.assertEqual(histogram([0, 1e308, -1e308]), error)
+        self.assertEqual(histogram([1], bins=4, low=-1e308, high=1e308), error)
+        self.assertEqual(describe([0, 1e308, -1e308], bins=4), error)
+        result = histogram([0, 1e307, -1e307])
+        self.assertEqual(sum(result["counts"]), 3)
+        self.assertTrue(all(map(math.isfinite, result["edges"])))
+
+    def test_binary_arrays(self):
+        """Test that binary arrays, including multi-dimensional ones, are summarized like lists."""
+        values = [2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0]
+        self.assertEqual(describe(encode_array(values), bins=3), describe(values, bins=3))
+        self.assertEqual(quantiles(encode_array([5, 1, 4, 2, 3], "int64"), [0.5]), [3])
+        grid = {"dtype": "float64", "shape": [2, 4], "data": encode_array(values).data}
+        self.assertEqual(histogram(grid, bins=2, low=0, high=10)["counts"], [4, 4])
+        self.assertEqual(describe(encode_array([1.0, float("nan")])), NOT_FINITE_ERROR)
+
+    def test_request_limits(self):
+        """Test the size, quantile and bin limits."""
+        self.assertTrue(describe([0] * (MAX_STATS_SIZE + 1)).startswith("Error: Too many values"))
+        self.assertTrue(quantiles([1], [0.5] * (MAX_QUANTILES + 1)).startswith("Error: Too many quantiles"))
+        self.assertTrue(quantiles([1], [1.5]).startswith("Error: quantiles must be between"))
+        self.assertTrue(histogram([1], bins=MAX_BINS + 1).startswith("Error: bins must be between"))
+        self.assertTrue(describe([1], bins=-1).startswith("Error: bins must be between"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+"""Tests for the streaming batch tools."""
+
+from tools.stream_tools import MAX_CHUNK_SIZE, calculate_stream, greet_stream, set_thread_pool
+from tools.workers import ThreadOffload
+from tools.math_tools import calculate, iter_calculate
+from tools.text_tools import greet_many, iter_greetings
+from fastmcp import Client, FastMCP
+import unittest
+import asyncio
+import json
+import threading
+import time
+import sys
+import os
+
+# Add the parent directory to the path so we can import tools
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def stream(tool, arguments):
+    """Call a streaming tool through an MCP client; return (result, progress chunks)."""
+    server = FastMCP("stream-test")
+    server.tool(calculate_stream)
+    server.tool(greet_stream)
+    chunks = []
+
+    async def on_progress(progress, total, message):
+        chunks.append((progress, total, json.loads(message)))
+
+    async def call():
+        async with Client(server) as client:
+            return await client.call_tool(tool, arguments, progress_handler=on_progress)
+
+    return asyncio.run(call()).data, chunks
+
+
+class TestGenerators(unittest.TestCase):
+    """Test cases for the one-at-a-time result generators."""
+
+    def test_iter_calculate_matches_calculate(self):
+        """Test that the generator yields calculate()'s results lazily."""
+        expressions = ["2 + 3 * 4", "sqrt(16)", "1 / 0", "  1 +   1 "]
+        results = iter_calculate(expressions)
+        self.assertEqual(next(results), 14)
+        self.assertEqual(list(results), [calculate(e) for e in expressions[1:]])
+
+    def test_iter_greetings_matches_greet_many(self):
+        """Test that the generator yields greet_many's results."""
+        names = ["Alice", "  ", " Bob "]
+        self.assertEqual(list(iter_greetings(names, "fr")), greet_many(names, "fr"))
+        with self.assertRaises(ValueError):
+            iter_greetings(names, template="no placeholder")
+
+
+class TestStreaming(unittest.TestCase):
+    """Test cases for sending results as progress notifications."""
+
+    def test_results_arrive_in_chunks(self):
+        """Test chunk offsets, progress counts and the final summary."""
+        expressions = ["1 + 1", "1 / 0", "2 * 3", "sqrt(16)", "10 - 1"]
+        result, chunks = stream("calculate_stream", {"expressions": expressions, "chunk_size": 2})
+        self.assertEqual(result, {"count": 5, "errors": 1})
+        self.assertEqual([(progress, total) for progress, total, _ in chunks], [(2, 5), (4, 5), (5, 5)])
+        self.assertEqual([message["offset"] for _, _, message in chunks], [0, 2, 4])
+        streamed = [value for _, _, message in chunks for value in message["results"]]
+        self.assertEqual(streamed, [2, "Error: Division by zero", 6, 4, 9])
+
+    def test_collect_returns_every_result(self):
+        """Test that collect adds the full list to the final result."""
+        result, chunks = stream("greet_stream", {"names": ["Ana", " Zoë "], "language": "es", "collect": True})
+        self.assertEqual(result["results"], ["¡Hola, Ana! Bienvenido a FastMCP.", "¡Hola, Zoë! Bienvenido a FastMCP."])
+        self.assertEqual(chunks[0][2]["results"], result["results"])
+
+    def test_non_finite_results_are_null(self):
+        """Test that infinite and NaN results are sent as null rather than invalid JSON."""
+        result, chunks = stream("calculate_stream", {"expressions": ["1e308 * 10", "2"], "collect": True})
+        self.assertEqual(result["results"], [None, 2])
+        self.assertEqual(chunks[0][2]["results"], [None, 2])
+
+    def test_empty_batch(self):
+        """Test that an empty batch sends nothing."""
+        result, chunks = stream("greet_stream", {"names": []})
+        self.assertEqual(result, {"count": 0, "errors": 0})
+        self.assertEqual(chunks, [])
+
+    def test_invalid_requests(self):
+        """Test that bad chunk sizes and templates are reported as errors."""
+        result, chunks = stream("calculate_stream", {"expressions": ["1"], "chunk_size": MAX_CHUNK_SIZE + 1})
+        self.assertTrue(result.startswith("Error: chunk_size"))
+        result, chunks = stream("greet_stream", {"names": ["Ana"], "template": "Hi {user}"})
+        self.assertTrue(result.startswith("Error: Invalid template"))
+        self.assertEqual(chunks, [])
+
+
+class TestSharedThreadPool(unittest.TestCase):
+    """Test cases for producing chunks on the server's thread pool."""
+
+    def tearDown(self):
+        set_thread_pool(None, None)
+
+    def test_chunks_run_on_the_pool(self):
+        """Test that every chunk is produced by the shared pool."""
+        pool = ThreadOffload(2)
+        self.addCleanup(pool.shutdown)
+        set_thread_pool(pool, lambda: "Error: busy")
+        result, chunks = stream("calculate_stream", {"expressions": ["1", "2", "3"], "chunk_size": 2})
+        self.assertEqual(result, {"count": 3, "errors": 0})
+        # Two chunks and the empty one that ends the stream
+        self.assertEqual(pool.metrics()["completed"], 3)
+
+    def test_full_pool_refuses_the_call(self):
+        """Test that the pool's pending limit applies to streaming calls."""
+        pool = ThreadOffload(1, max_pending=1)
+        self.addCleanup(pool.shutdown)
+        set_thread_pool(pool, lambda: "Error: busy")
+        release = threading.Event()
+        blocker = threading.Thread(target=asyncio.run, args=(pool.run(release.wait),))
+        blocker.start()
+        try:
+            while pool.metrics()["pending"] < 1:
+                time.sleep(0.01)
+            result, chunks = stream("calculate_stream", {"expressions": ["1"]})
+        finally:
+            release.set()
+            blocker.join()
+        self.assertEqual(result, "Error: busy")
+        self.assertEqual(chunks, [])
+        self.assertEqual(pool.metrics()["rejected"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,6 @@
 """Tests for text processing tools."""
 
-from tools.text_tools import greet
+from tools.text_tools import MAX_GREET_BATCH, MAX_NAME_LENGTH, greet, greet_many
 import unittest
 import sys
 import os
@@ -102,5 +102,65 @@ class TestTextTools(unittest.TestCase):
         self.assertIn("Hello", result)
 
 
+class TestGreetingTemplates(unittest.TestCase):
+    """Test cases for localized and custom greeting templates."""
+
+    def test_languages(self):
+        """Test the built-in templates."""
+        self.assertEqual(greet("Ana", language="es"), "¡Hola, Ana! Bienvenido a FastMCP.")
+        self.assertEqual(greet("Zoë", language="fr"), "Bonjour, Zoë ! Bienvenue sur FastMCP.")
+        self.assertEqual(greet("Max", language="en"), greet("Max"))
+
+    def test_unknown_language(self):
+        """Test that an unknown language is reported."""
+        self.assertTrue(greet("Ana", language="xx").startswith("Error: language must be one of"))
+
+    def test_custom_template(self):
+        """Test templates with several placeholders and escaped braces."""
+        self.assertEqual(greet("Ana", template="Hi {name}!"), "Hi Ana!")
+        self.assertEqual(greet("Ana", template="{name}, {{really}} {name}"), "Ana, {really} Ana")
+        self.assertEqual(greet("Ana", language="xx", template="Hey {name}"), "Hey Ana")
+
+    def test_invalid_templates(self):
+        """Test that templates with other fields, format specs or bad braces are rejected."""
+        for template in ["Hello!", "Hi {user}", "Hi {name!r}", "Hi {name:>10}", "Hi {name", "{0}",
+                         "{name}" + "x" * 500]:
+            with self.subTest(template=template):
+                self.assertTrue(greet("Ana", template=template).startswith("Error:"))
+
+
+class TestGreetMany(unittest.TestCase):
+    """Test cases for greeting a list of names in one call."""
+
+    def test_greets_every_name_in_order(self):
+        """Test that one greeting is returned per name."""
+        self.assertEqual(greet_many(["Alice", "Bob"]),
+                         ["Hello, Alice! Welcome to FastMCP.", "Hello, Bob! Welcome to FastMCP."])
+        self.assertEqual(greet_many([]), [])
+
+    def test_names_are_normalized(self):
+        """Test trimming and NFC normalization."""
+        decomposed = "Jose\u0301"
+        self.assertEqual(greet_many(["  Alice\t", decomposed], template="<{name}>"),
+                         ["<Alice>", "<Jos\u00e9>"])
+
+    def test_invalid_names_do_not_affect_others(self):
+        """Test per-name errors for empty and overlong names."""
+        results = greet_many(["   ", "x" * (MAX_NAME_LENGTH + 1), "Ana"], language="de")
+        self.assertEqual(results[0], "Error: Name is empty")
+        self.assertTrue(results[1].startswith("Error: Name is longer than"))
+        self.assertEqual(results[2], "Hallo, Ana! Willkommen bei FastMCP.")
+        self.assertEqual(len(greet_many(["x" * MAX_NAME_LENGTH])[0]), len(greet("x" * MAX_NAME_LENGTH)))
+
+    def test_template_errors(self):
+        """Test that a bad language or template fails the whole call."""
+        self.assertTrue(greet_many(["Ana"], language="xx").startswith("Error:"))
+        self.assertTrue(greet_many(["Ana"], template="Hi").startswith("Error:"))
+
+    def test_batch_limit(self):
+        """Test that oversized lists are rejected."""
+        self.assertTrue(greet_many(["Ana"] * (MAX_GREET_BATCH + 1)).startswith("Error: Too many names"))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,99 @@
+"""Tests for vectorized expression evaluation."""
+
+from tools.arrays import decode_array, encode_array
+from tools.expression import FUNCTIONS
+from tools.math_tools import calculate
+from tools.vector_tools import NUMPY_FUNCTIONS, calculate_vectorized, np
+import unittest
+import math
+import re
+import sys
+import os
+
+# Add the parent directory to the path so we can import tools
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestCalculateVectorized(unittest.TestCase):
+    """Test cases for calculate_vectorized."""
+
+    def test_elementwise_evaluation(self):
+        """Test that the expression is applied at every position."""
+        result = calculate_vectorized("sin(x) * y + 2", {"x": [0, math.pi / 2], "y": [1, 3]})
+        self.assertEqual(len(result), 2)
+        self.assertAlmostEqual(result[0], 2.0)
+        self.assertAlmostEqual(result[1], 5.0)
+
+    def test_matches_scalar_calculate(self):
+        """Test that every function agrees with the scalar calculator."""
+        xs = [0.25, 0.5, 0.75]
+        for name in FUNCTIONS:
+            expression = f"{name}(x, 2)" if name in ("pow", "log", "round", "min", "max") else f"{name}(x)"
+            with self.subTest(function=name):
+                vector = calculate_vectorized(expression, {"x": xs})
+                for x, value in zip(xs, vector):
+                    scalar = calculate(re.sub(r"\bx\b", repr(x), expression))
+                    self.assertAlmostEqual(value, scalar, places=12)
+
+    def test_every_function_has_a_ufunc(self):
+        """Test that the NumPy table covers the scalar function table."""
+        self.assertEqual(set(NUMPY_FUNCTIONS), set(FUNCTIONS))
+
+    def test_reductions(self):
+        """Test that reduce collapses the result to one number."""
+        values = {"x": list(range(1, 101))}
+        self.assertEqual(calculate_vectorized("x", values, reduce="sum"), 5050.0)
+        self.assertEqual(calculate_vectorized("x * 2", values, reduce="max"), 200.0)
+        self.assertEqual(calculate_vectorized("x", values, reduce="mean"), 50.5)
+        self.assertTrue(calculate_vectorized("x", values, reduce="median").startswith("Error:"))
+
+    def test_large_input_in_one_call(self):
+        """Test evaluating a formula over 100k points."""
+        xs = list(range(100_000))
+        result = calculate_vectorized("x * 2 + 1", {"x": xs})
+        self.assertEqual(len(result), 100_000)
+        self.assertEqual(result[-1], 199_999.0)
+
+    def test_non_finite_values_become_none(self):
+        """Test that NaN and infinities are reported as None."""
+        self.assertEqual(calculate_vectorized("sqrt(x)", {"x": [4, -1]}), [2.0, None])
+        self.assertEqual(calculate_vectorized("1 / x", {"x": [0.0]}), [None])
+
+    def test_constant_expression_and_empty_input(self):
+        """Test expressions without variables and empty arrays."""
+        self.assertEqual(calculate_vectorized("2 + 3", {}), [5.0])
+        self.assertEqual(calculate_vectorized("x + 1", {"x": []}), [])
+
+    def test_errors(self):
+        """Test validation of variables and expressions."""
+        self.assertTrue(calculate_vectorized("x + y", {"x": [1, 2], "y": [1]}).startswith("Error:"))
+        self.assertTrue(calculate_vectorized("x + z", {"x": [1]}).startswith("Error:"))
+        self.assertTrue(calculate_vectorized("x", {"x": [[1, 2]]}).startswith("Error:"))
+        self.assertTrue(calculate_vectorized("__import__('os')", {}).startswith("Error:"))
+        self.assertTrue(calculate_vectorized("x", {"pi": [1]}).startswith("Error:"))
+        for expression in ("x + 2**5000", "x * 10**400"):
+            self.assertEqual(calculate_vectorized(expression, {"x": [1.0]}), "Error: Result is too large")
+
+    def test_binary_arrays(self):
+        """Test binary variables (mixed with lists) and binary results."""
+        x = np.linspace(0, 1, 5)
+        result = calculate_vectorized("x * 2 + y", {"x": encode_array(x), "y": [1, 1, 1, 1, 1]}, binary=True)
+        self.assertEqual(result.shape, [5])
+        np.testing.assert_array_equal(np.asarray(decode_array(result, 5)), x * 2 + 1)
+        self.assertEqual(calculate_vectorized("x", {"x": encode_array([1, 2], "int64")}, reduce="sum"), 3.0)
+
+    def test_binary_results_keep_non_finite_values(self):
+        """Test that NaN and infinities survive in binary results."""
+        result = decode_array(calculate_vectorized("1 / x", {"x": encode_array([0.0, 2.0])}, binary=True), 2)
+        self.assertEqual(result.tolist(), [math.inf, 0.5])
+
+    def test_invalid_binary_arrays(self):
+        """Test that malformed and multi-dimensional payloads are rejected."""
+        result = calculate_vectorized("x", {"x": {"shape": [2], "data": "AAAA"}})
+        self.assertTrue(result.startswith("Error: Variable 'x' is not a valid binary array"))
+        self.assertTrue(calculate_vectorized("x", {"x": encode_array(np.ones((2, 2)))}).startswith("Error:"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+"""Tests for the process worker pool."""
+
+from tools.math_tools import calculate
+from tools.workers import (PoolBusyError, PoolClosedError, PoolTimeoutError, ProcessWorkerPool,
+                           ThreadOffload, is_worker_process)
+import unittest
+import threading
+import asyncio
+import time
+import sys
+import os
+
+# Add the parent directory to the path so we can import tools
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestProcessWorkerPool(unittest.TestCase):
+    """Test cases for dispatching calls to worker processes."""
+
+    def test_calls_run_in_workers(self):
+        """Test that results come back from the worker processes."""
+        pool = ProcessWorkerPool(calculate, workers=2)
+        try:
+            self.assertEqual(pool.submit("2 + 3 * 4"), 14)
+            self.assertEqual(pool.submit("sqrt(16)"), 4)
+            metrics = pool.metrics()
+            self.assertEqual(metrics["workers"], 2)
+            self.assertEqual(metrics["completed"], 2)
+            self.assertEqual(metrics["queue_depth"], 0)
+        finally:
+            pool.shutdown()
+
+    def test_timeout_kills_and_replaces_worker(self):
+        """Test that a call past its deadline is abandoned and the pool recovers."""
+        pool = ProcessWorkerPool(time.sleep, workers=1, timeout=0.2)
+        try:
+            self.assertTrue(pool.wait_ready(60))
+            started = time.monotonic()
+            with self.assertRaises(PoolTimeoutError):
+                pool.submit(30)
+            self.assertLess(time.monotonic() - started, 5)
+            # The replacement's start-up does not count against this call's deadline
+            self.assertIsNone(pool.submit(0))
+            self.assertEqual(pool.metrics()["timeouts"], 1)
+        finally:
+            pool.shutdown()
+
+    def test_start_up_is_outside_the_deadline(self):
+        """Test that calls wait for booting workers instead of timing out."""
+        pool = ProcessWorkerPool(calculate, workers=1, timeout=0.1)
+        try:
+            self.assertEqual(pool.metrics()["booting"], 1)
+            self.assertEqual(pool.submit("6 * 7"), 42)
+            metrics = pool.metrics()
+            self.assertEqual((metrics["booting"], metrics["timeouts"]), (0, 0))
+        finally:
+            pool.shutdown()
+
+    def test_workers_are_recycled(self):
+        """Test that workers are replaced after max_tasks_per_worker calls."""
+        pool = ProcessWorkerPool(calculate, workers=1, max_tasks_per_worker=2)
+        try:
+            for _ in range(3):
+                self.assertEqual(pool.submit("1 + 1"), 2)
+            self.assertEqual(pool.metrics()["recycled"], 1)
+        finally:
+            pool.shutdown()
+
+    def test_wrap_reports_timeouts_as_results(self):
+        """Test that wrapped functions keep their name and map timeouts."""
+        pool = ProcessWorkerPool(time.sleep, workers=1, timeout=0.2)
+        try:
+            pooled = pool.wrap(time.sleep, lambda seconds: f"timed out after {seconds:g}s")
+            self.assertEqual(pooled.__name__, "sleep")
+            self.assertEqual(pooled(30), "timed out after 0.2s")
+        finally:
+            pool.shutdown()
+
+    def test_worker_processes_are_marked(self):
+        """Test that workers can tell they are pool workers and the parent is not."""
+        pool = ProcessWorkerPool(is_worker_process, workers=1)
+        try:
+            self.assertTrue(pool.submit())
+            self.assertFalse(is_worker_process())
+        finally:
+            pool.shutdown()
+
+    def test_submit_after_shutdown(self):
+        """Test that a closed pool refuses new work."""
+        pool = ProcessWorkerPool(calculate, workers=1)
+        pool.shutdown()
+        with self.assertRaises(PoolClosedError):
+            pool.submit("1 + 1")
+
+
+class TestThreadOffload(unittest.TestCase):
+    """Test cases for running blocking calls on a bounded thread pool."""
+
+    def setUp(self):
+        self.pool = ThreadOffload(workers=2, max_pending=3)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_calls_run_off_the_event_loop(self):
+        """Test that calls run on pool threads and return their results."""
+        async def call():
+            return await self.pool.run(threading.get_ident), threading.get_ident()
+
+        worker_thread, loop_thread = asyncio.run(call())
+        self.assertNotEqual(worker_thread, loop_thread)
+        self.assertEqual(self.pool.metrics()["completed"], 1)
+
+    def test_slow_call_does_not_block_the_loop(self):
+        """Test that the event loop keeps serving while a call runs."""
+        release = threading.Event()
+
+        async def scenario():
+            slow = asyncio.ensure_future(self.pool.run(release.wait, 5))
+            await asyncio.sleep(0.01)
+            ticks = 0
+            while not slow.done() and ticks < 5:
+                ticks += 1
+                await asyncio.sleep(0)
+            release.set()
+            return ticks, await slow
+
+        ticks, result = asyncio.run(scenario())
+        self.assertEqual(ticks, 5)
+        self.assertTrue(result)
+
+    def test_calls_beyond_max_pending_are_refused(self):
+        """Test backpressure: a full pool refuses calls instead of queueing them."""
+        release = threading.Event()
+        busy = self.pool.wrap(release.wait, lambda: "busy")
+
+        async def scenario():
+            held = [asyncio.ensure_future(busy(5)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            refused = await busy(5)
+            release.set()
+            return refused, await asyncio.gather(*held)
+
+        refused, held = asyncio.run(scenario())
+        self.assertEqual(refused, "busy")
+        self.assertEqual(held, [True, True, True])
+        metrics = self.pool.metrics()
+        self.assertEqual(metrics["rejected"], 1)
+        self.assertEqual(metrics["pending"], 0)
+
+    def test_run_raises_when_full(self):
+        """Test that run() itself signals backpressure with PoolBusyError."""
+        pool = ThreadOffload(workers=1, max_pending=1)
+        release = threading.Event()
+
+        async def scenario():
+            held = asyncio.ensure_future(pool.run(release.wait, 5))
+            await asyncio.sleep(0.01)
+            try:
+                await pool.run(int)
+            finally:
+                release.set()
+                await held
+
+        try:
+            with self.assertRaises(PoolBusyError):
+                asyncio.run(scenario())
+        finally:
+            pool.shutdown()
+
+    def test_failures_are_counted(self):
+        """Test that exceptions reach the caller and are counted."""
+        with self.assertRaises(ZeroDivisionError):
+            asyncio.run(self.pool.run(divmod, 1, 0))
+        self.assertEqual(self.pool.metrics()["failed"], 1)
+
+    def test_wrap_keeps_signature(self):
+        """Test that wrapped functions keep their name and become coroutines."""
+        offloaded = self.pool.wrap(calculate, lambda: "busy")
+        self.assertEqual(offloaded.__name__, "calculate")
+        self.assertTrue(asyncio.iscoroutinefunction(offloaded))
+        self.assertEqual(asyncio.run(offloaded("2 + 3")), 5)
+
+    def test_run_after_shutdown(self):
+        """Test that a closed pool refuses new work."""
+        self.pool.shutdown()
+        with self.assertRaises(PoolClosedError):
+            asyncio.run(self.pool.run(int))
+        self.assertEqual(self.pool.metrics()["pending"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,48 @@
 """Tools package for FastMCP demo."""
 
-from .math_tools import add, multiply, calculate
-from .text_tools import greet
+import importlib
 
-__all__ = ['add', 'multiply', 'calculate', 'greet']
+# Tool functions are imported on first access so that importing one
+# submodule (e.g. tools.cache) does not pull in every tool and its
+# dependencies (NumPy for calculate_vectorized and the linear algebra tools)
+_EXPORTS = {
+    'add': 'math_tools',
+    'multiply': 'math_tools',
+    'sum_many': 'math_tools',
+    'product_many': 'math_tools',
+    'mean_many': 'math_tools',
+    'calculate': 'math_tools',
+    'calculate_batch': 'math_tools',
+    'compile_formula': 'math_tools',
+    'eval_formula': 'math_tools',
+    'calculate_vectorized': 'vector_tools',
+    'describe': 'stats_tools',
+    'quantiles': 'stats_tools',
+    'histogram': 'stats_tools',
+    'matmul': 'linalg_tools',
+    'dot': 'linalg_tools',
+    'solve': 'linalg_tools',
+    'inverse': 'linalg_tools',
+    'determinant': 'linalg_tools',
+    'norm': 'linalg_tools',
+    'greet': 'text_tools',
+    'greet_many': 'text_tools',
+    'calculate_stream': 'stream_tools',
+    'greet_stream': 'stream_tools',
+}
+
+__all__ = ['add', 'multiply', 'sum_many', 'product_many', 'mean_many', 'calculate', 'calculate_batch',
+           'compile_formula', 'eval_formula', 'calculate_vectorized', 'describe', 'quantiles', 'histogram', 'matmul',
+           'dot', 'solve', 'inverse', 'determinant', 'norm', 'greet', 'greet_many', 'calculate_stream', 'greet_stream']
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,114 @@
+"""Compact binary encoding for numeric arrays.
+
+A JSON list of a million floats is about 20 MB of text, and parsing it
+into Python floats costs more than most tools spend computing on them.
+A BinaryArray carries the same numbers as base64-encoded little-endian
+float64 or int64 values behind a small header:
+
+    {"dtype": "float64", "shape": [3], "data": "AAAAAAAA8D8AAAAAAAAAQAAAAAAAAAhA"}
+
+Decoding is a single base64 pass; the values are then read in place
+through a memoryview (or a NumPy array over the same buffer) instead of
+being materialized as one Python object per element.
+"""
+
+import array
+import base64
+import binascii
+import math
+import sys
+from typing import Any, List, Literal, Sequence, Union
+
+from pydantic import BaseModel, ValidationError
+
+# memoryview/array format code for each supported dtype; all are 8 bytes wide
+FORMATS = {"float64": "d", "int64": "q"}
+
+# Native format codes NumPy and the array module use for 8-byte values
+_NATIVE_CODES = {"float64": {"d"}, "int64": {"q", "l", "n"}}
+
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+class BinaryArray(BaseModel):
+    """A numeric array packed as base64-encoded little-endian bytes, in row-major order."""
+
+    dtype: Literal["float64", "int64"] = "float64"
+    shape: List[int]
+    data: str
+
+
+def encode_array(values: Any, dtype: str = "float64") -> BinaryArray:
+    """
+    Pack numbers into a BinaryArray.
+
+    values may be a sequence of numbers or any buffer of 8-byte values of
+    the same kind (a NumPy array or memoryview), whose shape is kept;
+    contiguous buffers are encoded without an intermediate copy.
+    """
+    if dtype not in FORMATS:
+        raise ValueError(f"dtype must be one of {', '.join(FORMATS)}")
+    try:
+        view = memoryview(values)
+    except TypeError:
+        view = None
+    if (view is not None and _LITTLE_ENDIAN and view.c_contiguous and view.itemsize == 8
+            and view.format.lstrip("@=<") in _NATIVE_CODES[dtype]):
+        return BinaryArray(dtype=dtype, shape=list(view.shape), data=base64.b64encode(view).decode("ascii"))
+
+    packed = array.array(FORMATS[dtype], values)
+    if not _LITTLE_ENDIAN:
+        packed.byteswap()
+    return BinaryArray(dtype=dtype, shape=[len(packed)], data=base64.b64encode(packed).decode("ascii"))
+
+
+def decode_array(payload: Any, max_length: int) -> memoryview:
+    """
+    Unpack a BinaryArray (or an equivalent dict) into a memoryview.
+
+    The view has the payload's shape and format "d" (float64) or "q"
+    (int64), and shares the decoded buffer: np.asarray(view) wraps it
+    without copying. Raises ValueError for a malformed payload or one
+    holding more than max_length values, checked before decoding.
+    """
+    try:
+        payload = BinaryArray.model_validate(payload, from_attributes=True)
+    except ValidationError:
+        raise ValueError("expected an object with dtype (float64 or int64), shape and data") from None
+    if any(size < 0 for size in payload.shape):
+        raise ValueError("shape sizes must not be negative")
+    length = math.prod(payload.shape)
+    if length > max_length:
+        raise ValueError(f"too many values (limit is {max_length})")
+    # Every value is 8 bytes, so the padded base64 length is known up front
+    if len(payload.data) != 4 * ((length * 8 + 2) // 3):
+        raise ValueError(f"data does not hold {length} 8-byte values")
+    try:
+        raw = base64.b64decode(payload.data, validate=True)
+    except binascii.Error as e:
+        raise ValueError(f"data is not valid base64 ({e})") from None
+
+    code = FORMATS[payload.dtype]
+    if not _LITTLE_ENDIAN:
+        swapped = array.array(code, raw)
+        swapped.byteswap()
+        raw = swapped.tobytes()
+    if len(payload.shape) == 1 or not length:
+        # memoryview cannot give an empty buffer more than one dimension
+        return memoryview(raw).cast(code)
+    return memoryview(raw).cast(code, payload.shape)
+
+
+def decode_values(values: Union[Sequence, BinaryArray, Any], max_length: int) -> Union[Sequence, str]:
+    """
+    Return a list argument unchanged, or a binary one decoded and flattened.
+
+    Returns an "Error: ..." message for a malformed binary payload.
+    """
+    if isinstance(values, (list, tuple)):
+        return values
+    try:
+        view = decode_array(values, max_length)
+    except ValueError as e:
+        return f"Error: Invalid binary array - {e}"
+    return view if view.ndim == 1 else view.cast("B").cast(view.format)
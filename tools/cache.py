@@ -0,0 +1,154 @@
+"""Bounded caches shared by the tools package."""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from typing import Any, Callable, Hashable, Optional
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"])
+
+TTLCacheInfo = namedtuple("TTLCacheInfo", ["hits", "misses", "evictions", "expirations",
+                                           "maxsize", "currsize", "maxbytes", "currbytes", "ttl"])
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with hit/miss/eviction counters."""
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, marking it most recently used."""
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry if full."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def info(self) -> CacheInfo:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions, self.maxsize, len(self._data))
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache bounded by entry count and total size, with expiry.
+
+    Callers pass each value's size in bytes to put(); entries older than ttl
+    seconds are dropped when next looked up.
+    """
+
+    def __init__(self, maxsize: int = 1024, maxbytes: int = 1 << 20, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if maxbytes < 1:
+            raise ValueError("maxbytes must be at least 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()  # key -> (expires_at, size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key unless it is missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= self._clock():
+                self._remove(key)
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return entry[2]
+
+    def put(self, key: Hashable, value: Any, size: int = 1) -> bool:
+        """
+        Store value under key, evicting least recently used entries to fit.
+
+        Returns False (and stores nothing) if the value alone exceeds maxbytes.
+        """
+        if size > self.maxbytes:
+            return False
+        expires_at = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (expires_at, size, value)
+            self._bytes += size
+            while len(self._data) > self.maxsize or self._bytes > self.maxbytes:
+                self._remove(next(iter(self._data)))
+                self._evictions += 1
+        return True
+
+    def _remove(self, key: Hashable) -> None:
+        self._bytes -= self._data.pop(key)[1]
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+            self._hits = self._misses = self._evictions = self._expirations = 0
+
+    def info(self) -> TTLCacheInfo:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            return TTLCacheInfo(self._hits, self._misses, self._evictions, self._expirations,
+                                self.maxsize, len(self._data), self.maxbytes, self._bytes, self.ttl)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
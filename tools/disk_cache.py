@@ -0,0 +1,216 @@
+"""Persistent result cache shared by server processes, backed by SQLite.
+
+Every server process (e.g. one per Claude Desktop session) starts with
+empty in-memory caches. DiskCache keeps results in a SQLite database in
+WAL mode, so several processes can read and write it at once; it is
+bounded by entry count, evicting the least-used entries, and preloads the
+most-used entries into memory when it is opened.
+"""
+
+import functools
+import json
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from typing import Any, Callable, List, Optional, Tuple
+
+from .cache import LRUCache
+
+# Default number of entries kept on disk, and preloaded into memory on open
+DEFAULT_MAX_ENTRIES = 100000
+DEFAULT_WARM_ENTRIES = 1000
+
+# The entry count is checked (and excess entries evicted) every this many stores
+EVICT_EVERY = 100
+
+# Hit counts are buffered in memory and written once this many keys have hits
+FLUSH_HITS_EVERY = 256
+
+DiskCacheInfo = namedtuple("DiskCacheInfo", ["hits", "memory_hits", "misses", "stores", "evictions",
+                                             "errors", "warmed", "maxsize", "currsize", "path"])
+
+_MISSING = object()
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS results ("
+    " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+    " hits INTEGER NOT NULL DEFAULT 0, used REAL NOT NULL) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS results_rank ON results (hits, used)",
+]
+
+
+class DiskCache:
+    """
+    Size-bounded key/value cache in a SQLite file, with an in-memory front.
+
+    Values must be JSON-serializable. Lookups are answered from memory when
+    possible; each hit raises the entry's hit count, and entries with the
+    fewest hits (oldest first) are evicted when the file holds more than
+    maxsize entries (checked every EVICT_EVERY stores, so it can briefly
+    hold a few more). Database errors (locked, full or damaged file) make
+    the cache miss instead of failing the caller.
+    """
+
+    def __init__(self, path: str, maxsize: int = DEFAULT_MAX_ENTRIES, warm: int = DEFAULT_WARM_ENTRIES,
+                 memory_size: Optional[int] = None, timeout: float = 5.0):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.path = path
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._memory = LRUCache(memory_size or max(warm, 1024))
+        self._pending_hits = {}
+        self._stats = {"hits": 0, "memory_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "errors": 0}
+        # One connection shared by this process's threads, in autocommit mode
+        # so each write is its own short transaction
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            self._conn.execute(statement)
+        self.warmed = 0
+        for key, value in self.hottest(warm):
+            self._memory.put(key, value)
+            self.warmed += 1
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for key, or default."""
+        value = self._memory.get(key, _MISSING)
+        if value is not _MISSING:
+            with self._lock:
+                self._stats["memory_hits"] += 1
+                self._record_hit(key)
+            return value
+        with self._lock:
+            try:
+                row = self._conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error:
+                self._stats["errors"] += 1
+                row = None
+            if row is None:
+                self._stats["misses"] += 1
+                return default
+            self._stats["hits"] += 1
+            self._record_hit(key)
+        value = json.loads(row[0])
+        self._memory.put(key, value)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Store value under key, on disk and in memory."""
+        encoded = json.dumps(value)
+        self._memory.put(key, value)
+        with self._lock:
+            self._stats["stores"] += 1
+            self._transaction(lambda: self._insert(key, encoded))
+
+    def hottest(self, count: int) -> List[Tuple[str, Any]]:
+        """Return up to count (key, value) pairs, most-hit first."""
+        if count <= 0:
+            return []
+        with self._lock:
+            try:
+                rows = self._conn.execute("SELECT key, value FROM results ORDER BY hits DESC, used DESC LIMIT ?",
+                                          (count,)).fetchall()
+            except sqlite3.Error:
+                self._stats["errors"] += 1
+                return []
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def wrap(self, fn: Callable, key: Callable[..., Optional[str]],
+             store: Callable[[Any], bool] = lambda result: True) -> Callable:
+        """
+        Return a function with fn's signature that caches its results here.
+
+        key(*args, **kwargs) builds the cache key for a call, or returns None
+        to bypass the cache; store(result) decides whether a result is kept.
+        """
+        @functools.wraps(fn)
+        def cached(*args, **kwargs):
+            cache_key = key(*args, **kwargs)
+            if cache_key is None:
+                return fn(*args, **kwargs)
+            result = self.get(cache_key, _MISSING)
+            if result is _MISSING:
+                result = fn(*args, **kwargs)
+                if store(result):
+                    self.put(cache_key, result)
+            return result
+        return cached
+
+    def flush(self) -> None:
+        """Write buffered hit counts to disk."""
+        with self._lock:
+            if self._pending_hits:
+                self._transaction(self._write_hits)
+
+    def info(self) -> DiskCacheInfo:
+        """Return a snapshot of the cache counters."""
+        with self._lock:
+            try:
+                currsize = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            except sqlite3.Error:
+                currsize = -1
+            return DiskCacheInfo(warmed=self.warmed, maxsize=self.maxsize, currsize=currsize, path=self.path,
+                                 **self._stats)
+
+    def clear(self) -> None:
+        """Delete every entry, on disk and in memory."""
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._pending_hits.clear()
+        self._memory.clear()
+
+    def close(self) -> None:
+        """Flush hit counts and close the database."""
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def _record_hit(self, key: str) -> None:
+        # Called with the lock held
+        self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+        if len(self._pending_hits) >= FLUSH_HITS_EVERY:
+            self._transaction(self._write_hits)
+
+    def _transaction(self, work: Callable[[], None]) -> None:
+        # Called with the lock held. BEGIN IMMEDIATE takes the write lock up
+        # front, so concurrent writers from other processes wait (up to the
+        # connection timeout) instead of failing halfway through
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                work()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error:
+            self._stats["errors"] += 1
+
+    def _insert(self, key: str, encoded: str) -> None:
+        # Called inside a transaction; pending hit counts ride along
+        self._conn.execute("INSERT INTO results (key, value, used) VALUES (?, ?, ?)"
+                           " ON CONFLICT (key) DO UPDATE SET value = excluded.value, used = excluded.used",
+                           (key, encoded, time.time()))
+        self._write_hits()
+        if self._stats["stores"] % EVICT_EVERY == 0:
+            self._evict()
+
+    def _write_hits(self) -> None:
+        # Called with the lock held, inside a transaction
+        if self._pending_hits:
+            now = time.time()
+            self._conn.executemany("UPDATE results SET hits = hits + ?, used = ? WHERE key = ?",
+                                   [(hits, now, key) for key, hits in self._pending_hits.items()])
+            self._pending_hits.clear()
+
+    def _evict(self) -> None:
+        # Called with the lock held, inside a transaction
+        excess = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0] - self.maxsize
+        if excess > 0:
+            self._conn.execute("DELETE FROM results WHERE key IN"
+                               " (SELECT key FROM results ORDER BY hits, used LIMIT ?)", (excess,))
+            self._stats["evictions"] += excess
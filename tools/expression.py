@@ -0,0 +1,655 @@
+"""Safe arithmetic expression engine used by the calculator tools.
+
+Expressions are parsed once with :mod:`ast`, checked against a whitelist of
+node types, names and functions, and turned into a tree of small closures.
+Evaluating a compiled expression never touches ``eval`` and never re-parses
+the source text.
+
+Compilation also optimizes the tree: subexpressions without variables are
+folded into constants, identities such as x * 1 and x + 0 are dropped, and
+a function call repeated with the same arguments is evaluated once per call
+of the evaluator.
+
+Expressions compile for one numeric mode: FLOAT_MODE (the default),
+DECIMAL_MODE or FRACTION_MODE. In every mode integer-only arithmetic stays
+in Python ints, so it is exact and never converted; only division, negative
+powers and decimal literals switch to floats, Decimals or Fractions.
+"""
+
+import ast
+import collections
+import functools
+import math
+import operator
+from decimal import Decimal, getcontext, localcontext
+from fractions import Fraction
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Mapping, NamedTuple, Optional, Tuple, Union
+
+Number = Union[int, float]
+
+# A compiled expression: call with no argument, or with a mapping of
+# variable values if the expression was compiled with variables
+Evaluator = Callable[..., Any]
+
+# Longest source text accepted; anything larger is rejected before parsing
+MAX_EXPRESSION_LENGTH = 4096
+
+# Deepest operator/call nesting accepted in a parsed expression
+MAX_DEPTH = 100
+
+# Largest number of syntax tree nodes accepted in a parsed expression
+MAX_NODES = 1000
+
+# Longest integer literal accepted, in decimal digits
+MAX_LITERAL_DIGITS = 400
+
+# Largest integer any intermediate result may grow to, in bits (~3000 digits)
+MAX_INTEGER_BITS = 10000
+
+# Floats never exceed this many bits of magnitude; larger results overflow
+_FLOAT_BITS = 1024
+
+# Functions callable from an expression (read-only: shared by every call)
+FUNCTIONS = MappingProxyType({
+    "sin": math.sin,
+    "cos": math.cos,
+    "tan": math.tan,
+    "asin": math.asin,
+    "acos": math.acos,
+    "atan": math.atan,
+    "sinh": math.sinh,
+    "cosh": math.cosh,
+    "tanh": math.tanh,
+    "log": math.log,
+    "log10": math.log10,
+    "log2": math.log2,
+    "exp": math.exp,
+    "sqrt": math.sqrt,
+    "pow": math.pow,
+    "abs": abs,
+    "round": round,
+    "floor": math.floor,
+    "ceil": math.ceil,
+    "min": min,
+    "max": max,
+})
+
+# Named constants usable in an expression (read-only: shared by every call)
+CONSTANTS = MappingProxyType({
+    "pi": math.pi,
+    "e": math.e,
+})
+
+_BINARY_OPERATORS = MappingProxyType({
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+})
+
+_UNARY_OPERATORS = MappingProxyType({
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+})
+
+
+class NumericMode(NamedTuple):
+    """How literals, constants, functions and operators behave in one number system."""
+
+    name: str
+    # Converts a decimal literal's source text (e.g. "0.1"); None keeps the float
+    literal: Optional[Callable[[str], Any]]
+    # Constant values, or zero-argument callables evaluated on each call
+    constants: Mapping[str, Any]
+    functions: Mapping[str, Callable]
+    operators: Mapping[type, Callable]
+    # Whether results are independent of the decimal context, so constant
+    # subexpressions can be computed once at compile time
+    context_free: bool = True
+
+
+def _via_float(fn: Callable) -> Callable:
+    """Run a math function in floating point and return the result as a Decimal."""
+    def wrapper(*args):
+        return Decimal(fn(*[float(arg) for arg in args]))
+    return wrapper
+
+
+def _decimal_log(x, base=None):
+    return Decimal(x).ln() if base is None else Decimal(x).ln() / Decimal(base).ln()
+
+
+@functools.lru_cache(maxsize=8)
+def _decimal_pi_at(precision: int) -> Decimal:
+    """
+    Compute pi to the given number of digits (recipe from the decimal docs).
+
+    The result keeps two guard digits, so expressions built on it round
+    correctly at the requested precision.
+    """
+    with localcontext() as ctx:
+        ctx.prec = precision + 2
+        three = Decimal(3)
+        last, t, s, n, na, d, da = 0, three, 3, 1, 0, 0, 24
+        while s != last:
+            last = s
+            n, na = n + na, na + 8
+            d, da = d + da, da + 32
+            t = (t * n) / d
+            s += t
+    return s
+
+
+@functools.lru_cache(maxsize=8)
+def _decimal_e_at(precision: int) -> Decimal:
+    """Compute e to the given number of digits, plus two guard digits."""
+    with localcontext() as ctx:
+        ctx.prec = precision + 2
+        return Decimal(1).exp()
+
+
+def _exact_operators(convert: Callable) -> Mapping[type, Callable]:
+    """
+    Operators for an exact mode whose number type is built by convert.
+
+    int / int and int ** negative int are the only integer operations that
+    leave the integers; they convert to the mode's type instead of float.
+    """
+    def divide(a, b):
+        return convert(a) / b if isinstance(a, int) and isinstance(b, int) else a / b
+
+    def power(a, b):
+        return convert(a) ** b if isinstance(a, int) and isinstance(b, int) and b < 0 else a ** b
+
+    operators = dict(_BINARY_OPERATORS)
+    operators[ast.Div] = divide
+    operators[ast.Pow] = power
+    return MappingProxyType(operators)
+
+
+def _exact_sqrt(x):
+    """Square root that stays exact for perfect squares and falls back to float."""
+    if isinstance(x, (int, Fraction)) and x >= 0:
+        numerator, denominator = Fraction(x).as_integer_ratio()
+        root_n, root_d = math.isqrt(numerator), math.isqrt(denominator)
+        if root_n * root_n == numerator and root_d * root_d == denominator:
+            return Fraction(root_n, root_d)
+    return math.sqrt(x)
+
+
+FLOAT_MODE = NumericMode("float", None, CONSTANTS, FUNCTIONS, _BINARY_OPERATORS)
+
+# Decimals at the current decimal context's precision; trigonometric and
+# hyperbolic functions and pow() are computed in double precision
+DECIMAL_MODE = NumericMode(
+    "decimal",
+    Decimal,
+    MappingProxyType({
+        "pi": lambda: _decimal_pi_at(getcontext().prec),
+        "e": lambda: _decimal_e_at(getcontext().prec),
+    }),
+    MappingProxyType(dict(
+        {name: _via_float(fn) for name, fn in FUNCTIONS.items()},
+        sqrt=lambda x: Decimal(x).sqrt(),
+        exp=lambda x: Decimal(x).exp(),
+        log=_decimal_log,
+        log10=lambda x: Decimal(x).log10(),
+        log2=lambda x: Decimal(x).ln() / Decimal(2).ln(),
+        abs=abs, round=round, floor=math.floor, ceil=math.ceil, min=min, max=max,
+    )),
+    _exact_operators(Decimal),
+    context_free=False,
+)
+
+# Exact rationals; irrational results (sqrt of a non-square, sin, pi, ...)
+# fall back to float
+FRACTION_MODE = NumericMode(
+    "fraction",
+    Fraction,
+    CONSTANTS,
+    MappingProxyType(dict(FUNCTIONS, sqrt=_exact_sqrt)),
+    _exact_operators(Fraction),
+)
+
+NUMERIC_MODES = MappingProxyType({mode.name: mode for mode in (FLOAT_MODE, DECIMAL_MODE, FRACTION_MODE)})
+
+
+class ExpressionError(Exception):
+    """Raised when an expression is rejected before it is evaluated."""
+
+
+class ExpressionLimits(NamedTuple):
+    """Budgets an expression must fit in before it is allowed to run."""
+
+    max_length: int = MAX_EXPRESSION_LENGTH
+    max_depth: int = MAX_DEPTH
+    max_nodes: int = MAX_NODES
+    max_literal_digits: int = MAX_LITERAL_DIGITS
+    max_integer_bits: int = MAX_INTEGER_BITS
+
+
+class ExpressionCost(NamedTuple):
+    """Static cost estimate of a parsed expression."""
+
+    nodes: int
+    depth: int
+    literal_digits: int
+    integer_bits: float
+
+
+class _Scope(NamedTuple):
+    """Everything a compilation pass needs to resolve and budget names."""
+
+    limits: ExpressionLimits
+    variables: FrozenSet[str]
+    functions: Mapping[str, Callable]
+    mode: NumericMode
+    source: str
+    # Keys of function calls that appear more than once, by id(node), and
+    # the shared evaluators built for them
+    repeated: Mapping[int, str]
+    shared: Dict[str, Evaluator]
+
+
+# Marks a compiled node whose value is only known at run time
+_RUNTIME = object()
+
+
+DEFAULT_LIMITS = ExpressionLimits()
+
+
+def parse(expression: str, limits: ExpressionLimits = DEFAULT_LIMITS) -> ast.expr:
+    """
+    Parse an expression and return the root node of its syntax tree.
+
+    Raises ExpressionError for input that is too long and SyntaxError for
+    text that is not a Python expression. The tree is not validated yet;
+    compile_expression() does that while building the evaluator.
+    """
+    if len(expression) > limits.max_length:
+        raise ExpressionError(
+            f"Expression is too long (limit is {limits.max_length} characters)")
+    return ast.parse(expression.strip(), mode="eval").body
+
+
+def compile_expression(expression: str,
+                       limits: Optional[ExpressionLimits] = None,
+                       variables: Iterable[str] = (),
+                       functions: Optional[Mapping[str, Callable]] = None,
+                       mode: NumericMode = FLOAT_MODE) -> Evaluator:
+    """
+    Validate an expression and compile it into an evaluator.
+
+    Only numeric literals, the names in CONSTANTS, the given variable names,
+    calls to functions (FUNCTIONS by default; same names, other
+    implementations) and the arithmetic operators +, -, *, /, //, % and **
+    are accepted; anything else raises ExpressionError. The expression's
+    static cost is checked against limits (DEFAULT_LIMITS when omitted)
+    before the evaluator is returned.
+
+    mode picks the number system (see NUMERIC_MODES); functions, if given,
+    replaces the mode's function table. Decimal results follow the decimal
+    context active when the evaluator is called.
+
+    The evaluator takes an optional mapping of variable values:
+    compile_expression("x * 2", variables=["x"])({"x": 21}) → 42
+    """
+    limits = limits or DEFAULT_LIMITS
+    variables = frozenset(variables)
+    for name in variables:
+        if not name.isidentifier() or name in CONSTANTS or name in FUNCTIONS:
+            raise ExpressionError(f"Invalid variable name '{name}'")
+    tree = parse(expression, limits)
+    # Check the static cost first: compiling folds constant subexpressions
+    check_cost(estimate_cost(tree, limits.max_depth), limits)
+    scope = _Scope(limits, variables, mode.functions if functions is None else functions,
+                   mode, expression.strip(), _repeated_calls(tree), {})
+    evaluator, _ = _compile_node(tree, 1, scope)
+    if scope.shared:
+        # Shared calls store their results in a per-call copy of the variables
+        root = evaluator
+        return lambda env=None: root(dict(env) if env else {})
+    return evaluator
+
+
+def _repeated_calls(tree: ast.expr) -> Mapping[int, str]:
+    """Map each function call node whose exact text occurs more than once to a common key."""
+    keys = {id(node): ast.dump(node) for node in ast.walk(tree) if isinstance(node, ast.Call)}
+    counts = collections.Counter(keys.values())
+    return {node_id: key for node_id, key in keys.items() if counts[key] > 1}
+
+
+def estimate_cost(tree: ast.expr, max_depth: Optional[int] = None) -> ExpressionCost:
+    """
+    Estimate how expensive an expression tree is to evaluate.
+
+    integer_bits is an upper bound on the size of the largest integer any
+    subexpression can produce; it is what catches inputs like 9**9**9
+    without computing them. The tree need not be validated yet: syntax the
+    compiler rejects adds nothing to the estimate. With max_depth, nodes
+    nested deeper than that are not walked (the depth still exceeds it).
+    """
+    totals = {"nodes": 0, "depth": 0, "literal_digits": 0, "integer_bits": 0.0}
+    _estimate_node(tree, 1, totals, max_depth)
+    return ExpressionCost(**totals)
+
+
+def check_cost(cost: ExpressionCost, limits: ExpressionLimits) -> None:
+    """Raise ExpressionError if an estimated cost exceeds any budget."""
+    if cost.depth > limits.max_depth:
+        raise ExpressionError(f"Expression is nested too deeply (limit is {limits.max_depth})")
+    if cost.nodes > limits.max_nodes:
+        raise ExpressionError(f"Expression has too many terms (limit is {limits.max_nodes})")
+    if cost.literal_digits > limits.max_literal_digits:
+        raise ExpressionError(
+            f"Number literal is too long (limit is {limits.max_literal_digits} digits)")
+    if cost.integer_bits >= limits.max_integer_bits:
+        raise ExpressionError(
+            f"Expression is too expensive: intermediate result could need "
+            f"{_format_bits(cost.integer_bits)} bits (limit is {limits.max_integer_bits})")
+
+
+def _format_bits(bits: float) -> str:
+    """Render a bit estimate compactly, e.g. 1.2e+09."""
+    return f"{bits:.0f}" if bits < 1e6 else f"{bits:.1e}"
+
+
+def _estimate_node(node: ast.expr, depth: int, totals: dict,
+                   max_depth: Optional[int] = None) -> Tuple[bool, float]:
+    """
+    Walk a node and return (may_be_int, log2 of its magnitude bound).
+
+    Only integer results are tracked against the bit budget: float results
+    are capped at _FLOAT_BITS because they overflow quickly instead of
+    growing without bound.
+    """
+    totals["nodes"] += 1
+    totals["depth"] = max(totals["depth"], depth)
+    if max_depth is not None and depth > max_depth:
+        return False, 0.0
+    depth += 1
+
+    if isinstance(node, ast.Constant):
+        value = node.value
+        if isinstance(value, int):
+            totals["literal_digits"] = max(totals["literal_digits"], len(str(abs(value))))
+            bits = math.log2(abs(value)) if abs(value) > 1 else 0.0
+            is_int = True
+        elif isinstance(value, float):
+            bits, is_int = (math.log2(abs(value)) if abs(value) > 1 else 0.0), False
+        else:
+            bits, is_int = 0.0, False
+    elif isinstance(node, ast.Name):
+        # Variables are unbounded here; the guarded ** catches them at run time
+        bits, is_int = math.log2(CONSTANTS.get(node.id, 2.0)), False
+    elif isinstance(node, ast.UnaryOp):
+        is_int, bits = _estimate_node(node.operand, depth, totals, max_depth)
+    elif isinstance(node, ast.BinOp):
+        left_int, left = _estimate_node(node.left, depth, totals, max_depth)
+        right_int, right = _estimate_node(node.right, depth, totals, max_depth)
+        is_int = left_int and right_int
+        if isinstance(node.op, (ast.Add, ast.Sub)):
+            bits = max(left, right) + 1
+        elif isinstance(node.op, ast.Mult):
+            bits = left + right
+        elif isinstance(node.op, ast.Div):
+            bits, is_int = _FLOAT_BITS, False
+        elif isinstance(node.op, ast.FloorDiv):
+            bits = left
+        elif isinstance(node.op, ast.Mod):
+            bits = right
+        else:
+            # |base| ** exponent < 2 ** (bits(base) * max|exponent|); a literal
+            # exponent is used as written, free of log2 rounding
+            if isinstance(node.right, ast.Constant) and type(node.right.value) is int:
+                exponent = float(abs(node.right.value)) if right < _FLOAT_BITS else math.inf
+            else:
+                exponent = 2.0 ** right if right < _FLOAT_BITS else math.inf
+            bits = left * exponent if left else 0.0
+    elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        args = [_estimate_node(arg, depth, totals, max_depth) for arg in node.args]
+        name = node.func.id
+        if name in ("abs", "round", "floor", "ceil", "min", "max"):
+            is_int = (any(arg_int for arg_int, _ in args) or name in ("floor", "ceil")
+                      or (name == "round" and len(args) == 1))
+            bits = max((arg_bits for _, arg_bits in args), default=0.0)
+        else:
+            is_int, bits = False, _FLOAT_BITS
+    else:
+        # Unsupported syntax; compilation rejects it
+        bits, is_int = 0.0, False
+
+    if is_int:
+        totals["integer_bits"] = max(totals["integer_bits"], bits)
+    else:
+        bits = min(bits, _FLOAT_BITS)
+    return is_int, bits
+
+
+def _magnitude_bits(value: Any) -> int:
+    """Bits in the largest integer part of an exact number (0 for other types)."""
+    if isinstance(value, int):
+        return abs(value).bit_length()
+    if isinstance(value, Fraction):
+        return max(abs(value.numerator).bit_length(), value.denominator.bit_length())
+    return 0
+
+
+def _magnitude(value: Any) -> int:
+    """Largest integer part of an exact number: |n| for an int, max(|p|, q) for p/q (0 otherwise)."""
+    if isinstance(value, int):
+        return abs(value)
+    if isinstance(value, Fraction):
+        return max(abs(value.numerator), value.denominator)
+    return 0
+
+
+def _guarded_pow(max_bits: int, power: Callable = operator.pow) -> Callable[[Number, Number], Number]:
+    """Build a ** operator that refuses exact results larger than max_bits."""
+    def guarded(base, exponent):
+        if isinstance(exponent, int):
+            magnitude = _magnitude(base)
+            # |m| ** e has floor(e * log2|m|) + 1 bits; the first test also
+            # keeps huge exponents out of float arithmetic
+            if magnitude > 1 and (abs(exponent) >= max_bits
+                                  or abs(exponent) * math.log2(magnitude) >= max_bits):
+                raise ExpressionError(
+                    f"Expression is too expensive: result would exceed {max_bits} bits")
+        return power(base, exponent)
+    return guarded
+
+
+def _guarded_exact(max_bits: int, op: Callable, product: bool = False) -> Callable[[Number, Number], Number]:
+    """
+    Build a +, -, * or // that refuses exact results larger than max_bits.
+
+    Used when an expression has variables, whose values the static cost
+    estimate cannot see. A product is refused before it is computed if
+    it is certain to be too large; every result is checked exactly after.
+    """
+    def guarded(a, b):
+        if product and _magnitude_bits(a) + _magnitude_bits(b) > max_bits + 1:
+            raise ExpressionError(f"Expression is too expensive: result would exceed {max_bits} bits")
+        result = op(a, b)
+        if _magnitude_bits(result) > max_bits:
+            raise ExpressionError(f"Expression is too expensive: result would exceed {max_bits} bits")
+        return result
+    return guarded
+
+
+def _guarded_round(max_bits: int, rounder: Callable = round) -> Callable:
+    """Build a round() that refuses to scale an exact number by 10 ** ndigits beyond max_bits."""
+    def guarded(number, *ndigits):
+        if (ndigits and isinstance(ndigits[0], int) and isinstance(number, (int, Fraction))
+                and abs(ndigits[0]) * math.log2(10) > max_bits):
+            raise ExpressionError(
+                f"Expression is too expensive: rounding to {ndigits[0]} digits would exceed {max_bits} bits")
+        return rounder(number, *ndigits)
+    return guarded
+
+
+def _fold(scope: _Scope, func: Callable, values: list) -> Any:
+    """
+    Compute a subexpression whose operands are all constants, at compile time.
+
+    Returns _RUNTIME when the result must wait for run time: when computing
+    it raises (so the error surfaces on evaluation as before), when it
+    depends on the decimal context, or when it is an exact number larger
+    than the integer budget.
+    """
+    if not scope.mode.context_free and not all(type(value) is int for value in values):
+        return _RUNTIME
+    try:
+        result = func(*values)
+    except Exception:
+        return _RUNTIME
+    if not scope.mode.context_free and type(result) is not int:
+        return _RUNTIME
+    if _magnitude_bits(result) > scope.limits.max_integer_bits:
+        return _RUNTIME
+    return result
+
+
+def _is_int(value: Any, expected: int) -> bool:
+    """Whether a compile-time value is exactly the int expected (not 1.0 or True)."""
+    return type(value) is int and value == expected
+
+
+def _constant(value: Any) -> Tuple[Evaluator, Any]:
+    return (lambda env=None: value), value
+
+
+def _compile_node(node: ast.expr, depth: int, scope: _Scope) -> Tuple[Evaluator, Any]:
+    """
+    Recursively turn a validated node into a closure over the variable mapping.
+
+    Returns (evaluator, value): value is the node's constant value if it
+    was folded at compile time, otherwise _RUNTIME.
+    """
+    if depth > scope.limits.max_depth:
+        raise ExpressionError(
+            f"Expression is nested too deeply (limit is {scope.limits.max_depth})")
+    depth += 1
+
+    if isinstance(node, ast.Constant):
+        value = node.value
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ExpressionError(f"Unsupported literal {value!r}")
+        if isinstance(value, float) and scope.mode.literal is not None:
+            # Convert the literal as written ("0.1"), not its binary float value
+            value = scope.mode.literal(ast.get_source_segment(scope.source, node).replace("_", ""))
+        return _constant(value)
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        if name in scope.variables:
+            return (lambda env=None: env[name]), _RUNTIME
+        if name not in scope.mode.constants:
+            raise ExpressionError(f"Unknown name '{name}'")
+        value = scope.mode.constants[name]
+        if callable(value):
+            return (lambda env=None: value()), _RUNTIME
+        return _constant(value)
+
+    if isinstance(node, ast.BinOp):
+        op = scope.mode.operators.get(type(node.op))
+        if op is None:
+            raise ExpressionError(f"Unsupported operator {type(node.op).__name__}")
+        if isinstance(node.op, ast.Pow):
+            op = _guarded_pow(scope.limits.max_integer_bits, op)
+        elif scope.variables and isinstance(node.op, (ast.Add, ast.Sub, ast.Mult, ast.FloorDiv)):
+            op = _guarded_exact(scope.limits.max_integer_bits, op, product=isinstance(node.op, ast.Mult))
+        left, left_value = _compile_node(node.left, depth, scope)
+        right, right_value = _compile_node(node.right, depth, scope)
+        if left_value is not _RUNTIME and right_value is not _RUNTIME:
+            value = _fold(scope, op, [left_value, right_value])
+            if value is not _RUNTIME:
+                return _constant(value)
+        # Identities that keep the other operand's value and type
+        if isinstance(node.op, (ast.Add, ast.Sub)) and _is_int(right_value, 0):
+            return left, left_value
+        if isinstance(node.op, ast.Add) and _is_int(left_value, 0):
+            return right, right_value
+        if isinstance(node.op, (ast.Mult, ast.Pow)) and _is_int(right_value, 1):
+            return left, left_value
+        if isinstance(node.op, ast.Mult) and _is_int(left_value, 1):
+            return right, right_value
+        return (lambda env=None: op(left(env), right(env))), _RUNTIME
+
+    if isinstance(node, ast.UnaryOp):
+        op = _UNARY_OPERATORS.get(type(node.op))
+        if op is None:
+            raise ExpressionError(f"Unsupported operator {type(node.op).__name__}")
+        if (isinstance(node.op, ast.USub) and isinstance(node.operand, ast.UnaryOp)
+                and isinstance(node.operand.op, ast.USub)):
+            # -(-x) is x
+            return _compile_node(node.operand.operand, depth + 1, scope)
+        operand, operand_value = _compile_node(node.operand, depth, scope)
+        if operand_value is not _RUNTIME:
+            value = _fold(scope, op, [operand_value])
+            if value is not _RUNTIME:
+                return _constant(value)
+        if isinstance(node.op, ast.UAdd):
+            return operand, operand_value
+        return (lambda env=None: op(operand(env))), _RUNTIME
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name):
+            raise ExpressionError("Only named functions can be called")
+        if node.func.id not in scope.functions:
+            raise ExpressionError(f"Unknown function '{node.func.id}'")
+        if node.keywords or any(isinstance(arg, ast.Starred) for arg in node.args):
+            raise ExpressionError(f"Function '{node.func.id}' only takes positional arguments")
+        key = scope.repeated.get(id(node))
+        if key in scope.shared:
+            return scope.shared[key], _RUNTIME
+        func = scope.functions[node.func.id]
+        if node.func.id == "round":
+            func = _guarded_round(scope.limits.max_integer_bits, func)
+        compiled = [_compile_node(arg, depth, scope) for arg in node.args]
+        values = [value for _, value in compiled]
+        if all(value is not _RUNTIME for value in values):
+            value = _fold(scope, func, values)
+            if value is not _RUNTIME:
+                return _constant(value)
+        args = [arg for arg, _ in compiled]
+        call = _call(func, args)
+        if key is not None:
+            call = scope.shared[key] = _shared(call)
+        return call, _RUNTIME
+
+    raise ExpressionError(f"Unsupported syntax: {type(node).__name__}")
+
+
+def _call(func: Callable, args: list) -> Evaluator:
+    """Build the evaluator of a function call, unrolled for the common arities."""
+    if len(args) == 1:
+        (arg,) = args
+
+        def call(env=None):
+            return func(arg(env))
+    elif len(args) == 2:
+        first, second = args
+
+        def call(env=None):
+            return func(first(env), second(env))
+    else:
+        def call(env=None):
+            return func(*[arg(env) for arg in args])
+    return call
+
+
+def _shared(call: Evaluator) -> Evaluator:
+    """Wrap a repeated call so it is computed once per evaluation and then read back."""
+    slot = object()
+
+    def shared(env=None):
+        value = env.get(slot, _RUNTIME)
+        if value is _RUNTIME:
+            value = env[slot] = call(env)
+        return value
+    return shared
@@ -0,0 +1,256 @@
+"""Linear algebra on matrices and stacks of matrices.
+
+Requires NumPy; without it the tools return an error message instead of a
+result. Each tool is a single NumPy call backed by BLAS/LAPACK, and works
+on batches: an input of shape (batch..., n, m) is a stack of matrices,
+all processed in that one call. Shapes are checked before any work is
+done, and matrix sizes are capped so one request cannot tie up a server
+thread for long.
+"""
+
+import math
+from typing import Any, List, Union
+
+from .arrays import BinaryArray, decode_array, encode_array
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without NumPy
+    np = None
+
+# Largest number of rows or columns of any one matrix
+MAX_MATRIX_SIZE = 500
+
+# Largest number of values in any one input or result, across the whole batch
+MAX_ELEMENTS = 1_000_000
+
+# Norms accepted by norm(), for vectors and for matrices
+VECTOR_NORMS = ("1", "2", "inf")
+MATRIX_NORMS = ("fro", "nuc", "1", "2", "inf")
+
+NUMPY_REQUIRED = "Error: Linear algebra tools require NumPy (pip install numpy)"
+
+# A number, a (nested) list of numbers, or a binary array with its shape
+Array = Union[List[Any], float, BinaryArray]
+
+Result = Union[List[Any], float, None, BinaryArray, str]
+
+
+def matmul(a: Array, b: Array, binary: bool = False) -> Result:
+    """
+    Multiply matrices, or stacks of matrices.
+
+    a has shape (..., n, k) and b (..., k, m); the result has shape
+    (..., n, m), with leading batch dimensions broadcast as in NumPy. A
+    1-D a or b is treated as a row or column vector. Matrices may have up
+    to 500 rows and columns.
+
+    Example:
+    - [[1, 2], [3, 4]], [[5], [6]] → [[17.0], [39.0]]
+    """
+    if np is None:
+        return NUMPY_REQUIRED
+    try:
+        a, b = _operand("a", a, 1), _operand("b", b, 1)
+        inner_a = a.shape[-1]
+        inner_b = b.shape[-2] if b.ndim > 1 else b.shape[0]
+        if inner_a != inner_b:
+            raise ValueError(f"Shapes {list(a.shape)} and {list(b.shape)} do not align: "
+                             f"a has {inner_a} columns but b has {inner_b} rows")
+        rows = a.shape[-2:-1] if a.ndim > 1 else ()
+        columns = b.shape[-1:] if b.ndim > 1 else ()
+        _check_result(_batch_shape(a, b, 2) + rows + columns)
+        return _result(np.matmul(a, b), binary)
+    except ValueError as e:
+        return f"Error: {e}"
+
+
+def dot(a: Array, b: Array, binary: bool = False) -> Result:
+    """
+    Dot products of vectors, or of stacks of vectors.
+
+    a and b have shape (..., n): the products are taken along the last
+    axis, with leading dimensions broadcast. Two plain vectors give a
+    single number.
+
+    Example:
+    - [1, 2, 3], [4, 5, 6] → 32.0
+    """
+    if np is None:
+        return NUMPY_REQUIRED
+    try:
+        a, b = _operand("a", a, 1, matrix=False), _operand("b", b, 1, matrix=False)
+        if a.shape[-1] != b.shape[-1]:
+            raise ValueError(f"Vectors have different lengths: {a.shape[-1]} and {b.shape[-1]}")
+        _check_result(_batch_shape(a, b, 1))
+        return _result(np.einsum("...i,...i->...", a, b), binary)
+    except ValueError as e:
+        return f"Error: {e}"
+
+
+def solve(a: Array, b: Array, binary: bool = False) -> Result:
+    """
+    Solve the linear system a @ x = b for x.
+
+    a is a square matrix (n, n) or a stack of them (..., n, n). b is a
+    right-hand-side vector for each matrix, shape (..., n), or several
+    of them as the columns of (..., n, k). Returns x with the shape of b.
+    If any matrix in a is singular, the whole call fails.
+
+    Example:
+    - [[3, 1], [1, 2]], [9, 8] → [2.0, 3.0]
+    """
+    if np is None:
+        return NUMPY_REQUIRED
+    try:
+        a = _square("a", a)
+        b = _operand("b", b, 1)
+        vectors = b.ndim == a.ndim - 1
+        if not vectors and b.ndim != a.ndim:
+            raise ValueError(f"b must have shape (..., {a.shape[-1]}) or (..., {a.shape[-1]}, k) "
+                             f"to match a of shape {list(a.shape)}")
+        rows = b.shape[-1] if vectors else b.shape[-2]
+        if rows != a.shape[-1]:
+            raise ValueError(f"b has {rows} rows but a is {a.shape[-1]} x {a.shape[-1]}")
+        if vectors:
+            # Solve vectors as one-column matrices, whatever NumPy's own convention
+            b = b[..., np.newaxis]
+        _check_result(_batch_shape(a, b, 2) + b.shape[-2:])
+        x = np.linalg.solve(a, b)
+        return _result(x[..., 0] if vectors else x, binary)
+    except np.linalg.LinAlgError:
+        return "Error: Matrix is singular"
+    except ValueError as e:
+        return f"Error: {e}"
+
+
+def inverse(a: Array, binary: bool = False) -> Result:
+    """
+    Invert a square matrix, or every matrix in a stack (..., n, n).
+
+    If any matrix is singular, the whole call fails.
+
+    Example:
+    - [[4, 7], [2, 6]] → [[0.6, -0.7], [-0.2, 0.4]]
+    """
+    if np is None:
+        return NUMPY_REQUIRED
+    try:
+        return _result(np.linalg.inv(_square("a", a)), binary)
+    except np.linalg.LinAlgError:
+        return "Error: Matrix is singular"
+    except ValueError as e:
+        return f"Error: {e}"
+
+
+def determinant(a: Array, binary: bool = False) -> Result:
+    """
+    Determinant of a square matrix, or of every matrix in a stack (..., n, n).
+
+    Determinants too large for a float come back as null.
+
+    Example:
+    - [[1, 2], [3, 4]] → -2.0
+    """
+    if np is None:
+        return NUMPY_REQUIRED
+    try:
+        a = _square("a", a)
+        with np.errstate(all="ignore"):
+            return _result(np.linalg.det(a), binary)
+    except ValueError as e:
+        return f"Error: {e}"
+
+
+def norm(a: Array, ord: str = "2", matrix: bool = False, binary: bool = False) -> Result:
+    """
+    Norms of vectors, or of matrices with matrix=True.
+
+    By default a is a vector (n) or a stack of vectors (..., n), and ord
+    is "1", "2" (Euclidean) or "inf". With matrix=True, a is a matrix or a
+    stack of them (..., n, m), and ord may also be "fro" (Frobenius) or
+    "nuc" (nuclear); "2" is then the largest singular value.
+
+    Example:
+    - [3, 4] → 5.0
+    """
+    if np is None:
+        return NUMPY_REQUIRED
+    norms = MATRIX_NORMS if matrix else VECTOR_NORMS
+    if ord not in norms:
+        return f"Error: ord must be one of {', '.join(norms)}"
+    try:
+        a = _operand("a", a, 2 if matrix else 1, matrix=matrix)
+        order = {"1": 1, "2": 2, "inf": np.inf}.get(ord, ord)
+        with np.errstate(all="ignore"):
+            return _result(np.linalg.norm(a, ord=order, axis=(-2, -1) if matrix else -1), binary)
+    except ValueError as e:
+        return f"Error: {e}"
+
+
+def _operand(name: str, values: Array, min_ndim: int, matrix: bool = True) -> "np.ndarray":
+    """Convert an input to a float array and check its size; raises ValueError."""
+    if isinstance(values, (list, tuple, int, float)):
+        try:
+            array = np.asarray(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ValueError(f"'{name}' must be a number or a (nested) list of numbers "
+                             f"with the same length at each level") from None
+    else:
+        try:
+            # A float64 payload is used in place, without a copy
+            array = np.asarray(decode_array(values, MAX_ELEMENTS), dtype=np.float64)
+        except ValueError as e:
+            raise ValueError(f"'{name}' is not a valid binary array - {e}") from None
+    if array.size > MAX_ELEMENTS:
+        raise ValueError(f"'{name}' has too many values (limit is {MAX_ELEMENTS})")
+    if array.ndim < min_ndim:
+        kind = "matrix (a list of rows)" if min_ndim == 2 else "vector"
+        raise ValueError(f"'{name}' must be a {kind} or a stack of them, not shape {list(array.shape)}")
+    if matrix and any(size > MAX_MATRIX_SIZE for size in array.shape[-2:]):
+        raise ValueError(f"'{name}' is too large (matrices may have at most {MAX_MATRIX_SIZE} rows and columns)")
+    if not np.isfinite(array).all():
+        raise ValueError(f"'{name}' must contain only finite numbers")
+    return array
+
+
+def _square(name: str, values: Array) -> "np.ndarray":
+    """Convert an input to a square matrix or a stack of them; raises ValueError."""
+    array = _operand(name, values, 2)
+    if array.shape[-1] != array.shape[-2]:
+        raise ValueError(f"'{name}' must be square, not {array.shape[-2]} x {array.shape[-1]}")
+    if array.shape[-1] == 0:
+        raise ValueError(f"'{name}' must not be empty")
+    return array
+
+
+def _batch_shape(a: "np.ndarray", b: "np.ndarray", core_dims: int) -> tuple:
+    """Broadcast the batch dimensions of two operands; raises ValueError if they do not match."""
+    try:
+        return np.broadcast_shapes(a.shape[:-core_dims] if a.ndim > core_dims else (),
+                                   b.shape[:-core_dims] if b.ndim > core_dims else ())
+    except ValueError:
+        raise ValueError(f"Batch shapes {list(a.shape[:-core_dims])} and {list(b.shape[:-core_dims])} "
+                         f"cannot be broadcast together") from None
+
+
+def _check_result(shape: tuple) -> None:
+    """Refuse a computation whose result would exceed MAX_ELEMENTS."""
+    if math.prod(shape) > MAX_ELEMENTS:
+        raise ValueError(f"Result would have {math.prod(shape)} values (limit is {MAX_ELEMENTS})")
+
+
+def _result(value: "np.ndarray", binary: bool) -> Union[List[Any], float, None, BinaryArray]:
+    """Return an array as nested lists (or a binary array), with NaN and infinities as None."""
+    value = np.asarray(value, dtype=np.float64)
+    if binary:
+        return encode_array(np.ascontiguousarray(value))
+    if value.ndim == 0:
+        number = float(value)
+        return number if math.isfinite(number) else None
+    finite = np.isfinite(value)
+    if finite.all():
+        return value.tolist()
+    values = value.astype(object)
+    values[~finite] = None
+    return values.tolist()
@@ -1,8 +1,56 @@
 """Mathematical operation tools."""
 
+import base64
+import binascii
+import decimal
+import json
 import math
-import re
-from typing import Union
+from fractions import Fraction
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .arrays import BinaryArray, decode_values
+from .cache import CacheInfo, LRUCache
+from .expression import (FLOAT_MODE, NUMERIC_MODES, ExpressionError, ExpressionLimits, NumericMode,
+                         compile_expression)
+
+# Maximum number of compiled expressions kept by calculate()
+CALCULATE_CACHE_SIZE = 1024
+
+# Maximum number of expressions accepted by one calculate_batch() call
+MAX_BATCH_SIZE = 1000
+
+# Significant digits of decimal-mode results, by default and at most
+DEFAULT_DECIMAL_PRECISION = 28
+MAX_DECIMAL_PRECISION = 1000
+
+# Maximum number of compiled formulas kept by compile_formula()/eval_formula()
+FORMULA_CACHE_SIZE = 1024
+
+# Maximum number of variable bindings accepted by one eval_formula() call
+MAX_BINDINGS = 1000
+
+# Prefix of formula handles; bump it if the handle encoding changes
+FORMULA_HANDLE_PREFIX = "f1."
+
+# Maximum number of values accepted by one sum_many()/product_many()/mean_many() call
+MAX_REDUCE_SIZE = 100000
+
+# A float product is renormalized after this many pairwise levels; 2 ** 9
+# mantissas in [0.5, 1) multiply to at least 2 ** -512, far from underflow
+_RENORMALIZE_LEVELS = 9
+
+# Returned when a NaN or infinite input makes a reduction's result non-finite;
+# overflow of finite inputs is reported as "Result is too large" instead
+NOT_FINITE_ERROR = "Error: Values must be finite numbers"
+
+# Variable values for one evaluation of a formula
+Binding = Dict[str, Union[int, float]]
+
+_expression_cache = LRUCache(CALCULATE_CACHE_SIZE)
+_formula_cache = LRUCache(FORMULA_CACHE_SIZE)
+
+# Cost budgets every calculate() expression must fit in
+_calculate_limits = ExpressionLimits()
 
 
 def add(a: int, b: int) -> int:
@@ -15,7 +63,148 @@ def multiply(a: float, b: float) -> float:
     return a * b
 
 
-def calculate(expression: str) -> Union[float, int, str]:
+def sum_many(values: Union[List[Union[int, float]], BinaryArray]) -> Union[float, int, str]:
+    """
+    Add a whole list of numbers in one call.
+
+    Integer lists are summed exactly. With floats the sum is correctly
+    rounded (math.fsum), so e.g. ten 0.1s add up to exactly 1. values may
+    also be a binary array ({"dtype": "float64", "shape": [n], "data":
+    base64 of little-endian values}), which is much cheaper to send than
+    a long JSON list.
+
+    Example:
+    - [0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1] → 1
+    """
+    values = decode_values(values, MAX_REDUCE_SIZE)
+    if isinstance(values, str):
+        return values
+    if len(values) > MAX_REDUCE_SIZE:
+        return f"Error: Too many values (limit is {MAX_REDUCE_SIZE})"
+    try:
+        return _reduction_result(_sum(values))
+    except ValueError:
+        return NOT_FINITE_ERROR
+    except OverflowError:
+        return "Error: Result is too large"
+
+
+def product_many(values: Union[List[Union[int, float]], BinaryArray]) -> Union[float, int, str]:
+    """
+    Multiply a whole list of numbers in one call.
+
+    Values are multiplied pairwise in a balanced tree, which keeps float
+    rounding error growing with log(n) rather than n. Floats are split
+    into mantissa and exponent first, so intermediate products never
+    overflow or underflow; only a final result too large for a float is
+    reported. Integer lists are multiplied exactly, within calculate's
+    integer size budget. values may also be a binary array, as in sum_many.
+
+    Example:
+    - [1e200, 1e200, 1e-300] → 1e+100
+    """
+    values = decode_values(values, MAX_REDUCE_SIZE)
+    if isinstance(values, str):
+        return values
+    if len(values) > MAX_REDUCE_SIZE:
+        return f"Error: Too many values (limit is {MAX_REDUCE_SIZE})"
+    if all(isinstance(value, int) for value in values):
+        if 0 in values:
+            return 0
+        if sum(value.bit_length() for value in values) > _calculate_limits.max_integer_bits:
+            return "Error: Result is too large"
+        return _tree_product(list(values)) if values else 1
+
+    try:
+        mantissas, exponents = zip(*map(math.frexp, values))
+        exponent = sum(exponents)
+        mantissas = list(mantissas)
+        level = 0
+        while len(mantissas) > 1:
+            if len(mantissas) % 2:
+                mantissas.append(1.0)
+            mantissas = [a * b for a, b in zip(mantissas[0::2], mantissas[1::2])]
+            level += 1
+            if level % _RENORMALIZE_LEVELS == 0:
+                mantissas, exponents = zip(*map(math.frexp, mantissas))
+                exponent += sum(exponents)
+                mantissas = list(mantissas)
+        return _reduction_result(math.ldexp(mantissas[0], exponent))
+    except OverflowError:
+        return "Error: Result is too large"
+
+
+def mean_many(values: Union[List[Union[int, float]], BinaryArray]) -> Union[float, int, str]:
+    """
+    Return the arithmetic mean of a list of numbers.
+
+    The sum is computed as in sum_many, so the mean is as accurate as the
+    final division allows. values may also be a binary array, as in
+    sum_many.
+
+    Example:
+    - [1, 2, 3, 4] → 2.5
+    """
+    values = decode_values(values, MAX_REDUCE_SIZE)
+    if isinstance(values, str):
+        return values
+    if not values:
+        return "Error: Cannot take the mean of an empty list"
+    if len(values) > MAX_REDUCE_SIZE:
+        return f"Error: Too many values (limit is {MAX_REDUCE_SIZE})"
+    try:
+        return _reduction_result(_sum(values) / len(values))
+    except ValueError:
+        return NOT_FINITE_ERROR
+    except OverflowError:
+        # The sum exceeds the float range; scale before adding instead
+        try:
+            return _reduction_result(math.fsum(value / len(values) for value in values))
+        except OverflowError:
+            return "Error: Result is too large"
+
+
+def _sum(values: Sequence[Union[int, float]]) -> Union[int, float]:
+    """Sum integers exactly and everything else with a correctly rounded fsum."""
+    if isinstance(values, memoryview):
+        # Binary arrays hold one type, so there is nothing to split
+        if values.format == "q":
+            return sum(values)
+        terms = values
+    elif all(isinstance(value, int) for value in values):
+        return sum(values)
+    else:
+        terms = [value for value in values if not isinstance(value, int)]
+        terms.append(sum(value for value in values if isinstance(value, int)))
+    try:
+        return math.fsum(terms)
+    except OverflowError:
+        # fsum overflows on partial sums beyond the float range even when the
+        # total fits; halving every term is exact, so retry at half scale
+        total = math.fsum(term * 0.5 for term in terms) * 2
+        if math.isinf(total):
+            raise
+        return total
+
+
+def _reduction_result(value: Union[int, float]) -> Union[float, int, str]:
+    """Return a reduction's result, or an error if a NaN or infinite input made it non-finite."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return NOT_FINITE_ERROR
+    return _to_result(value)
+
+
+def _tree_product(values: List) -> Union[int, float]:
+    """Multiply values pairwise in a balanced tree (fast for big integers)."""
+    while len(values) > 1:
+        if len(values) % 2:
+            values.append(1)
+        values = [a * b for a, b in zip(values[0::2], values[1::2])]
+    return values[0]
+
+
+def calculate(expression: str, mode: str = "float",
+              precision: int = DEFAULT_DECIMAL_PRECISION) -> Union[float, int, str]:
     """
     General purpose calculator that evaluates mathematical expressions.
 
@@ -25,69 +214,271 @@ def calculate(expression: str) -> Union[float, int, str]:
     - Mathematical functions: sin, cos, tan, log, sqrt, abs, etc.
     - Constants: pi, e
 
+    Integer arithmetic is always exact. mode picks how everything else is
+    computed:
+    - "float" (default): double-precision floats
+    - "decimal": decimals with `precision` significant digits, returned as a string
+    - "fraction": exact fractions, returned as a string like "1/3"; irrational
+      results (sqrt(2), sin, pi, ...) fall back to float
+
     Examples:
     - "2 + 3 * 4" → 14
     - "sqrt(16)" → 4.0
     - "sin(pi/2)" → 1.0
     - "(5 + 3) ** 2" → 64
+    - "0.1 + 0.2", mode="decimal" → "0.3"
+    - "1/3 + 1/6", mode="fraction" → "1/2"
+    """
+    # Normalize whitespace so equivalent spellings share a cache entry
+    if mode == "float":
+        return _evaluate(" ".join(expression.split()))
+
+    numeric_mode = NUMERIC_MODES.get(mode)
+    if numeric_mode is None:
+        return f"Error: mode must be one of {', '.join(NUMERIC_MODES)}"
+    if not 1 <= precision <= MAX_DECIMAL_PRECISION:
+        return f"Error: precision must be between 1 and {MAX_DECIMAL_PRECISION}"
+    with decimal.localcontext() as context:
+        context.prec = precision
+        return _evaluate(" ".join(expression.split()), numeric_mode)
+
+
+def calculate_cache_key(expression: str, mode: str = "float",
+                        precision: int = DEFAULT_DECIMAL_PRECISION) -> Optional[str]:
+    """
+    Return the key a calculate() call's result can be cached under, or None.
+
+    Only float-mode results are keyed; they depend on nothing but the
+    whitespace-normalized expression.
+    """
+    return " ".join(expression.split()) if mode == "float" else None
+
+
+def calculate_batch(expressions: List[str]) -> Union[List[Union[float, int, str]], str]:
+    """
+    Evaluate many calculator expressions in one call.
+
+    Returns one result per expression, in order; an expression that fails
+    yields its "Error: ..." message without affecting the others. Duplicate
+    expressions are compiled and evaluated once.
+
+    Example:
+    - ["2 + 2", "sqrt(16)", "1 / 0"] → [4, 4, "Error: Division by zero"]
     """
+    if len(expressions) > MAX_BATCH_SIZE:
+        return f"Error: Too many expressions (limit is {MAX_BATCH_SIZE})"
+
+    results = {}
+    output = []
+    for expression in expressions:
+        key = " ".join(expression.split())
+        if key not in results:
+            results[key] = _evaluate(key)
+        output.append(results[key])
+    return output
+
+
+def iter_calculate(expressions: Iterable[str]) -> Iterator[Union[float, int, str]]:
+    """Yield calculate()'s result for each expression, one at a time."""
+    for expression in expressions:
+        yield _evaluate(" ".join(expression.split()))
+
+
+def _evaluate(key: str, mode: NumericMode = FLOAT_MODE) -> Union[float, int, str]:
+    """Evaluate a whitespace-normalized expression through the compiled cache."""
     try:
-        # Clean the expression
-        expression = expression.strip()
-
-        # Replace common constants (using word boundaries to avoid partial replacements)
-        expression = re.sub(r'\bpi\b', str(math.pi), expression)
-        expression = re.sub(r'\be\b', str(math.e), expression)
-
-        # Create a safe namespace with math functions
-        safe_dict = {
-            # Basic math functions
-            "sin": math.sin,
-            "cos": math.cos,
-            "tan": math.tan,
-            "asin": math.asin,
-            "acos": math.acos,
-            "atan": math.atan,
-            "sinh": math.sinh,
-            "cosh": math.cosh,
-            "tanh": math.tanh,
-            "log": math.log,
-            "log10": math.log10,
-            "log2": math.log2,
-            "exp": math.exp,
-            "sqrt": math.sqrt,
-            "pow": math.pow,
-            "abs": abs,
-            "round": round,
-            "floor": math.floor,
-            "ceil": math.ceil,
-            "min": min,
-            "max": max,
-            # Constants
-            "pi": math.pi,
-            "e": math.e,
-            # Prevent access to dangerous functions
-            "__builtins__": {},
-        }
-
-        # Validate expression contains only safe characters
-        if not re.match(r"^[0-9+\-*/().,%\s\w]+$", expression):
-            return "Error: Invalid characters in expression"
-
-        # Evaluate the expression
-        result = eval(expression, safe_dict)
-
-        # Return integer if result is a whole number
-        if isinstance(result, float) and result.is_integer():
-            return int(result)
-
-        return result
-
-    except ZeroDivisionError:
+        # Float-mode entries are keyed by the text alone to keep the hot path lean
+        cache_key = key if mode is FLOAT_MODE else (key, mode.name)
+        evaluator = _expression_cache.get(cache_key)
+        if evaluator is None:
+            evaluator = compile_expression(key, _calculate_limits, mode=mode)
+            _expression_cache.put(cache_key, evaluator)
+
+        return _to_result(evaluator())
+
+    except Exception as e:
+        return _error_message(e)
+
+
+def _error_message(e: Exception) -> str:
+    """Describe an evaluation failure as an "Error: ..." result."""
+    if isinstance(e, ZeroDivisionError):
         return "Error: Division by zero"
-    except ValueError as e:
+    if isinstance(e, decimal.InvalidOperation):
+        return "Error: Invalid value - result is undefined"
+    if isinstance(e, decimal.Overflow):
+        return "Error: Result is too large"
+    if isinstance(e, ValueError):
         return f"Error: Invalid value - {str(e)}"
-    except SyntaxError:
+    if isinstance(e, SyntaxError):
         return "Error: Invalid mathematical expression"
+    return f"Error: {str(e)}"
+
+
+def _to_result(value) -> Union[float, int, str]:
+    """Convert an evaluation result of any mode to what the tools return."""
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, int):
+        return value
+    return _exact_result(value)
+
+
+def _exact_result(value: Union[Fraction, decimal.Decimal, complex]) -> Union[int, str]:
+    """Return a Fraction or Decimal result as an int when whole, otherwise as a string."""
+    if isinstance(value, complex):
+        # e.g. (-8) ** (1/3): a fractional power of a negative number
+        return "Error: Result is not a real number"
+    if isinstance(value, Fraction):
+        return value.numerator if value.denominator == 1 else str(value)
+    # Decimal: round to the context precision; whole numbers that fit in it
+    # are returned as ints
+    value = +value
+    if (value.is_finite() and value.adjusted() < decimal.getcontext().prec
+            and value == value.to_integral_value()):
+        return int(value)
+    return str(value)
+
+
+def compile_formula(expression: str, variables: List[str], mode: str = "float") -> str:
+    """
+    Compile an expression with named variables and return a handle for eval_formula.
+
+    The expression supports everything calculate does, plus the given
+    variable names. mode is "float", "decimal" or "fraction", as for
+    calculate. Compile once, then evaluate with different values by passing
+    the handle to eval_formula instead of sending a new expression each time.
+
+    Example:
+    - "a * x ** 2 + b * x + c", ["a", "b", "c", "x"] → "f1.WyJh..."
+    """
+    if mode not in NUMERIC_MODES:
+        return f"Error: mode must be one of {', '.join(NUMERIC_MODES)}"
+    key = (" ".join(expression.split()), tuple(sorted(set(variables))), mode)
+    handle = FORMULA_HANDLE_PREFIX + base64.urlsafe_b64encode(
+        json.dumps(key, separators=(",", ":")).encode("utf-8")).decode("ascii").rstrip("=")
+    try:
+        _formula(handle, key)
+    except Exception as e:
+        return _error_message(e)
+    return handle
+
+
+def eval_formula(handle: str, values: Union[Binding, List[Binding]],
+                 precision: int = DEFAULT_DECIMAL_PRECISION) -> Union[float, int, str, List[Union[float, int, str]]]:
+    """
+    Evaluate a formula from compile_formula with the given variable values.
+
+    values maps every variable name to a number. Pass a list of such
+    mappings to evaluate the formula for each of them in one call; the
+    result is then a list, with an "Error: ..." entry for any binding that
+    fails. precision applies to decimal-mode formulas.
+
+    Example:
+    - handle of "a * x + b", {"a": 2, "x": 10, "b": 1} → 21
+    - handle of "a * x + b", [{"a": 2, "x": 10, "b": 1}, {"a": 0, "x": 5, "b": 3}] → [21, 3]
+    """
+    if not 1 <= precision <= MAX_DECIMAL_PRECISION:
+        return f"Error: precision must be between 1 and {MAX_DECIMAL_PRECISION}"
+    many = isinstance(values, list)
+    if many and len(values) > MAX_BINDINGS:
+        return f"Error: Too many bindings (limit is {MAX_BINDINGS})"
+    try:
+        evaluator, names, mode = _formula(handle)
     except Exception as e:
-        return f"Error: {str(e)}"
+        return _error_message(e)
+
+    with decimal.localcontext() as context:
+        context.prec = precision
+        results = [_evaluate_formula(evaluator, names, mode, binding)
+                   for binding in (values if many else [values])]
+    return results if many else results[0]
+
+
+def _formula(handle: str, key: Optional[Tuple] = None) -> Tuple:
+    """
+    Return (evaluator, variable names, mode) for a handle, compiling it on a miss.
+
+    Handles encode the formula itself, so a formula evicted from the cache
+    (or compiled by another server process) is simply compiled again.
+    """
+    formula = _formula_cache.get(handle)
+    if formula is None:
+        if key is None:
+            key = _decode_handle(handle)
+        expression, names, mode_name = key
+        mode = NUMERIC_MODES[mode_name]
+        evaluator = compile_expression(expression, _calculate_limits, variables=names, mode=mode)
+        formula = (evaluator, frozenset(names), mode)
+        _formula_cache.put(handle, formula)
+    return formula
+
+
+def _decode_handle(handle: str) -> Tuple:
+    """Recover (expression, variable names, mode) from a formula handle."""
+    if not handle.startswith(FORMULA_HANDLE_PREFIX):
+        raise ExpressionError("Invalid formula handle")
+    payload = handle[len(FORMULA_HANDLE_PREFIX):]
+    try:
+        key = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        expression, names, mode_name = key
+        if (not isinstance(expression, str) or not isinstance(names, list)
+                or not all(isinstance(name, str) for name in names) or mode_name not in NUMERIC_MODES):
+            raise ValueError
+    except (binascii.Error, ValueError, TypeError):
+        raise ExpressionError("Invalid formula handle") from None
+    return expression, tuple(names), mode_name
+
+
+def _evaluate_formula(evaluator, names, mode: NumericMode, binding: Binding) -> Union[float, int, str]:
+    """Evaluate one set of variable values, converting floats to the formula's mode."""
+    missing = names.difference(binding)
+    if missing:
+        return f"Error: Missing value for variable '{min(missing)}'"
+    unknown = set(binding).difference(names)
+    if unknown:
+        return f"Error: Unknown variable '{min(unknown)}'"
+    env = {}
+    max_digits = _calculate_limits.max_literal_digits
+    for name, value in binding.items():
+        # Bound integers are held to the same size limit as literals
+        if isinstance(value, int) and abs(value) >= 10 ** max_digits:
+            return f"Error: Value of '{name}' is too long (limit is {max_digits} digits)"
+        if isinstance(value, float) and mode.literal is not None:
+            # Convert the value as written in the request, like a literal
+            value = mode.literal(repr(value))
+        env[name] = value
+    try:
+        return _to_result(evaluator(env))
+    except Exception as e:
+        return _error_message(e)
+
+
+def calculate_cache_info() -> CacheInfo:
+    """Return hit/miss/eviction counters for the compiled-expression cache."""
+    return _expression_cache.info()
+
+
+def calculate_cache_clear() -> None:
+    """Empty the compiled-expression cache and reset its counters."""
+    _expression_cache.clear()
+
+
+def formula_cache_info() -> CacheInfo:
+    """Return hit/miss/eviction counters for the compiled-formula registry."""
+    return _formula_cache.info()
+
+
+def configure_calculate_limits(**budgets: int) -> ExpressionLimits:
+    """
+    Change the cost budgets calculate() enforces and return the new limits.
+
+    Accepts any field of ExpressionLimits, e.g. max_integer_bits=2048.
+    Cached expressions are dropped so they are re-checked against the new
+    budgets.
+    """
+    global _calculate_limits
+    _calculate_limits = _calculate_limits._replace(**budgets)
+    _expression_cache.clear()
+    _formula_cache.clear()
+    return _calculate_limits
@@ -0,0 +1,250 @@
+"""Lazy tool registration from a precomputed manifest.
+
+The MCP server has to advertise every tool's schema as soon as a client
+connects, but it only needs a tool's code when that tool is called. The
+manifest (tools/manifest.json) stores each tool's name, description and
+JSON schemas together with the "module:function" it lives in; LazyTool
+serves that metadata directly and imports the function on the first call.
+
+The manifest is a build artifact. Regenerate it after changing a tool's
+signature or docstring, or check that it is current:
+
+    python -m tools.registry            # rewrite tools/manifest.json
+    python -m tools.registry --check    # exit 1 if it is stale
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from fastmcp.tools import FunctionTool, Tool
+from fastmcp.tools.base import ToolResult
+from mcp.types import TextContent
+from mcp.types import Tool as MCPTool
+from pydantic import Field, InstanceOf, PrivateAttr
+from pydantic.json_schema import SkipJsonSchema
+from pydantic_core import to_json
+
+from .cache import TTLCache
+from .instrumentation import ToolMetrics
+
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "manifest.json")
+
+# Every tool the package provides, in registration order
+TOOL_TARGETS = {
+    "add": "tools.math_tools:add",
+    "multiply": "tools.math_tools:multiply",
+    "sum_many": "tools.math_tools:sum_many",
+    "product_many": "tools.math_tools:product_many",
+    "mean_many": "tools.math_tools:mean_many",
+    "calculate": "tools.math_tools:calculate",
+    "calculate_batch": "tools.math_tools:calculate_batch",
+    "compile_formula": "tools.math_tools:compile_formula",
+    "eval_formula": "tools.math_tools:eval_formula",
+    "calculate_vectorized": "tools.vector_tools:calculate_vectorized",
+    "describe": "tools.stats_tools:describe",
+    "quantiles": "tools.stats_tools:quantiles",
+    "histogram": "tools.stats_tools:histogram",
+    "matmul": "tools.linalg_tools:matmul",
+    "dot": "tools.linalg_tools:dot",
+    "solve": "tools.linalg_tools:solve",
+    "inverse": "tools.linalg_tools:inverse",
+    "determinant": "tools.linalg_tools:determinant",
+    "norm": "tools.linalg_tools:norm",
+    "greet": "tools.text_tools:greet",
+    "greet_many": "tools.text_tools:greet_many",
+    "calculate_stream": "tools.stream_tools:calculate_stream",
+    "greet_stream": "tools.stream_tools:greet_stream",
+}
+
+
+def import_target(target: str) -> Callable:
+    """Import and return the function named by a "module:function" string."""
+    module_name, _, attribute = target.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def build_manifest() -> List[Dict[str, Any]]:
+    """Import every tool and describe it the way FastMCP would register it."""
+    manifest = []
+    for name, target in TOOL_TARGETS.items():
+        tool = FunctionTool.from_function(import_target(target), name=name)
+        manifest.append({
+            "name": name,
+            "target": target,
+            "description": tool.description,
+            "parameters": tool.parameters,
+            "output_schema": tool.output_schema,
+        })
+    return manifest
+
+
+def write_manifest(path: str = MANIFEST_PATH) -> None:
+    """Regenerate the manifest file from the live tool functions."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(build_manifest(), f, indent=2, ensure_ascii=False)
+        f.write("\n")
+
+
+def load_manifest(path: str = MANIFEST_PATH) -> List[Dict[str, Any]]:
+    """Read the precomputed manifest without importing any tool module."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def stale_tools(path: str = MANIFEST_PATH) -> List[str]:
+    """Return the names of tools whose manifest entry differs from the live function."""
+    try:
+        stored = {entry["name"]: entry for entry in load_manifest(path)}
+    except FileNotFoundError:
+        stored = {}
+    live = {entry["name"]: entry for entry in build_manifest()}
+    return sorted(name for name in stored.keys() | live.keys() if stored.get(name) != live.get(name))
+
+
+def memo_key(name: str, arguments: Dict[str, Any]) -> Optional[str]:
+    """
+    Return a canonical cache key for a call, or None if it cannot be cached.
+
+    Arguments are encoded as JSON with sorted keys, so calls that differ only
+    in argument order share an entry.
+    """
+    try:
+        return json.dumps([name, arguments], sort_keys=True, separators=(",", ":"),
+                          ensure_ascii=False, allow_nan=False)
+    except (TypeError, ValueError):
+        return None
+
+
+def result_size(result: ToolResult) -> int:
+    """Approximate the memory a cached result holds, in bytes."""
+    size = len(to_json(result.structured_content)) if result.structured_content is not None else 0
+    for block in result.content:
+        size += len(block.text.encode("utf-8")) if isinstance(block, TextContent) else len(to_json(block))
+    return size
+
+
+def _is_error_result(result: ToolResult) -> bool:
+    """Tools report failures as "Error: ..." strings; those are never cached."""
+    value = (result.structured_content or {}).get("result")
+    return bool(result.is_error) or (isinstance(value, str) and value.startswith("Error:"))
+
+
+class LazyTool(Tool):
+    """A tool whose schema comes from the manifest and whose code loads on first call."""
+
+    target: SkipJsonSchema[str] = Field(exclude=True)
+    wrap: SkipJsonSchema[Optional[Callable[[Callable], Callable]]] = Field(default=None, exclude=True)
+    memo: SkipJsonSchema[Optional[InstanceOf[TTLCache]]] = Field(default=None, exclude=True)
+    metrics: SkipJsonSchema[Optional[InstanceOf[ToolMetrics]]] = Field(default=None, exclude=True)
+    run_in_thread: SkipJsonSchema[Optional[bool]] = Field(default=None, exclude=True)
+    _loaded: Optional[FunctionTool] = PrivateAttr(default=None)
+    _mcp_tool: Optional[MCPTool] = PrivateAttr(default=None)
+
+    @classmethod
+    def from_manifest(cls, entry: Dict[str, Any],
+                      wrap: Optional[Callable[[Callable], Callable]] = None,
+                      memo: Optional[TTLCache] = None,
+                      metrics: Optional[ToolMetrics] = None,
+                      run_in_thread: Optional[bool] = None) -> "LazyTool":
+        """
+        Build a LazyTool from one manifest entry.
+
+        wrap, if given, is applied to the function once it is imported (e.g.
+        to add instrumentation). memo, if given, caches the tool's finished
+        results by arguments; only pass it for pure tools. metrics, if given,
+        counts the calls the memo answers, which never reach wrap. run_in_thread is
+        passed on to FunctionTool: False runs a sync function directly on the
+        event loop instead of in a worker thread.
+        """
+        return cls(
+            name=entry["name"],
+            description=entry["description"],
+            parameters=entry["parameters"],
+            output_schema=entry["output_schema"],
+            target=entry["target"],
+            wrap=wrap,
+            memo=memo,
+            metrics=metrics,
+            run_in_thread=run_in_thread,
+        )
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the tool's module has been imported yet."""
+        return self._loaded is not None
+
+    def load(self) -> FunctionTool:
+        """Import the tool function and build the FunctionTool that runs it."""
+        if self._loaded is None:
+            fn = import_target(self.target)
+            if self.wrap is not None:
+                fn = self.wrap(fn)
+            self._loaded = FunctionTool.from_function(fn, name=self.name,
+                                                      run_in_thread=self.run_in_thread)
+        return self._loaded
+
+    def to_mcp_tool(self, **overrides: Any) -> MCPTool:
+        """
+        Return the tools/list entry for this tool.
+
+        The server asks for it on every tools/list request; the entry only
+        depends on manifest data, so it is built once and reused.
+        """
+        if overrides and overrides != {"name": self.name}:
+            return super().to_mcp_tool(**overrides)
+        if self._mcp_tool is None:
+            self._mcp_tool = super().to_mcp_tool()
+        return self._mcp_tool
+
+    async def run(self, arguments: Dict[str, Any]) -> ToolResult:
+        """
+        Run the tool, importing it first if this is its first call.
+
+        With a memo, a repeated call returns the stored ToolResult, which
+        already holds the serialized content, so neither the function nor
+        the result encoding runs again; the hit is still counted in metrics.
+        Error results are not stored: some
+        (e.g. pool timeouts) depend on load rather than on the arguments.
+        """
+        key = memo_key(self.name, arguments) if self.memo is not None else None
+        if key is not None:
+            started = time.perf_counter()
+            cached = self.memo.get(key)
+            if cached is not None:
+                if self.metrics is not None:
+                    self.metrics.record_memo_hit(self.name, time.perf_counter() - started)
+                return cached
+        result = await self.load().run(arguments)
+        if key is not None and not _is_error_result(result):
+            self.memo.put(key, result, len(key) + result_size(result))
+        return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the tool manifest (tools/manifest.json).")
+    parser.add_argument("--check", action="store_true",
+                        help="do not write; exit 1 if the manifest does not match the tool functions")
+    parser.add_argument("--path", default=MANIFEST_PATH, help="manifest file (default: tools/manifest.json)")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        stale = stale_tools(args.path)
+        if stale:
+            print(f"{args.path} is out of date for: {', '.join(stale)}")
+            print("Run 'python -m tools.registry' to regenerate it.")
+            return False
+        print(f"{args.path} is up to date")
+        return True
+
+    write_manifest(args.path)
+    print(f"Wrote {args.path}")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,404 @@
+"""Descriptive statistics computed in a single pass.
+
+Nothing here sorts, copies or revisits its input. Count, mean, variance,
+min and max use Welford's online algorithm; quantiles come from a KLL
+sketch of about 3000 values; histograms keep a fixed number of bins whose
+width doubles whenever a value falls outside them. Memory use does not
+grow with the number of values, so the accumulators can also summarize
+iterators that are never held in memory at all.
+"""
+
+import itertools
+import math
+import random
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from .arrays import BinaryArray, decode_values
+
+# Maximum number of values accepted by one describe()/quantiles()/histogram() call
+MAX_STATS_SIZE = 1000000
+
+# Quantiles reported by default, and how many one call may ask for
+DEFAULT_QUANTILES = (0.25, 0.5, 0.75)
+MAX_QUANTILES = 20
+
+# Capacity of the quantile sketch; quantiles of up to this many values are exact
+SKETCH_SIZE = 1000
+
+# Histogram bins by default and at most
+DEFAULT_BINS = 10
+MAX_BINS = 1000
+
+NOT_FINITE_ERROR = "Error: Values must be finite numbers within the float range"
+
+
+class RunningStats:
+    """Count, mean, variance, min and max of a stream (Welford's algorithm)."""
+
+    __slots__ = ("count", "mean", "min", "max", "_m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self._m2 = 0.0
+
+    def push(self, value: Union[int, float]) -> None:
+        """Add one value."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def variance(self, population: bool = False) -> Optional[float]:
+        """Return the sample variance (or population variance), or None if undefined."""
+        divisor = self.count if population else self.count - 1
+        return self._m2 / divisor if divisor > 0 else None
+
+
+class QuantileSketch:
+    """
+    Approximate quantiles of a stream in bounded memory (a KLL sketch).
+
+    Values are appended to the bottom level of a stack of buffers. When the
+    sketch is full, the lowest full level is sorted and every other value
+    (from a random offset) moves up a level, where each value stands for
+    twice as many inputs. Capacities shrink by a third per level downward,
+    so the sketch holds about 3 * size values however long the stream, and
+    its rank errors do not depend on the order of the input. Up to size
+    values, quantiles are exact.
+    """
+
+    __slots__ = ("size", "count", "min", "max", "_levels", "_held", "_capacity", "_random")
+
+    def __init__(self, size: int = SKETCH_SIZE, seed: int = 0):
+        if size < 2:
+            raise ValueError("size must be at least 2")
+        self.size = size
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._levels = [[]]
+        self._held = 0
+        self._capacity = self._level_capacity(0)
+        # Seeded, so the same input always gives the same estimates
+        self._random = random.Random(seed)
+
+    def push(self, value: Union[int, float]) -> None:
+        """Add one value."""
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self._levels[0].append(value)
+        self._held += 1
+        if self._held >= self._capacity:
+            self._compress()
+
+    def quantiles(self, probabilities: List[float]) -> List[Optional[float]]:
+        """Return the estimated quantile for each probability, or None for an empty sketch."""
+        if not self.count:
+            return [None] * len(probabilities)
+        if len(self._levels) == 1:
+            # Nothing was compacted: interpolate between the exact sorted values
+            values = sorted(self._levels[0])
+            results = []
+            for p in probabilities:
+                position = p * (len(values) - 1)
+                below = int(position)
+                above = min(below + 1, len(values) - 1)
+                results.append(values[below] + (values[above] - values[below]) * (position - below))
+            return results
+
+        items = sorted((value, 1 << level) for level, values in enumerate(self._levels) for value in values)
+        cumulative = list(itertools.accumulate(weight for _, weight in items))
+        results = []
+        for p in probabilities:
+            if p <= 0:
+                results.append(self.min)
+            elif p >= 1:
+                results.append(self.max)
+            else:
+                # The first item covering rank p * (count - 1), scaled to the weights held
+                rank = p * (cumulative[-1] - 1)
+                results.append(items[min(bisect_right(cumulative, rank), len(items) - 1)][0])
+        return results
+
+    def _level_capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return math.ceil(self.size * (2 / 3) ** depth) + 1
+
+    def _compress(self) -> None:
+        for level, values in enumerate(self._levels):
+            if len(values) < self._level_capacity(level):
+                continue
+            if level + 1 == len(self._levels):
+                self._levels.append([])
+            values.sort()
+            # An odd value out stays behind, keeping the total weight exact
+            kept = values.pop() if len(values) % 2 else None
+            self._levels[level + 1].extend(values[self._random.getrandbits(1)::2])
+            values.clear()
+            if kept is not None:
+                values.append(kept)
+            self._held = sum(len(values) for values in self._levels)
+            self._capacity = sum(self._level_capacity(h) for h in range(len(self._levels)))
+            if self._held < self._capacity:
+                break
+
+
+class StreamingHistogram:
+    """
+    Fixed number of equal-width bins over a stream.
+
+    With a fixed range (low and high), values outside it are counted as
+    below or above. Without one, the range starts around the first two
+    distinct values and doubles (merging neighbouring bins) whenever a
+    value falls outside it, so every value is binned. A range wider than
+    the largest float raises ValueError.
+    """
+
+    __slots__ = ("bins", "low", "width", "counts", "below", "above", "_fixed", "_first", "_first_count")
+
+    def __init__(self, bins: int = DEFAULT_BINS, low: Optional[float] = None, high: Optional[float] = None):
+        if bins < 1:
+            raise ValueError("bins must be at least 1")
+        self.bins = bins
+        self.counts = [0] * bins
+        self.below = self.above = 0
+        self._fixed = low is not None or high is not None
+        self._first = None
+        self._first_count = 0
+        if self._fixed:
+            if low is None or high is None or not low < high:
+                raise ValueError("low and high must both be given, with low < high")
+            self.low = low
+            self.width = (high - low) / bins
+            self._check_range()
+        else:
+            self.low = self.width = None
+
+    def push(self, value: Union[int, float]) -> None:
+        """Add one value."""
+        if self.width is None:
+            # Wait for a second distinct value to set the initial scale
+            if self._first is None or value == self._first:
+                self._first = value
+                self._first_count += 1
+                return
+            self.low = min(self._first, value)
+            self.width = abs(value - self._first) / (self.bins - 1 or 1) or math.ulp(self.low)
+            self._check_range()
+            self._add(self._first, self._first_count)
+
+        if value < self.low or value >= self.low + self.bins * self.width:
+            if self._fixed:
+                if value < self.low:
+                    self.below += 1
+                else:
+                    self.above += 1
+                return
+            while value < self.low:
+                self._double(downward=True)
+            while value >= self.low + self.bins * self.width:
+                self._double(downward=False)
+        self._add(value, 1)
+
+    def result(self) -> Dict[str, Any]:
+        """Return {"edges": [...], "counts": [...]}, plus below/above counts for a fixed range."""
+        if self.width is None:
+            # Every value was the same (or there were none)
+            if self._first is None:
+                result = {"edges": [], "counts": []}
+            else:
+                result = {"edges": [self._first, self._first], "counts": [self._first_count]}
+        else:
+            first, last = 0, self.bins
+            if not self._fixed:
+                # Drop empty bins left at either end by range doubling
+                while not self.counts[first]:
+                    first += 1
+                while not self.counts[last - 1]:
+                    last -= 1
+            result = {"edges": [self.low + i * self.width for i in range(first, last + 1)],
+                      "counts": self.counts[first:last]}
+        if self._fixed:
+            result["below"], result["above"] = self.below, self.above
+        return result
+
+    def _check_range(self) -> None:
+        # Edges and bin offsets must stay finite for _add's index arithmetic
+        if not (math.isfinite(self.low) and math.isfinite(self.bins * self.width)
+                and math.isfinite(self.low + self.bins * self.width)):
+            raise ValueError("Histogram range is larger than the largest float")
+
+    def _add(self, value: Union[int, float], count: int) -> None:
+        # Rounding can put a value just under the top edge into bin `bins`
+        index = min(int((value - self.low) / self.width), self.bins - 1)
+        self.counts[index] += count
+
+    def _double(self, downward: bool) -> None:
+        # Old bin i lands in new bin (shift + i) // 2; growing downward puts
+        # the old range in the top half of the new one
+        shift = self.bins if downward else 0
+        counts = [0] * self.bins
+        for i, count in enumerate(self.counts):
+            counts[(shift + i) // 2] += count
+        if downward:
+            self.low -= self.bins * self.width
+        self.width *= 2
+        self.counts = counts
+        self._check_range()
+
+
+def describe(values: Union[List[Union[int, float]], BinaryArray], quantiles: Optional[List[float]] = None, bins: int = 0,
+             population: bool = False) -> Union[Dict[str, Any], str]:
+    """
+    Summarize a list of numbers in one pass.
+
+    Returns count, mean, variance, stddev, min, max and the requested
+    quantiles (default 0.25, 0.5 and 0.75). Quantiles are exact for up to
+    1000 values and sketch estimates beyond that, typically off by well
+    under 1% in rank. bins > 0 adds a histogram (see histogram). variance
+    and stddev are sample statistics unless population is set.
+
+    values may also be a binary array ({"dtype": "float64", "shape": [n],
+    "data": base64 of little-endian values}), which is much cheaper to
+    send than a long JSON list.
+
+    Example:
+    - [2, 4, 4, 4, 5, 5, 7, 9] → {"count": 8, "mean": 5.0, "variance": 4.571..., ...}
+    """
+    probabilities = list(DEFAULT_QUANTILES) if quantiles is None else quantiles
+    values = decode_values(values, MAX_STATS_SIZE)
+    if isinstance(values, str):
+        return values
+    error = _check_request(values, probabilities, bins or DEFAULT_BINS)
+    if error:
+        return error
+    if not values:
+        return "Error: Cannot describe an empty list"
+
+    stats = RunningStats()
+    sketch = QuantileSketch()
+    counter = StreamingHistogram(bins) if bins else None
+    accumulators = [stats.push, sketch.push]
+    if counter is not None:
+        accumulators.append(counter.push)
+    try:
+        for value in values:
+            if not math.isfinite(value):
+                return NOT_FINITE_ERROR
+            for push in accumulators:
+                push(value)
+    except OverflowError:
+        return NOT_FINITE_ERROR
+    except ValueError as e:
+        return f"Error: {e}"
+
+    variance = stats.variance(population)
+    if not math.isfinite(stats.mean) or not math.isfinite(variance or 0.0):
+        return "Error: Result is too large"
+    summary = {
+        "count": stats.count,
+        "mean": stats.mean,
+        "variance": variance,
+        "stddev": None if variance is None else math.sqrt(variance),
+        "min": stats.min,
+        "max": stats.max,
+        "quantiles": dict(zip(map(str, probabilities), sketch.quantiles(probabilities))),
+    }
+    if counter is not None:
+        summary["histogram"] = counter.result()
+    return summary
+
+
+def quantiles(values: Union[List[Union[int, float]], BinaryArray],
+              probabilities: Optional[List[float]] = None) -> Union[List[float], str]:
+    """
+    Estimate quantiles of a list of numbers in one pass (KLL sketch).
+
+    probabilities defaults to [0.25, 0.5, 0.75]; results are in the same
+    order. Quantiles of up to 1000 values are exact, interpolating
+    linearly between the nearest values; beyond that they are estimates,
+    typically off by well under 1% in rank whatever the input order.
+    values may also be a binary array, as in describe.
+
+    Example:
+    - [1, 2, 3, 4, 5], [0.5] → [3]
+    """
+    probabilities = list(DEFAULT_QUANTILES) if probabilities is None else probabilities
+    values = decode_values(values, MAX_STATS_SIZE)
+    if isinstance(values, str):
+        return values
+    error = _check_request(values, probabilities, DEFAULT_BINS)
+    if error:
+        return error
+    if not values:
+        return "Error: Cannot take quantiles of an empty list"
+    sketch = QuantileSketch()
+    try:
+        for value in values:
+            if not math.isfinite(value):
+                return NOT_FINITE_ERROR
+            sketch.push(value)
+    except OverflowError:
+        return NOT_FINITE_ERROR
+    return sketch.quantiles(probabilities)
+
+
+def histogram(values: Union[List[Union[int, float]], BinaryArray], bins: int = DEFAULT_BINS, low: Optional[float] = None,
+              high: Optional[float] = None) -> Union[Dict[str, Any], str]:
+    """
+    Count a list of numbers into equal-width bins in one pass.
+
+    Returns {"edges": [...], "counts": [...]}, with one more edge than
+    counts; bin i holds edges[i] <= value < edges[i + 1]. Give low and high
+    for fixed bins (values outside them are reported as "below" and
+    "above"); otherwise the range adapts to the data and can come out
+    with fewer than `bins` bins. values may also be a binary array, as in
+    describe.
+
+    Example:
+    - [1, 2, 2, 3], bins=2, low=0, high=4 → {"edges": [0.0, 2.0, 4.0], "counts": [1, 3], "below": 0, "above": 0}
+    """
+    values = decode_values(values, MAX_STATS_SIZE)
+    if isinstance(values, str):
+        return values
+    error = _check_request(values, [], bins)
+    if error:
+        return error
+    try:
+        counter = StreamingHistogram(bins, low, high)
+    except ValueError as e:
+        return f"Error: {e}"
+    try:
+        for value in values:
+            if not math.isfinite(value):
+                return NOT_FINITE_ERROR
+            counter.push(value)
+    except OverflowError:
+        return NOT_FINITE_ERROR
+    except ValueError as e:
+        return f"Error: {e}"
+    return counter.result()
+
+
+def _check_request(values: Sequence, probabilities: List[float], bins: int) -> Optional[str]:
+    """Return an error message for an oversized or malformed request, or None."""
+    if len(values) > MAX_STATS_SIZE:
+        return f"Error: Too many values (limit is {MAX_STATS_SIZE})"
+    if len(probabilities) > MAX_QUANTILES:
+        return f"Error: Too many quantiles (limit is {MAX_QUANTILES})"
+    if not all(0 <= p <= 1 for p in probabilities):
+        return "Error: quantiles must be between 0 and 1"
+    if not 1 <= bins <= MAX_BINS:
+        return f"Error: bins must be between 1 and {MAX_BINS}"
+    return None
@@ -0,0 +1,118 @@
+"""Streaming variants of the batch tools.
+
+calculate_batch and greet_many build their whole result list before
+responding. The tools here pull results from a generator one chunk at a
+time and send each chunk to the client as an MCP progress notification as
+soon as it is ready, so the first results arrive early and the server
+holds at most one chunk of output at a time, whatever the batch size.
+"""
+
+import itertools
+import json
+import math
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+import anyio
+from fastmcp import Context
+
+from .math_tools import iter_calculate
+from .text_tools import iter_greetings
+from .workers import PoolBusyError, ThreadOffload
+
+# Results per progress notification, by default and at most
+DEFAULT_CHUNK_SIZE = 50
+MAX_CHUNK_SIZE = 1000
+
+# Maximum number of items accepted by one streaming call
+MAX_STREAM_ITEMS = 100000
+
+# Thread pool that produces the chunks and the result returned when it is
+# full; see set_thread_pool
+_thread_pool = None
+_busy_result = None
+
+
+def set_thread_pool(pool: Optional[ThreadOffload], busy_result: Callable[[], Any]) -> None:
+    """
+    Produce chunks on pool, the thread pool shared with the server's other tools.
+
+    Each chunk then counts against the pool's pending limit, and a call whose
+    chunk is refused ends with busy_result(). With no pool, chunks run on
+    anyio's default worker threads.
+    """
+    global _thread_pool, _busy_result
+    _thread_pool, _busy_result = pool, busy_result
+
+
+async def calculate_stream(expressions: List[str], ctx: Context, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                           collect: bool = False) -> Union[Dict[str, Any], str]:
+    """
+    Evaluate many calculator expressions, streaming the results as they complete.
+
+    Results are sent in chunks of chunk_size as progress notifications
+    whose message is JSON: {"offset": 0, "results": [14, 4, "Error: ..."]}.
+    The final result reports {"count": ..., "errors": ...}; set collect to
+    also get every result in "results" (for clients that do not show
+    progress notifications). Each expression is evaluated as by calculate;
+    infinite and NaN results are sent as null.
+    """
+    if len(expressions) > MAX_STREAM_ITEMS:
+        return f"Error: Too many expressions (limit is {MAX_STREAM_ITEMS})"
+    return await _stream(ctx, iter_calculate(expressions), len(expressions), chunk_size, collect)
+
+
+async def greet_stream(names: List[str], ctx: Context, language: str = "en", template: Optional[str] = None,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE, collect: bool = False) -> Union[Dict[str, Any], str]:
+    """
+    Greet many names, streaming the greetings as they are produced.
+
+    Names are normalized and templates applied as in greet_many. Greetings
+    are sent in chunks of chunk_size as progress notifications whose
+    message is JSON: {"offset": 0, "results": ["Hello, Alice! ...", ...]}.
+    The final result reports {"count": ..., "errors": ...}; set collect to
+    also get every greeting in "results".
+    """
+    if len(names) > MAX_STREAM_ITEMS:
+        return f"Error: Too many names (limit is {MAX_STREAM_ITEMS})"
+    try:
+        greetings = iter_greetings(names, language, template)
+    except ValueError as e:
+        return f"Error: {e}"
+    return await _stream(ctx, greetings, len(names), chunk_size, collect)
+
+
+async def _stream(ctx: Context, results: Iterator, total: int, chunk_size: int,
+                  collect: bool) -> Union[Dict[str, Any], str]:
+    """Send results to the client chunk by chunk and return the summary."""
+    if not 1 <= chunk_size <= MAX_CHUNK_SIZE:
+        return f"Error: chunk_size must be between 1 and {MAX_CHUNK_SIZE}"
+    collected = [] if collect else None
+    done = errors = 0
+    pool, busy_result = _thread_pool, _busy_result
+    while True:
+        # Produce each chunk on a worker thread so long chunks do not block
+        # the event loop while earlier notifications are being sent
+        if pool is None:
+            chunk = await anyio.to_thread.run_sync(list, itertools.islice(results, chunk_size))
+        else:
+            try:
+                chunk = await pool.run(list, itertools.islice(results, chunk_size))
+            except PoolBusyError:
+                return busy_result()
+        if not chunk:
+            break
+        # JSON has no NaN or infinities; report them as null, as calculate_vectorized does
+        chunk = [None if isinstance(result, float) and not math.isfinite(result) else result
+                 for result in chunk]
+        errors += sum(1 for result in chunk if isinstance(result, str) and result.startswith("Error:"))
+        await ctx.report_progress(done + len(chunk), total,
+                                  json.dumps({"offset": done, "results": chunk}, ensure_ascii=False,
+                                             allow_nan=False))
+        if collected is not None:
+            collected.extend(chunk)
+        done += len(chunk)
+
+    summary = {"count": done, "errors": errors}
+    if collected is not None:
+        summary["results"] = collected
+    return summary
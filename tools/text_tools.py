@@ -1,6 +1,136 @@
 """Text processing tools."""
 
+import string
+import unicodedata
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 
-def greet(name: str) -> str:
-    """Return a personalized greeting."""
-    return f"Hello, {name}! Welcome to FastMCP."
+from .cache import LRUCache
+
+# Built-in greeting templates by language; {name} marks where the name goes
+GREETING_TEMPLATES = {
+    "en": "Hello, {name}! Welcome to FastMCP.",
+    "es": "¡Hola, {name}! Bienvenido a FastMCP.",
+    "fr": "Bonjour, {name} ! Bienvenue sur FastMCP.",
+    "de": "Hallo, {name}! Willkommen bei FastMCP.",
+    "pt": "Olá, {name}! Bem-vindo ao FastMCP.",
+    "it": "Ciao, {name}! Benvenuto su FastMCP.",
+}
+
+# Maximum number of names accepted by one greet_many() call
+MAX_GREET_BATCH = 10000
+
+# Maximum length of a name after normalization, in characters
+MAX_NAME_LENGTH = 100
+
+# Maximum length of a custom template, and how many parsed ones are kept
+MAX_TEMPLATE_LENGTH = 500
+TEMPLATE_CACHE_SIZE = 256
+
+_template_cache = LRUCache(TEMPLATE_CACHE_SIZE)
+
+
+def _parse_template(template: str) -> Tuple[str, ...]:
+    """
+    Split a template into the literal text around its {name} placeholders.
+
+    A greeting is then name.join(parts), with no formatting work per call.
+    """
+    parts = []
+    literal = []
+    for text, field, spec, conversion in string.Formatter().parse(template):
+        literal.append(text)
+        if field is None:
+            continue
+        if field != "name" or spec or conversion:
+            raise ValueError("templates may only contain the {name} placeholder")
+        parts.append("".join(literal))
+        literal = []
+    parts.append("".join(literal))
+    if len(parts) < 2:
+        raise ValueError("template must contain {name}")
+    return tuple(parts)
+
+
+_language_parts = {language: _parse_template(template) for language, template in GREETING_TEMPLATES.items()}
+
+
+def _template_parts(language: str, template: Optional[str]) -> Union[Tuple[str, ...], str]:
+    """Return the parsed parts of a custom template or a language's template, or an error message."""
+    if template is None:
+        parts = _language_parts.get(language)
+        if parts is None:
+            return f"Error: language must be one of {', '.join(GREETING_TEMPLATES)}"
+        return parts
+    if len(template) > MAX_TEMPLATE_LENGTH:
+        return f"Error: Template is longer than {MAX_TEMPLATE_LENGTH} characters"
+    parts = _template_cache.get(template)
+    if parts is None:
+        try:
+            parts = _parse_template(template)
+        except ValueError as e:
+            return f"Error: Invalid template - {e}"
+        _template_cache.put(template, parts)
+    return parts
+
+
+def greet(name: str, language: str = "en", template: Optional[str] = None) -> str:
+    """
+    Return a personalized greeting.
+
+    language picks a built-in template (en, es, fr, de, pt, it). template,
+    if given, overrides it; it must contain {name}, e.g. "Hi {name}!".
+    """
+    parts = _language_parts.get(language) if template is None else None
+    if parts is None:
+        parts = _template_parts(language, template)
+        if isinstance(parts, str):
+            return parts
+    return name.join(parts)
+
+
+def greet_many(names: List[str], language: str = "en",
+               template: Optional[str] = None) -> Union[List[str], str]:
+    """
+    Return a greeting for every name in a list, in order.
+
+    Names are trimmed and Unicode-normalized (NFC) first; a name that is
+    empty or longer than 100 characters yields an "Error: ..." entry without
+    affecting the others. language and template work as in greet.
+
+    Example:
+    - ["Alice", " Bob "] → ["Hello, Alice! Welcome to FastMCP.", "Hello, Bob! Welcome to FastMCP."]
+    """
+    if len(names) > MAX_GREET_BATCH:
+        return f"Error: Too many names (limit is {MAX_GREET_BATCH})"
+    parts = _template_parts(language, template)
+    if isinstance(parts, str):
+        return parts
+    return list(_greetings(names, parts))
+
+
+def iter_greetings(names: Iterable[str], language: str = "en",
+                   template: Optional[str] = None) -> Iterator[str]:
+    """
+    Yield greet_many's result for each name, one at a time.
+
+    Raises ValueError for an unknown language or invalid template.
+    """
+    parts = _template_parts(language, template)
+    if isinstance(parts, str):
+        raise ValueError(parts[len("Error: "):])
+    return _greetings(names, parts)
+
+
+def _greetings(names: Iterable[str], parts: Tuple[str, ...]) -> Iterator[str]:
+    """Normalize each name and yield its greeting or an "Error: ..." message."""
+    for name in names:
+        name = name.strip()
+        # ASCII text is already in NFC
+        if not name.isascii():
+            name = unicodedata.normalize("NFC", name)
+        if not name:
+            yield "Error: Name is empty"
+        elif len(name) > MAX_NAME_LENGTH:
+            yield f"Error: Name is longer than {MAX_NAME_LENGTH} characters"
+        else:
+            yield name.join(parts)
@@ -0,0 +1,153 @@
+"""Vectorized expression evaluation over arrays of variable values.
+
+Requires NumPy; without it the tools return an error message instead of a
+result.
+"""
+
+import functools
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Union
+
+from .arrays import BinaryArray, decode_array, encode_array
+from .cache import LRUCache
+from .expression import FUNCTIONS, ExpressionError, compile_expression
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without NumPy
+    np = None
+
+# Longest array accepted for any one variable
+MAX_VECTOR_LENGTH = 1_000_000
+
+# Maximum number of compiled vector expressions kept in memory
+VECTOR_CACHE_SIZE = 256
+
+# Reductions calculate_vectorized can apply to its result
+REDUCTIONS = ("sum", "mean", "min", "max")
+
+
+def _numpy_functions() -> Mapping:
+    """Map every name in the scalar function table to a NumPy ufunc."""
+    def log(x, base=None):
+        return np.log(x) if base is None else np.log(x) / np.log(base)
+
+    def round_(x, ndigits=0):
+        return np.round(x, ndigits)
+
+    equivalents = {
+        "sin": np.sin,
+        "cos": np.cos,
+        "tan": np.tan,
+        "asin": np.arcsin,
+        "acos": np.arccos,
+        "atan": np.arctan,
+        "sinh": np.sinh,
+        "cosh": np.cosh,
+        "tanh": np.tanh,
+        "log": log,
+        "log10": np.log10,
+        "log2": np.log2,
+        "exp": np.exp,
+        "sqrt": np.sqrt,
+        "pow": np.power,
+        "abs": np.abs,
+        "round": round_,
+        "floor": np.floor,
+        "ceil": np.ceil,
+        "min": lambda *args: functools.reduce(np.minimum, args),
+        "max": lambda *args: functools.reduce(np.maximum, args),
+    }
+    return MappingProxyType({name: equivalents[name] for name in FUNCTIONS})
+
+
+NUMPY_FUNCTIONS = _numpy_functions() if np is not None else MappingProxyType({})
+
+_vector_cache = LRUCache(VECTOR_CACHE_SIZE)
+
+
+def calculate_vectorized(expression: str, variables: Dict[str, Union[List[float], BinaryArray]],
+                         reduce: Optional[str] = None,
+                         binary: bool = False) -> Union[List[Optional[float]], BinaryArray, float, None, str]:
+    """
+    Evaluate an expression with free variables over whole arrays at once.
+
+    Every variable maps to a list of numbers; all lists must have the same
+    length and the result has one value per position. Supports the same
+    operators, functions and constants as calculate. Non-finite results
+    (e.g. sqrt of a negative number) come back as null.
+
+    Pass reduce="sum", "mean", "min" or "max" to get a single number back
+    instead of the whole array.
+
+    For large arrays, a variable may be given as a binary array instead of
+    a list: {"dtype": "float64" or "int64", "shape": [n], "data": base64 of
+    the little-endian values}. With binary=True the result comes back in
+    the same float64 form, keeping NaN and infinities as they are.
+
+    Example:
+    - "sin(x) * y + 2", {"x": [0, pi/2], "y": [1, 3]} → [2.0, 5.0]
+    """
+    if np is None:
+        return "Error: calculate_vectorized requires NumPy (pip install numpy)"
+    if reduce is not None and reduce not in REDUCTIONS:
+        return f"Error: reduce must be one of {', '.join(REDUCTIONS)}"
+
+    try:
+        arrays = {}
+        length = None
+        for name, values in variables.items():
+            if not isinstance(values, (list, tuple)):
+                try:
+                    # A float64 payload is used in place, without a copy
+                    values = decode_array(values, MAX_VECTOR_LENGTH)
+                except ValueError as e:
+                    return f"Error: Variable '{name}' is not a valid binary array - {e}"
+            array = np.asarray(values, dtype=np.float64)
+            if array.ndim != 1:
+                return f"Error: Variable '{name}' must be a flat list of numbers"
+            if array.size > MAX_VECTOR_LENGTH:
+                return f"Error: Variable '{name}' is too long (limit is {MAX_VECTOR_LENGTH} values)"
+            if length is not None and array.size != length:
+                return "Error: All variables must have the same number of values"
+            length = array.size
+            arrays[name] = array
+
+        key = (" ".join(expression.split()), frozenset(arrays))
+        # Compilation folds constant subexpressions, so it computes too
+        with np.errstate(all="ignore"):
+            evaluator = _vector_cache.get(key)
+            if evaluator is None:
+                evaluator = compile_expression(key[0], variables=key[1], functions=NUMPY_FUNCTIONS)
+                _vector_cache.put(key, evaluator)
+            result = np.asarray(evaluator(arrays), dtype=np.float64)
+        result = np.broadcast_to(result, (1 if length is None else length,))
+
+        if reduce is not None:
+            value = float(getattr(np, reduce)(result)) if result.size else None
+            return value if value is None or np.isfinite(value) else None
+        if binary:
+            return encode_array(np.ascontiguousarray(result))
+        return _to_list(result)
+
+    except ZeroDivisionError:
+        return "Error: Division by zero"
+    except OverflowError:
+        # Exact integer constants can outgrow float64 (e.g. x + 2**5000)
+        return "Error: Result is too large"
+    except SyntaxError:
+        return "Error: Invalid mathematical expression"
+    except ExpressionError as e:
+        return f"Error: {str(e)}"
+    except (TypeError, ValueError) as e:
+        return f"Error: Invalid value - {str(e)}"
+
+
+def _to_list(result) -> List[Optional[float]]:
+    """Convert a float array to a list, turning NaN and infinities into None."""
+    finite = np.isfinite(result)
+    if finite.all():
+        return result.tolist()
+    values = result.astype(object)
+    values[~finite] = None
+    return values.tolist()
@@ -0,0 +1,357 @@
+"""Worker pools that keep slow tool calls off the server's event loop.
+
+A slow tool call running inline blocks every other request the server is
+handling. ThreadOffload runs blocking calls on a bounded thread pool and
+turns calls away once too many are pending. ProcessWorkerPool keeps a set
+of pre-started worker processes, hands each call to an idle worker and
+kills the worker if the call misses its deadline, so one bad request never
+takes the server down with it.
+"""
+
+import asyncio
+import collections
+import functools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Default wall-clock budget for one call, in seconds
+DEFAULT_TIMEOUT = 5.0
+
+# Default number of calls a worker serves before it is replaced
+DEFAULT_MAX_TASKS_PER_WORKER = 1000
+
+# Default time a new worker has to start up (import its target) and report ready
+DEFAULT_BOOT_TIMEOUT = 60.0
+
+# Default number of calls a ThreadOffload accepts per thread before refusing more
+DEFAULT_PENDING_PER_THREAD = 4
+
+# Name given to every pool worker process
+WORKER_PROCESS_NAME = "ProcessWorkerPool-worker"
+
+
+def is_worker_process() -> bool:
+    """
+    Return True inside a pool worker.
+
+    Spawned workers re-import the parent's main module; code that starts a
+    pool at import time checks this to avoid starting pools recursively.
+    """
+    return multiprocessing.current_process().name == WORKER_PROCESS_NAME
+
+
+class PoolTimeoutError(TimeoutError):
+    """Raised when a call does not finish before its deadline."""
+
+
+class PoolClosedError(RuntimeError):
+    """Raised when a call is submitted to a pool that has been shut down."""
+
+
+class PoolBusyError(RuntimeError):
+    """Raised when a pool already holds as many calls as it accepts."""
+
+
+def _worker_main(conn, target: Callable) -> None:
+    """Report ready, then serve calls from the parent until told to stop."""
+    # target was unpickled (and its module imported) before this runs
+    conn.send("ready")
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if task is None:
+            return
+        args, kwargs = task
+        try:
+            conn.send((True, target(*args, **kwargs)))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+
+
+class ThreadOffload:
+    """
+    Bounded thread pool that runs blocking tool functions for async callers.
+
+    At most max_pending calls are queued or running at once; further calls
+    are refused immediately instead of queueing without limit, so a burst
+    of slow requests cannot build up an unbounded backlog.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 name: str = "ThreadOffload"):
+        self.size = workers or min(32, (os.cpu_count() or 1) + 4)
+        self.max_pending = max_pending or self.size * DEFAULT_PENDING_PER_THREAD
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._stats = {"pending": 0, "completed": 0, "failed": 0, "rejected": 0}
+
+    async def run(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run fn(*args, **kwargs) on a pool thread and return its result.
+
+        Raises PoolBusyError if max_pending calls are already in the pool.
+        """
+        with self._lock:
+            if self._stats["pending"] >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise PoolBusyError(f"{self.max_pending} calls are already pending")
+            self._stats["pending"] += 1
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except RuntimeError:
+            self._finish(None)
+            raise PoolClosedError("Thread pool has been shut down")
+        # Count the call as pending until its thread is done, even if the
+        # caller stops waiting for it
+        future.add_done_callback(self._finish)
+        return await asyncio.wrap_future(future)
+
+    def wrap(self, fn: Callable, busy_result: Callable[[], Any]) -> Callable:
+        """
+        Return a coroutine function with fn's signature that runs fn on the pool.
+
+        busy_result() builds the value returned when the call is refused, so
+        tools can report backpressure in their own error format.
+        """
+        @functools.wraps(fn)
+        async def offloaded(*args, **kwargs):
+            try:
+                return await self.run(fn, *args, **kwargs)
+            except PoolBusyError:
+                return busy_result()
+        return offloaded
+
+    def metrics(self) -> Dict[str, int]:
+        """Return pool size, pending calls and call counters."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["workers"] = self.size
+        stats["max_pending"] = self.max_pending
+        return stats
+
+    def shutdown(self) -> None:
+        """Refuse new calls; calls already submitted still run."""
+        self._executor.shutdown(wait=False)
+
+    def _finish(self, future) -> None:
+        with self._lock:
+            self._stats["pending"] -= 1
+            if future is not None:
+                failed = future.cancelled() or future.exception() is not None
+                self._stats["failed" if failed else "completed"] += 1
+
+
+class _Worker:
+    """One worker process and the parent's end of its pipe."""
+
+    def __init__(self, context, target: Callable):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn, target),
+                                       name=WORKER_PROCESS_NAME, daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks_done = 0
+
+    def stop(self, kill: bool = False) -> None:
+        """Stop the process, politely unless kill is set."""
+        if not kill:
+            try:
+                self.conn.send(None)
+            except (OSError, BrokenPipeError):
+                kill = True
+        if kill:
+            self.process.kill()
+        self.process.join(timeout=1.0)
+        self.conn.close()
+
+
+class ProcessWorkerPool:
+    """
+    Fixed-size pool of pre-started processes running one target function.
+
+    Workers start in the background and only take calls once they report
+    ready, which under spawn means after re-importing the parent's main
+    module. Each call has a wall-clock deadline covering both the wait for
+    an idle worker and the work itself; time spent waiting while workers
+    are still starting up does not count against it. A worker that misses
+    the deadline is killed and replaced; workers are also recycled after
+    max_tasks_per_worker calls.
+    """
+
+    def __init__(self, target: Callable, workers: Optional[int] = None,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 max_tasks_per_worker: int = DEFAULT_MAX_TASKS_PER_WORKER,
+                 boot_timeout: float = DEFAULT_BOOT_TIMEOUT):
+        self.target = target
+        self.size = workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.boot_timeout = boot_timeout
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = collections.deque()
+        self._lock = threading.Lock()
+        # Signalled whenever a worker becomes idle or stops booting
+        self._ready = threading.Condition(self._lock)
+        self._booting = 0
+        self._closed = False
+        self._stats = {"waiting": 0, "in_flight": 0, "completed": 0, "failed": 0,
+                       "timeouts": 0, "recycled": 0, "boot_failures": 0}
+        for _ in range(self.size):
+            self._start_worker()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until no worker is starting up; return False if timeout passes first."""
+        with self._ready:
+            return self._ready.wait_for(lambda: not self._booting, timeout)
+
+    def submit(self, *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> Any:
+        """
+        Run target(*args, **kwargs) in a worker and return its result.
+
+        Raises PoolTimeoutError if the deadline passes, and RuntimeError if
+        the target raised or the worker died.
+        """
+        if self._closed:
+            raise PoolClosedError("Worker pool has been shut down")
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        with self._ready:
+            self._stats["waiting"] += 1
+            try:
+                while not self._idle:
+                    if self._closed:
+                        raise PoolClosedError("Worker pool has been shut down")
+                    booting = self._booting > 0
+                    started = time.monotonic()
+                    remaining = deadline - started
+                    if booting:
+                        # Start-up time is not the call's fault: wait up to the boot timeout
+                        remaining = max(remaining, self.boot_timeout)
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeoutError(f"No worker became available within {timeout:g}s")
+                    self._ready.wait(remaining)
+                    if booting:
+                        deadline += time.monotonic() - started
+                worker = self._idle.popleft()
+            finally:
+                self._stats["waiting"] -= 1
+
+        self._count("in_flight", 1)
+        try:
+            worker.conn.send((args, kwargs))
+            finished = worker.conn.poll(max(0.0, deadline - time.monotonic()))
+            if finished:
+                ok, result = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            self._count("failed", 1)
+            self._replace(worker, kill=True)
+            raise RuntimeError(f"Worker process died: {e}")
+        finally:
+            self._count("in_flight", -1)
+
+        if not finished:
+            self._count("timeouts", 1)
+            self._replace(worker, kill=True)
+            raise PoolTimeoutError(f"Call did not finish within {timeout:g}s")
+        self._release(worker)
+
+        if not ok:
+            self._count("failed", 1)
+            raise RuntimeError(result)
+        self._count("completed", 1)
+        return result
+
+    def wrap(self, fn: Callable, timeout_result: Callable[[float], Any]) -> Callable:
+        """
+        Return a function with fn's signature that runs through the pool.
+
+        timeout_result(seconds) builds the value returned when a call times
+        out, so tools can report deadlines in their own error format.
+        """
+        @functools.wraps(fn)
+        def pooled(*args, **kwargs):
+            try:
+                return self.submit(*args, **kwargs)
+            except PoolTimeoutError:
+                return timeout_result(self.timeout)
+        return pooled
+
+    def metrics(self) -> Dict[str, int]:
+        """Return pool size, queue depth and call counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["idle"] = len(self._idle)
+            stats["booting"] = self._booting
+        stats["workers"] = self.size
+        stats["queue_depth"] = stats.pop("waiting")
+        return stats
+
+    def shutdown(self) -> None:
+        """Stop all idle workers; busy and booting workers are stopped when they finish."""
+        with self._ready:
+            self._closed = True
+            idle, self._idle = list(self._idle), collections.deque()
+            self._ready.notify_all()
+        for worker in idle:
+            worker.stop()
+
+    def _count(self, name: str, delta: int) -> None:
+        with self._lock:
+            self._stats[name] += delta
+
+    def _release(self, worker: _Worker) -> None:
+        """Return a worker to the idle queue, recycling it if it is worn out."""
+        worker.tasks_done += 1
+        if worker.tasks_done >= self.max_tasks_per_worker:
+            self._count("recycled", 1)
+            self._replace(worker)
+        else:
+            self._make_idle(worker)
+
+    def _replace(self, worker: _Worker, kill: bool = False) -> None:
+        """Stop a worker and start a fresh one in its place."""
+        worker.stop(kill=kill)
+        if not self._closed:
+            self._start_worker()
+
+    def _make_idle(self, worker: _Worker) -> None:
+        """Hand a ready worker to waiting calls, or stop it if the pool is closed."""
+        with self._ready:
+            if not self._closed:
+                self._idle.append(worker)
+                self._ready.notify()
+                return
+        worker.stop()
+
+    def _start_worker(self) -> None:
+        """Start a worker process; a thread queues it as idle once it reports ready."""
+        with self._lock:
+            self._booting += 1
+        worker = _Worker(self._context, self.target)
+        threading.Thread(target=self._await_ready, args=(worker,), daemon=True,
+                         name=f"{WORKER_PROCESS_NAME}-boot").start()
+
+    def _await_ready(self, worker: _Worker) -> None:
+        try:
+            ready = worker.conn.poll(self.boot_timeout) and worker.conn.recv() == "ready"
+        except (EOFError, OSError):
+            ready = False
+        with self._ready:
+            self._booting -= 1
+            if ready and not self._closed:
+                self._idle.append(worker)
+                worker = None
+            elif not ready:
+                # Not replaced: a target that cannot start would fail the same way again
+                self._stats["boot_failures"] += 1
+            self._ready.notify_all()
+        if worker is not None:
+            worker.stop(kill=not ready)